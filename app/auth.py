@@ -2,21 +2,48 @@
 Authentication and authorization module.
 Encapsulates cryptographic functions and dependency injection for protected API routes.
 """
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from passlib.context import CryptContext
 from datetime import datetime, UTC
 import app.models as models
-from app.database import get_db
+from app.database import db_route, get_db
+from app.ttl_cache import TTLCache
 
 
 # Cryptographic context: Definition of Argon2 as the default hashing algorithm
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+# Dedicated executor for Argon2 hashing. Bounds the number of concurrent hash computations,
+# so a burst of sign-ups cannot occupy all threadpool workers (or CPU cores) of the server.
+hash_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+    thread_name_prefix="password-hash"
+)
+
 # Schema definition for extracting the Bearer token from the HTTP header
 security = HTTPBearer()
 
+# Validated tokens are cached per process. Changes made by other workers (e.g. a deleted
+# account) become visible after at most AUTH_CACHE_TTL_SECONDS.
+token_cache = TTLCache(
+    maxsize=int(os.getenv("AUTH_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+)
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Immutable snapshot of the authenticated user, detached from any database session."""
+    id: int
+    is_active: bool
+    expires_at: datetime
+
 
 def get_password_hash(password):
     """
@@ -28,6 +55,18 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+async def get_password_hash_async(password):
+    """
+    Generates a password hash in the hashing executor without blocking the event loop.
+    Must be used instead of get_password_hash inside 'async def' routes.
+
+    :param password: Plaintext password as string.
+    :return: Hashed password string.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hash_executor, get_password_hash, password)
+
+
 def verify_password(plain_password, hashed_password):
     """
     Verifies a plaintext password against a stored hash.
@@ -39,6 +78,16 @@ def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def invalidate_user(user_id: int):
+    """
+    Removes all cached tokens of a user. Must be called whenever the user is changed or deleted.
+
+    :param user_id: ID of the changed user.
+    """
+    token_cache.invalidate(lambda snapshot: snapshot.id == user_id)
+
+
+@db_route
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
     """
     FastAPI dependency for token validation and identification of the current user.
@@ -46,29 +95,39 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     :param credentials: HTTP authentication object provided by the client.
     :param db: Isolated database session of the current request.
     :raises HTTPException: On missing/invalid token (401) or inactive user (401).
-    :return: The authenticated user object.
+    :return: Snapshot of the authenticated user.
     """
     token = credentials.credentials
+    now = datetime.now(UTC)
+    user = token_cache.get(token)
 
-    # Database query to retrieve the corresponding session
-    session = db.query(models.Session).filter(models.Session.token == token).first()
+    if user is None:
+        # Database query to retrieve the corresponding session (user joined in the same SELECT)
+        session = db.query(models.Session).options(joinedload(models.Session.user)).filter(
+            models.Session.token == token).first()
 
-    # Session existence check (prevents AttributeError in subsequent steps)
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired Token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        # Session existence check (prevents AttributeError in subsequent steps)
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired Token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        expiry = session.expires_at
+
+        # Ensure timezone consistency (UTC) for time comparison
+        if expiry.tzinfo is None:
+            expiry = expiry.replace(tzinfo=UTC)
 
-    expiry = session.expires_at
+        user = CurrentUser(id=session.user.id, is_active=session.user.is_active, expires_at=expiry)
 
-    # Ensure timezone consistency (UTC) for time comparison
-    if expiry.tzinfo is None:
-        expiry = expiry.replace(tzinfo=UTC)
+        # Only valid sessions of active users are cached, never beyond their expiration date
+        if user.is_active and expiry > now:
+            token_cache.set(token, user, ttl=(expiry - now).total_seconds())
 
-    # Validation of the cryptographic expiration date
-    if not session or expiry < datetime.now(UTC):
+    # Validation of the cryptographic expiration date (also applies to cached snapshots)
+    if user.expires_at < now:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired Token",
@@ -76,10 +135,10 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         )
 
     # Authorization check: Verification of the double opt-in status
-    if not session.user.is_active:
+    if not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User account is inactive."
             )
 
-    return session.user
\ No newline at end of file
+    return user
\ No newline at end of file
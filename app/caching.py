@@ -0,0 +1,60 @@
+"""
+HTTP caching module.
+Implements conditional GET requests based on a per-user data version. The version is
+bumped in the same transaction as every write, so a read route can answer with
+'304 Not Modified' without querying or serializing any rows.
+"""
+import hashlib
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+import app.models as models
+from app.auth import CurrentUser, get_current_user
+from app.database import db_route, get_db
+
+
+# Responses are user-specific and must always be revalidated with the ETag
+CACHE_CONTROL = "private, no-cache"
+
+
+def bump_data_version(db: Session, user_id: int):
+    """
+    Increments the data version of a user as part of the current transaction.
+    Must be called by every route that changes data visible through the read routes.
+    """
+    db.query(models.User).filter(models.User.id == user_id).update(
+        {models.User.data_version: models.User.data_version + 1},
+        synchronize_session=False
+    )
+
+
+def build_etag(user_id: int, data_version: int, request: Request) -> str:
+    """
+    Builds a weak ETag from the user, its data version and the requested resource.
+    Path and query string are part of the tag, since filters change the response body.
+    """
+    resource = hashlib.sha1(f"{request.url.path}?{request.url.query}".encode()).hexdigest()[:16]
+    return f'W/"{user_id}-{data_version}-{resource}"'
+
+
+@db_route
+def conditional_get(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_db),
+        user: CurrentUser = Depends(get_current_user)
+):
+    """
+    FastAPI dependency shared by all read routes.
+
+    :raises HTTPException: 304 Not Modified if the client's If-None-Match matches the current ETag.
+    """
+    # Single primary key lookup; the version is not part of the cached user snapshot
+    data_version = db.query(models.User.data_version).filter(models.User.id == user.id).scalar()
+    etag = build_etag(user.id, data_version, request)
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        raise HTTPException(304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
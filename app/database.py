@@ -3,8 +3,12 @@ Database configuration and session management module.
 Handles connection strings, environment variables, and provides the dependency
 injection for isolated database sessions per request.
 """
+import functools
+import inspect
+import json
 import os
-from sqlalchemy import create_engine
+from fastapi import Depends
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 
@@ -18,6 +22,16 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./tracker.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Opt-in async mode, selected by an async driver in the URL ('sqlite+aiosqlite://' or
+# 'postgresql+asyncpg://'). Migrations, scripts and the streaming export keep using a
+# synchronous engine on the same database, derived by dropping the async driver.
+ASYNC_DRIVERS = ("+aiosqlite", "+asyncpg")
+ASYNC_MODE = any(driver in DATABASE_URL for driver in ASYNC_DRIVERS)
+
+SYNC_DATABASE_URL = DATABASE_URL
+for driver in ASYNC_DRIVERS:
+    SYNC_DATABASE_URL = SYNC_DATABASE_URL.replace(driver, "")
+
 # Configure connection arguments based on the active database system.
 # The 'check_same_thread' argument must be False for SQLite in FastAPI's asynchronous
 # environment to prevent thread-sharing errors. This argument is invalid for PostgreSQL.
@@ -25,12 +39,78 @@ connect_args = {}
 if "sqlite" in DATABASE_URL:
     connect_args = {"check_same_thread": False}
 
+# Production profile for SQLite, applied to every new connection. WAL lets readers run
+# concurrently with the (single) writer, and the busy timeout makes concurrent writers
+# wait for the lock instead of failing with 'database is locked'.
+SQLITE_PRAGMAS_ENABLED = os.getenv("SQLITE_PRAGMAS_ENABLED", "True") == "True"
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")), # Negative values are KiB (64 MB)
+    "foreign_keys": "ON"
+}
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Connect event hook that configures a new SQLite connection with SQLITE_PRAGMAS.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def pool_options(url: str) -> dict:
+    """
+    Connection pool settings for the given database URL, controlled by environment variables.
+    In-memory SQLite databases use a single shared connection and take no pool settings.
+    """
+    if url.startswith("sqlite") and (url.split("://", 1)[1] in ("", "/:memory:") or "mode=memory" in url):
+        return {}
+
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "True") == "True",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    }
+
+
+def serialize_json(value) -> str:
+    """
+    Serializer for JSON columns. Keeps non-ASCII characters (e.g. the label 'Übung') unescaped,
+    because SQLite's json_extract does not match escaped keys like '\\u00dcbung'.
+    """
+    return json.dumps(value, ensure_ascii=False)
+
+
 # Create the SQLAlchemy engine which acts as the central source of database connections.
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+engine = create_engine(SYNC_DATABASE_URL, connect_args=connect_args, json_serializer=serialize_json,
+                       **pool_options(SYNC_DATABASE_URL))
+
+if "sqlite" in DATABASE_URL and SQLITE_PRAGMAS_ENABLED:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
 
 # Configure the local session factory (disabled autocommit and autoflush for transaction safety).
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory (only in async mode). Objects are not expired on commit,
+# because the response is serialized after the session has left the greenlet context.
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(DATABASE_URL, json_serializer=serialize_json, **pool_options(DATABASE_URL))
+    if "sqlite" in DATABASE_URL and SQLITE_PRAGMAS_ENABLED:
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for declarative ORM models.
 Base = declarative_base()
 
@@ -45,4 +125,47 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_session_factory():
+    """
+    FastAPI dependency that provides the session factory for work that outlives the request
+    (background tasks open their own sessions).
+    """
+    return SessionLocal
+
+
+async def get_async_db():
+    """
+    Async counterpart of get_db, used by routes decorated with db_route in async mode.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def db_route(func):
+    """
+    Decorator for routes and dependencies with a 'db' parameter.
+
+    In sync mode the function is returned unchanged and FastAPI runs it in the threadpool.
+    In async mode it becomes a coroutine that receives an AsyncSession and executes the
+    unchanged function body via 'AsyncSession.run_sync': database I/O is awaited by the
+    async driver on the event loop, so no threadpool slot is held during the round trip.
+    Everything returned must be fully loaded (no lazy loads after the function returns).
+    """
+    if not ASYNC_MODE:
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(**kwargs):
+        db = kwargs.pop("db")
+        return await db.run_sync(lambda session: func(db=session, **kwargs))
+
+    # Same parameters for FastAPI, but the session is provided by get_async_db
+    signature = inspect.signature(func)
+    wrapper.__signature__ = signature.replace(parameters=[
+        param.replace(default=Depends(get_async_db)) if param.name == "db" else param
+        for param in signature.parameters.values()
+    ])
+    return wrapper
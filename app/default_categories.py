@@ -0,0 +1,67 @@
+"""
+Default category module.
+Loads the declarative template of the categories every new user starts with (once, at
+startup) and inserts it in bulk inside the registration transaction. Deployments can
+provide their own template (e.g. another language or set of metrics) via
+DEFAULT_CATEGORIES_FILE.
+"""
+import json
+import os
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+import app.models as models
+import app.schemas as schemas
+
+
+# JSON list of categories in the format of POST /categories/ (name, description, fields)
+DEFAULT_CATEGORIES_FILE = os.getenv(
+    "DEFAULT_CATEGORIES_FILE", os.path.join(os.path.dirname(__file__), "default_categories.json"))
+
+
+def load_template(path: str) -> List[schemas.CategoryCreate]:
+    """
+    Reads and validates a category template.
+
+    :raises pydantic.ValidationError: If the file does not match the category schema.
+    :raises ValueError: If two categories share a name (names identify the inserted rows).
+    """
+    with open(path, encoding="utf-8") as f:
+        template = TypeAdapter(List[schemas.CategoryCreate]).validate_python(json.load(f))
+
+    names = [cat.name for cat in template]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate category names in template '{path}'")
+    return template
+
+
+DEFAULT_CATEGORIES = load_template(DEFAULT_CATEGORIES_FILE)
+
+
+def seed_default_categories(db: Session, user_id: int, template: List[schemas.CategoryCreate] = None):
+    """
+    Adds the template categories of a new user to the caller's transaction with two
+    multi-row INSERTs (categories, then fields). System defaults cannot be deleted by the
+    user to ensure basic analytical integrity.
+    """
+    template = DEFAULT_CATEGORIES if template is None else template
+    if not template:
+        return
+
+    # IDs are mapped back by the (unique) names, so the rows can be inserted in one batch
+    stmt = insert(models.Category).returning(models.Category.id, models.Category.name)
+    category_ids = {name: category_id for category_id, name in db.execute(stmt, [
+        {"user_id": user_id, "name": cat.name, "description": cat.description, "is_system_default": True}
+        for cat in template
+    ])}
+
+    fields = [
+        # Fields without unit are stored as NULL, like fields of categories seeded before the template
+        {"category_id": category_ids[cat.name], "label": f.label, "data_type": f.data_type, "unit": f.unit or None}
+        for cat in template
+        for f in cat.fields
+    ]
+    if fields:
+        # NULL units are rendered explicitly, so all fields share one parameter set (one executemany)
+        db.execute(insert(models.CategoryField).execution_options(render_nulls=True), fields)
@@ -0,0 +1,168 @@
+"""
+Deletion module.
+Removes accounts and categories with set-based DELETEs (children first) instead of loading
+every dependent row into the session. Deletions of many entries run as a background job
+that removes the entries in batches, each in its own transaction, and records its progress
+in 'deletion_job' (so an interrupted job is resumed by the maintenance run).
+"""
+import logging
+import os
+from datetime import datetime, timedelta, UTC
+from typing import Callable, Optional
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+import app.models as models
+from app.caching import bump_data_version
+
+
+logger = logging.getLogger(__name__)
+
+# Entries removed per batch (and transaction) of a background deletion
+DELETION_BATCH_SIZE = int(os.getenv("DELETION_BATCH_SIZE", "5000"))
+
+# Deletions of more entries than this run as background job instead of inside the request
+DELETION_JOB_THRESHOLD = int(os.getenv("DELETION_JOB_THRESHOLD", "20000"))
+
+# Unfinished jobs without progress for this long are considered interrupted and resumed
+DELETION_JOB_STALE_AFTER = timedelta(minutes=10)
+
+# Jobs are not resumed anymore after this many runs (e.g. failing on a data error every time)
+DELETION_JOB_MAX_ATTEMPTS = int(os.getenv("DELETION_JOB_MAX_ATTEMPTS", "5"))
+
+
+def delete_users(db: Session, user_ids: list):
+    """
+    Deletes users and all their data with one set-based DELETE per table (children first),
+    without loading any rows into the session. Runs inside the caller's transaction.
+    """
+    entries = select(models.Entry.id).where(models.Entry.user_id.in_(user_ids))
+    categories = select(models.Category.id).where(models.Category.user_id.in_(user_ids))
+    fields = select(models.CategoryField.id).where(models.CategoryField.category_id.in_(categories))
+
+    for stmt in (
+        delete(models.EntryValue).where(models.EntryValue.entry_id.in_(entries)),
+        delete(models.DailyRollup).where(models.DailyRollup.user_id.in_(user_ids)),
+        delete(models.Entry).where(models.Entry.user_id.in_(user_ids)),
+        delete(models.FieldValueStat).where(models.FieldValueStat.category_field_id.in_(fields)),
+        delete(models.CategoryField).where(models.CategoryField.category_id.in_(categories)),
+        delete(models.Category).where(models.Category.user_id.in_(user_ids)),
+        delete(models.Session).where(models.Session.user_id.in_(user_ids)),
+        delete(models.Tombstone).where(models.Tombstone.user_id.in_(user_ids)),
+        # The outbox is keyed by address: queued codes must not be delivered, sent ones not kept
+        delete(models.EmailOutbox).where(
+            models.EmailOutbox.recipient.in_(select(models.User.email).where(models.User.id.in_(user_ids)))),
+        delete(models.User).where(models.User.id.in_(user_ids))
+    ):
+        db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def delete_category(db: Session, category_id: int):
+    """Deletes a category with its fields, entries and their derived rows (caller's transaction)."""
+    entries = select(models.Entry.id).where(models.Entry.category_id == category_id)
+    fields = select(models.CategoryField.id).where(models.CategoryField.category_id == category_id)
+
+    for stmt in (
+        delete(models.EntryValue).where(models.EntryValue.entry_id.in_(entries)),
+        delete(models.DailyRollup).where(models.DailyRollup.category_id == category_id),
+        delete(models.Entry).where(models.Entry.category_id == category_id),
+        delete(models.FieldValueStat).where(models.FieldValueStat.category_field_id.in_(fields)),
+        delete(models.CategoryField).where(models.CategoryField.category_id == category_id),
+        delete(models.Category).where(models.Category.id == category_id)
+    ):
+        db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def entry_filter(entity: str, entity_id: int):
+    """WHERE clause selecting the entries removed by deleting the given user or category."""
+    if entity == "user":
+        return models.Entry.user_id == entity_id
+    return models.Entry.category_id == entity_id
+
+
+def count_entries(db: Session, entity: str, entity_id: int) -> int:
+    """Number of entries a deletion of the given user or category has to remove."""
+    return db.scalar(select(func.count(models.Entry.id)).where(entry_filter(entity, entity_id)))
+
+
+def create_job(db: Session, user_id: int, entity: str, entity_id: int, total: int) -> models.DeletionJob:
+    """Registers a background deletion in the caller's transaction."""
+    job = models.DeletionJob(user_id=user_id, entity=entity, entity_id=entity_id, total=total)
+    db.add(job)
+    db.flush()
+    return job
+
+
+def run_job(session_factory: sessionmaker, job_id: int, batch_size: int = DELETION_BATCH_SIZE,
+            heartbeat: Optional[Callable[[], None]] = None):
+    """
+    Executes a deletion job: removes the entries in batches (committing the progress after
+    each batch) and finally the remaining rows of the user or category. Safe to call again
+    for an interrupted job, as it only deletes what is left.
+
+    :param heartbeat: Called after every batch (the maintenance run renews its lease there).
+    """
+    with session_factory() as db:
+        job = db.get(models.DeletionJob, job_id)
+        if job is None or job.status == "done":
+            return
+        entity, entity_id, user_id = job.entity, job.entity_id, job.user_id
+        job.status = "running"
+        job.attempts += 1
+        attempts = job.attempts
+        db.commit()
+
+    try:
+        while True:
+            with session_factory() as db:
+                ids = db.scalars(select(models.Entry.id).where(entry_filter(entity, entity_id))
+                                 .limit(batch_size)).all()
+                if not ids:
+                    break
+
+                db.execute(delete(models.EntryValue).where(models.EntryValue.entry_id.in_(ids)))
+                db.execute(delete(models.Entry).where(models.Entry.id.in_(ids)))
+                db.execute(update(models.DeletionJob).where(models.DeletionJob.id == job_id).values(
+                    deleted=models.DeletionJob.deleted + len(ids), updated_at=datetime.now(UTC)))
+                db.commit()
+
+            if heartbeat:
+                heartbeat()
+
+        with session_factory() as db:
+            if entity == "user":
+                delete_users(db, [entity_id])
+            else:
+                delete_category(db, entity_id)
+            db.execute(update(models.DeletionJob).where(models.DeletionJob.id == job_id).values(
+                status="done", updated_at=datetime.now(UTC)))
+            # Invalidates the ETags of responses cached while the job was running
+            bump_data_version(db, user_id)
+            db.commit()
+
+    except Exception as e:
+        logger.exception("Deletion job %s failed (attempt %s of %s)", job_id, attempts, DELETION_JOB_MAX_ATTEMPTS)
+        with session_factory() as db:
+            db.execute(update(models.DeletionJob).where(models.DeletionJob.id == job_id).values(
+                status="failed", error=str(e), updated_at=datetime.now(UTC)))
+            db.commit()
+        if attempts >= DELETION_JOB_MAX_ATTEMPTS:
+            logger.error("Deletion job %s given up after %s attempts", job_id, attempts)
+
+
+def resume_stale_jobs(session_factory: sessionmaker, heartbeat: Optional[Callable[[], None]] = None) -> int:
+    """
+    Continues jobs that were interrupted (e.g. by a restart) or have failed, until they
+    have used up DELETION_JOB_MAX_ATTEMPTS runs. Jobs given up on stay 'failed' with their error.
+
+    :return: Number of resumed jobs.
+    """
+    with session_factory() as db:
+        job_ids = db.scalars(select(models.DeletionJob.id).where(
+            models.DeletionJob.status.in_(["pending", "running", "failed"]),
+            models.DeletionJob.attempts < DELETION_JOB_MAX_ATTEMPTS,
+            models.DeletionJob.updated_at < datetime.now(UTC) - DELETION_JOB_STALE_AFTER
+        )).all()
+
+    for job_id in job_ids:
+        run_job(session_factory, job_id, heartbeat=heartbeat)
+    return len(job_ids)
@@ -0,0 +1,130 @@
+"""
+Typed entry value module.
+Keeps the 'entry_value' side table in sync with the numeric fields inside Entry.data and
+provides the SQL building blocks that read from it (aggregations and range filters).
+"""
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.orm import Session
+import app.models as models
+from app.json_fields import parse_number
+
+
+# Rows written per INSERT during the backfill
+BACKFILL_BATCH_SIZE = 1000
+
+
+def to_number(value) -> Optional[float]:
+    """
+    Converts a value of Entry.data into a number. The frontend stores form input as strings,
+    so numeric strings are accepted as well; anything else (text, booleans, None) is skipped.
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return parse_number(str(value))
+    if isinstance(value, str):
+        return parse_number(value.strip())
+    return None
+
+
+def fields_of_type(db: Session, category_ids: Iterable[int], data_type: str = "number") -> dict:
+    """
+    Loads the fields of the given categories with the given data type ('number' or 'text').
+
+    :return: {category_id: {label: category_field_id}}
+    """
+    fields = {}
+    rows = db.query(models.CategoryField.category_id, models.CategoryField.label, models.CategoryField.id).filter(
+        models.CategoryField.category_id.in_(set(category_ids)),
+        models.CategoryField.data_type == data_type
+    )
+    for category_id, label, field_id in rows:
+        fields.setdefault(category_id, {})[label] = field_id
+    return fields
+
+
+def stored_values(db: Session, entry_ids: Iterable[int]) -> dict:
+    """
+    Reads the typed values currently stored for the given entries.
+
+    :return: {entry_id: {label: value}}
+    """
+    values = {}
+    rows = db.query(models.EntryValue.entry_id, models.CategoryField.label, models.EntryValue.num_value).join(
+        models.CategoryField, models.CategoryField.id == models.EntryValue.category_field_id).filter(
+        models.EntryValue.entry_id.in_(list(entry_ids)))
+    for entry_id, label, number in rows:
+        values.setdefault(entry_id, {})[label] = number
+    return values
+
+
+def write_entry_values(db: Session, entries: Iterable[Tuple[int, int, dict]], replace: bool = True) -> dict:
+    """
+    Writes the typed values of entries as part of the caller's transaction.
+
+    :param entries: (entry_id, category_id, data) of created or updated entries.
+    :param replace: Deletes previously stored values first (required for updates).
+    :return: The written values as {entry_id: {label: value}}.
+    """
+    entries = list(entries)
+    if not entries:
+        return {}
+
+    if replace:
+        db.execute(delete(models.EntryValue).where(models.EntryValue.entry_id.in_([e[0] for e in entries])))
+
+    fields = fields_of_type(db, {category_id for _, category_id, _ in entries})
+    rows, written = [], {}
+    for entry_id, category_id, data in entries:
+        for label, field_id in fields.get(category_id, {}).items():
+            number = to_number((data or {}).get(label))
+            if number is not None:
+                rows.append({"entry_id": entry_id, "category_field_id": field_id, "num_value": number})
+                written.setdefault(entry_id, {})[label] = number
+
+    if rows:
+        db.execute(insert(models.EntryValue), rows)
+    return written
+
+
+def range_predicate(entry_id_column, label: str, op: str, number: float):
+    """
+    EXISTS clause for 'label op number' on the typed values (served by ix_entry_value_field_value).
+
+    :param op: One of 'gt', 'gte', 'lt' or 'lte'.
+    """
+    value = models.EntryValue.num_value
+    comparison = {"gt": value > number, "gte": value >= number, "lt": value < number, "lte": value <= number}[op]
+
+    return exists().where(
+        models.EntryValue.entry_id == entry_id_column,
+        models.EntryValue.category_field_id == models.CategoryField.id,
+        models.CategoryField.label == label,
+        comparison
+    )
+
+
+def backfill(db: Session) -> int:
+    """
+    Rebuilds the typed values of all entries (one-off after the upgrade, or for repairs).
+
+    :return: Number of processed entries.
+    """
+    db.execute(delete(models.EntryValue))
+    processed, last_id = 0, 0
+
+    while True:
+        batch = db.execute(
+            select(models.Entry.id, models.Entry.category_id, models.Entry.data)
+            .where(models.Entry.id > last_id).order_by(models.Entry.id).limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not batch:
+            break
+
+        write_entry_values(db, [tuple(row) for row in batch], replace=False)
+        processed += len(batch)
+        last_id = batch[-1].id
+
+    db.commit()
+    return processed
@@ -0,0 +1,60 @@
+"""
+Streaming export module.
+Converts entry rows into CSV or NDJSON chunks while they are read from a server-side
+cursor, so memory usage stays constant regardless of the size of a user's history.
+"""
+import csv
+import io
+import json
+from typing import Iterable, Iterator, List
+
+
+# Fixed leading columns of the CSV export, followed by one column per field label
+CSV_BASE_COLUMNS = ["id", "category_id", "occurred_at", "note"]
+
+
+def iter_csv(partitions: Iterable, labels: List[str]) -> Iterator[str]:
+    """
+    Yields the CSV export chunk by chunk (one chunk per fetched partition of rows).
+
+    :param partitions: Batches of (id, category_id, occurred_at, note, data) rows.
+    :param labels: Field labels used as additional columns (from CategoryField).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # Header is sent immediately, before the first row has been fetched
+    writer.writerow(CSV_BASE_COLUMNS + labels)
+    yield buffer.getvalue()
+
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+
+        for row in rows:
+            data = row.data or {}
+            writer.writerow(
+                [row.id, row.category_id, row.occurred_at.isoformat(), row.note or ""]
+                + [data.get(label, "") for label in labels]
+            )
+
+        yield buffer.getvalue()
+
+
+def iter_ndjson(partitions: Iterable) -> Iterator[str]:
+    """
+    Yields the export as newline-delimited JSON (one entry object per line).
+
+    :param partitions: Batches of (id, category_id, occurred_at, note, data) rows.
+    """
+    for rows in partitions:
+        yield "".join(
+            json.dumps({
+                "id": row.id,
+                "category_id": row.category_id,
+                "occurred_at": row.occurred_at.isoformat(),
+                "note": row.note,
+                "data": row.data or {}
+            }, ensure_ascii=False) + "\n"
+            for row in rows
+        )
@@ -0,0 +1,141 @@
+"""
+Field value statistics module.
+Maintains 'field_value_stat' (how often every distinct value of a 'text' field was used and
+when it was used last) inside the transactions that create, change or delete entries.
+Serves the autocomplete suggestions without scanning the JSON data of the entries.
+"""
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import app.models as models
+from app.entry_values import fields_of_type
+
+
+# Longer values (e.g. free text) are not suggested and not counted
+MAX_VALUE_LENGTH = 100
+
+# Entries loaded per batch by the rebuild
+REBUILD_BATCH_SIZE = 1000
+
+# Text values of one entry: (category_id, data, occurred_at)
+Usage = Tuple[int, dict, datetime]
+
+
+def normalize(value: str) -> str:
+    """Case-insensitive form of a value used for prefix matching."""
+    return value.casefold()
+
+
+def count_usages(db: Session, items: Iterable[Usage], counts: dict, sign: int = 1):
+    """
+    Adds the text values of the given entries to 'counts'.
+
+    :param counts: {(category_field_id, value): [count delta, last used]}, updated in place.
+    """
+    items = list(items)
+    fields = fields_of_type(db, {category_id for category_id, _, _ in items}, "text")
+
+    for category_id, data, occurred_at in items:
+        for label, field_id in fields.get(category_id, {}).items():
+            value = (data or {}).get(label)
+            if not isinstance(value, str):
+                continue
+            value = value.strip()
+            if not value or len(value) > MAX_VALUE_LENGTH:
+                continue
+
+            entry = counts.setdefault((field_id, value), [0, None])
+            entry[0] += sign
+            if sign > 0 and (entry[1] is None or occurred_at > entry[1]):
+                entry[1] = occurred_at
+
+
+def upsert_counts(db: Session, counts: dict):
+    """Adds positive count deltas with a single upsert statement (keeps the latest usage)."""
+    s = models.FieldValueStat
+    postgres = db.get_bind().dialect.name == "postgresql"
+    upper = func.greatest if postgres else func.max
+
+    rows = [
+        {"category_field_id": field_id, "value": value, "normalized": normalize(value),
+         "count": delta, "last_used": last_used}
+        for (field_id, value), (delta, last_used) in counts.items() if delta > 0
+    ]
+
+    if not rows:
+        return
+
+    # Executemany of one cached statement (see rollups.add_to_rollup)
+    stmt = (pg_insert if postgres else sqlite_insert)(s.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[s.category_field_id, s.value],
+        set_={"count": s.count + stmt.excluded.count, "last_used": upper(s.last_used, stmt.excluded.last_used)}
+    )
+    db.execute(stmt, rows)
+
+
+def record_field_values(db: Session, added: Iterable[Usage] = (), removed: Iterable[Usage] = ()):
+    """
+    Counts the text values of new (or changed) entries and uncounts those of deleted entries
+    (or of the previous state of changed entries). Only the net difference per value is written,
+    so an update that keeps its values touches no rows. Values nobody uses anymore are deleted.
+    Runs inside the caller's transaction.
+    """
+    counts = {}
+    count_usages(db, added, counts)
+    count_usages(db, removed, counts, sign=-1)
+
+    upsert_counts(db, counts)
+
+    s = models.FieldValueStat
+    decreased = [(key, -delta) for key, (delta, _) in counts.items() if delta < 0]
+    for (field_id, value), delta in decreased:
+        db.execute(update(s).where(s.category_field_id == field_id, s.value == value)
+                   .values(count=s.count - delta))
+    if decreased:
+        db.execute(delete(s).where(s.category_field_id.in_({field_id for (field_id, _), _ in decreased}),
+                                   s.count <= 0))
+
+
+def top_values(db: Session, category_field_id: int, prefix: Optional[str] = None, limit: int = 10):
+    """
+    Most frequent values of a field, optionally starting with a prefix (case-insensitive).
+    Ties are ordered by the most recent usage.
+    """
+    s = models.FieldValueStat
+    query = select(s.value, s.count).where(s.category_field_id == category_field_id)
+
+    if prefix:
+        query = query.where(s.normalized.startswith(normalize(prefix), autoescape=True))
+
+    return db.execute(query.order_by(s.count.desc(), s.last_used.desc(), s.value).limit(limit)).all()
+
+
+def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recomputes the statistics from the entries (all users or a single user).
+
+    :return: Number of distinct values written.
+    """
+    s = models.FieldValueStat
+    cleanup = delete(s)
+    source = select(models.Entry.category_id, models.Entry.data, models.Entry.occurred_at)
+
+    if user_id is not None:
+        categories = select(models.Category.id).where(models.Category.user_id == user_id)
+        fields = select(models.CategoryField.id).where(models.CategoryField.category_id.in_(categories))
+        cleanup = cleanup.where(s.category_field_id.in_(fields))
+        source = source.where(models.Entry.user_id == user_id)
+
+    db.execute(cleanup)
+
+    counts = {}
+    for batch in db.execute(source.execution_options(yield_per=REBUILD_BATCH_SIZE)).partitions():
+        count_usages(db, batch, counts)
+
+    upsert_counts(db, counts)
+    db.commit()
+    return len(counts)
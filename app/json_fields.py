@@ -0,0 +1,85 @@
+"""
+Dialect-specific SQL expressions for the schemaless JSON column.
+Translates access to values inside 'Entry.data' into the native JSON functions of
+SQLite (json_extract) and PostgreSQL (JSONB containment), so filtering and date
+bucketing can run inside the database instead of the client.
+"""
+import math
+from typing import Optional
+from sqlalchemy import func, cast, not_, or_, Date, String, literal, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# Filter operators of GET /entries/ ('eq'/'ne' compare JSON values via json_predicate,
+# range operators the typed values in entry_value)
+FILTER_OPERATORS = ["eq", "ne", "gt", "gte", "lt", "lte"]
+
+
+def json_path(key: str) -> str:
+    """Builds a SQLite JSON path for a top-level key (quoted to allow spaces and umlauts)."""
+    return '$."' + key.replace('"', '\\"') + '"'
+
+
+def json_path_literal(key: str):
+    """
+    Renders the JSON path as inline SQL string literal instead of a bound parameter.
+    SQLite only uses an expression index if the indexed expression matches literally.
+    """
+    return literal_column("'" + json_path(key).replace("'", "''") + "'", String)
+
+
+def parse_number(value: str) -> Optional[float]:
+    """Parses a filter value as number, or returns None for non-numeric text."""
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(number):
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def json_predicate(column, key: str, op: str, value: str, dialect: str):
+    """
+    Compiles an equality filter on a top-level value into an index-friendly WHERE clause.
+    The raw value is compared; numbers also match numeric strings (as stored by the
+    frontend). PostgreSQL uses JSONB containment (served by the GIN index), SQLite the
+    json_extract expression (served by the expression indexes of ENTRY_INDEXED_FIELDS).
+
+    :param op: 'eq' or 'ne'.
+    """
+    number = parse_number(value)
+    candidates = [value] if number is None else [value, number]
+
+    if dialect == "postgresql":
+        matches = or_(*[column.op("@>")(literal({key: c}, JSONB)) for c in candidates])
+        # Entries without the key are never part of the result (as with SQL NULL semantics)
+        return matches if op == "eq" else column.op("?")(literal(key)) & not_(matches)
+
+    raw = func.json_extract(column, json_path_literal(key))
+    return raw.in_(candidates) if op == "eq" else raw.not_in(candidates)
+
+
+def date_bucket(column, bucket: str, dialect: str):
+    """
+    Truncates a timestamp to the first day of its bucket and renders it as 'YYYY-MM-DD'.
+    Weeks start on Monday (ISO 8601) for both dialects.
+
+    :param bucket: One of 'day', 'week' or 'month' (validated by the route).
+    """
+    if dialect == "postgresql":
+        # Constants are rendered inline so the expression is identical in SELECT and GROUP BY
+        return func.to_char(func.date_trunc(literal_column(f"'{bucket}'"), column), literal_column("'YYYY-MM-DD'"))
+
+    if bucket == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.strftime("%Y-%m-01", column)
+    return func.date(column)
+
+
+def day_of(column, dialect: str):
+    """Truncates a timestamp to its calendar day (as DATE, comparable with date parameters)."""
+    if dialect == "postgresql":
+        return cast(column, Date)
+    return func.date(column, type_=Date)
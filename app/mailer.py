@@ -0,0 +1,243 @@
+"""
+Email delivery module.
+Implements a transactional outbox for outgoing emails: routes only insert a row into
+'email_outbox' as part of their transaction, and a background worker started from the
+app lifespan delivers queued messages over one reused SMTP connection, retrying failed
+deliveries with exponential backoff.
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from email.message import EmailMessage
+from typing import List, Optional
+import aiosmtplib
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, sessionmaker
+import app.models as models
+
+
+logger = logging.getLogger(__name__)
+
+# Messages delivered per claim; the SMTP connection stays open while batches are full
+OUTBOX_BATCH_SIZE = 50
+
+# Interval in which the worker checks for due retries when it is not woken up explicitly
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "10"))
+
+# Delivery attempts before a message is given up and marked as 'failed'
+OUTBOX_MAX_ATTEMPTS = 8
+
+# Sent and given-up messages (including their verification codes) are purged after this many days
+OUTBOX_RETENTION = timedelta(days=int(os.getenv("OUTBOX_RETENTION_DAYS", "7")))
+
+# Backoff between attempts: 30s, 1min, 2min, ... capped at one hour
+RETRY_BASE_DELAY = timedelta(seconds=30)
+RETRY_MAX_DELAY = timedelta(hours=1)
+
+# A claimed message is hidden from other workers (processes) for this long
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+@dataclass(frozen=True)
+class SmtpSettings:
+    """Connection parameters of the SMTP server."""
+    hostname: str
+    port: int
+    username: Optional[str] = None
+    password: Optional[str] = None
+    sender: Optional[str] = None
+    start_tls: bool = False
+    use_tls: bool = False
+    validate_certs: bool = True
+
+    @classmethod
+    def from_env(cls) -> "SmtpSettings":
+        """Reads the settings from the environment (defaults match the Gmail setup)."""
+        username = os.getenv("MAIL_USERNAME")
+        return cls(
+            hostname=os.getenv("MAIL_SERVER", "smtp.gmail.com"),
+            port=int(os.getenv("MAIL_PORT", "587")),
+            username=username,
+            password=os.getenv("MAIL_PASSWORD"),
+            sender=os.getenv("MAIL_FROM", username),
+            start_tls=os.getenv("MAIL_STARTTLS", "True") == "True",
+            use_tls=os.getenv("MAIL_SSL_TLS", "False") == "True",
+            validate_certs=os.getenv("MAIL_VALIDATE_CERTS", "False") == "True"
+        )
+
+
+@dataclass(frozen=True)
+class QueuedMail:
+    """Detached copy of a claimed outbox row."""
+    id: int
+    recipient: str
+    subject: str
+    body: str
+    attempts: int
+
+
+def enqueue(db: Session, recipient: str, subject: str, html: str):
+    """
+    Queues an HTML email. The caller commits it together with its own changes,
+    so a message is only sent if the triggering transaction succeeded.
+    """
+    db.add(models.EmailOutbox(recipient=recipient, subject=subject, body=html))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Returns the backoff before the next attempt after the given number of failed attempts."""
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+def claim_due(session_factory: sessionmaker, limit: int = OUTBOX_BATCH_SIZE) -> List[QueuedMail]:
+    """
+    Claims due messages by moving their next attempt behind the lease.
+    The conditional UPDATE ensures that concurrent workers never claim the same row.
+    """
+    now = datetime.now(UTC)
+    claimed = []
+
+    with session_factory() as db:
+        rows = db.execute(
+            select(models.EmailOutbox.id, models.EmailOutbox.recipient, models.EmailOutbox.subject,
+                   models.EmailOutbox.body, models.EmailOutbox.attempts, models.EmailOutbox.next_attempt_at)
+            .where(models.EmailOutbox.status == "pending", models.EmailOutbox.next_attempt_at <= now)
+            .order_by(models.EmailOutbox.next_attempt_at, models.EmailOutbox.id)
+            .limit(limit)
+        ).all()
+
+        for row in rows:
+            result = db.execute(
+                update(models.EmailOutbox)
+                .where(models.EmailOutbox.id == row.id, models.EmailOutbox.next_attempt_at == row.next_attempt_at)
+                .values(next_attempt_at=now + CLAIM_LEASE)
+            )
+            if result.rowcount == 1:
+                claimed.append(QueuedMail(row.id, row.recipient, row.subject, row.body, row.attempts))
+
+        db.commit()
+
+    return claimed
+
+
+def mark_sent(session_factory: sessionmaker, mail_id: int):
+    """Marks a message as delivered."""
+    with session_factory() as db:
+        db.execute(update(models.EmailOutbox).where(models.EmailOutbox.id == mail_id).values(
+            status="sent", attempts=models.EmailOutbox.attempts + 1, sent_at=datetime.now(UTC), last_error=None))
+        db.commit()
+
+
+def mark_failed(session_factory: sessionmaker, mail: QueuedMail, error: str):
+    """Schedules the next attempt with backoff, or gives the message up after the last attempt."""
+    attempts = mail.attempts + 1
+    values = {"attempts": attempts, "last_error": error}
+
+    if attempts >= OUTBOX_MAX_ATTEMPTS:
+        values["status"] = "failed"
+    else:
+        values["next_attempt_at"] = datetime.now(UTC) + retry_delay(attempts)
+
+    with session_factory() as db:
+        db.execute(update(models.EmailOutbox).where(models.EmailOutbox.id == mail.id).values(**values))
+        db.commit()
+
+
+class OutboxWorker:
+    """
+    Background task delivering the outbox.
+    Keeps a single SMTP connection open while messages are queued and closes it when idle.
+    """
+
+    def __init__(self, session_factory: sessionmaker, settings: SmtpSettings):
+        self.session_factory = session_factory
+        self.settings = settings
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Starts the worker loop on the running event loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancels the worker loop and closes the SMTP connection."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._disconnect()
+
+    def notify(self):
+        """Wakes the worker up immediately (e.g. after a message was committed)."""
+        self._wake.set()
+
+    async def process_due(self) -> int:
+        """
+        Delivers one batch of due messages.
+
+        :return: Number of claimed messages (delivered or rescheduled).
+        """
+        messages = await asyncio.to_thread(claim_due, self.session_factory)
+
+        for mail in messages:
+            try:
+                smtp = await self._connection()
+                await smtp.send_message(self._build(mail))
+            except (aiosmtplib.SMTPException, OSError) as e:
+                # The connection state is unknown after an error, so the next message reconnects
+                await self._disconnect()
+                logger.warning("Delivery of outbox message %s failed: %s", mail.id, e)
+                await asyncio.to_thread(mark_failed, self.session_factory, mail, str(e))
+            else:
+                await asyncio.to_thread(mark_sent, self.session_factory, mail.id)
+
+        return len(messages)
+
+    async def _run(self):
+        while True:
+            try:
+                if await self.process_due() == OUTBOX_BATCH_SIZE:
+                    continue  # More messages are waiting, keep the connection busy
+            except Exception:
+                logger.exception("Outbox worker iteration failed")
+
+            await self._disconnect()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _connection(self) -> aiosmtplib.SMTP:
+        """Returns the open SMTP connection, connecting (and logging in) on first use."""
+        if self._smtp is None or not self._smtp.is_connected:
+            s = self.settings
+            smtp = aiosmtplib.SMTP(hostname=s.hostname, port=s.port, use_tls=s.use_tls,
+                                   start_tls=s.start_tls, validate_certs=s.validate_certs)
+            await smtp.connect()
+            if s.username:
+                await smtp.login(s.username, s.password)
+            self._smtp = smtp
+        return self._smtp
+
+    async def _disconnect(self):
+        if self._smtp is not None:
+            try:
+                if self._smtp.is_connected:
+                    await self._smtp.quit()
+            except (aiosmtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+    def _build(self, mail: QueuedMail) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.settings.sender or self.settings.username or "lifetracker@localhost"
+        message["To"] = mail.recipient
+        message["Subject"] = mail.subject
+        message.set_content(mail.body, subtype="html")
+        return message
@@ -5,18 +5,41 @@ Acts as the central controller for authentication, user management, categories,
 """
 import string
 import os
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from dotenv import load_dotenv
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy.orm import Session, selectinload
 import uuid
 import random
 from datetime import datetime, timedelta, UTC
-from typing import List, Optional
-from app.database import engine, get_db, Base
-from app.auth import get_current_user, get_password_hash, verify_password
+from typing import List, Literal, Optional
+from app.database import SessionLocal, db_route, engine, get_db, get_session_factory
+from app.auth import (CurrentUser, get_current_user, get_password_hash, get_password_hash_async, invalidate_user,
+                      token_cache, verify_password)
+from app.caching import bump_data_version, conditional_get
+from app.default_categories import seed_default_categories
+from app.deletion import (DELETION_JOB_THRESHOLD, count_entries, create_job, delete_category as delete_category_rows,
+                          delete_users, run_job)
+from app.export import iter_csv, iter_ndjson
+from app.field_values import record_field_values, top_values
+from app.entry_values import range_predicate, stored_values, write_entry_values
+from app.json_fields import FILTER_OPERATORS, date_bucket, json_predicate, parse_number
+from app.mailer import OutboxWorker, SmtpSettings, enqueue
+from app.maintenance import MaintenanceScheduler
+from app.migrations import upgrade as upgrade_schema
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, after_cursor, encode_cursor
+from app.rollups import add_to_rollup, covers_whole_days, rollup_series, subtract_from_rollup
+from app.search import apply_search, search_terms
+from app.static_assets import SpaStaticFiles
+from app.serialization import category_dicts, entry_dicts, fast_json
+from app.sync import changes_since, encode_token
 import app.models as models
 import app.schemas as schemas
 
@@ -25,25 +48,36 @@ import app.schemas as schemas
 load_dotenv()
 
 # Database Initialization: Programmatically generate all tables defined in models.py
-Base.metadata.create_all(bind=engine)
+# and add missing indexes to tables of existing deployments
+upgrade_schema(engine)
+
+
+# Periodic purge of expired sessions, unverified accounts and old tombstones (see app/maintenance.py)
+MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "True") == "True"
+
+# API responses smaller than this (bytes) are sent uncompressed
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts the email outbox worker and the maintenance scheduler and stops them on shutdown."""
+    app.state.outbox_worker = OutboxWorker(SessionLocal, SmtpSettings.from_env())
+    app.state.outbox_worker.start()
+
+    app.state.maintenance = MaintenanceScheduler(SessionLocal) if MAINTENANCE_ENABLED else None
+    if app.state.maintenance:
+        app.state.maintenance.start()
+
+    yield
+
+    if app.state.maintenance:
+        await app.state.maintenance.stop()
+    await app.state.outbox_worker.stop()
+
 
 # App binding
-app = FastAPI(title="Lifetracker API", version="1.0.0")
-
-# --- Mail Configuration ---
-
-# Configuration for the fastapi-mail module to handle asynchronous double opt-in emails
-conf = ConnectionConfig(
-    MAIL_USERNAME = os.getenv("MAIL_USERNAME"),
-    MAIL_PASSWORD = os.getenv("MAIL_PASSWORD"),
-    MAIL_FROM = os.getenv("MAIL_USERNAME"),
-    MAIL_PORT = 587,
-    MAIL_SERVER = "smtp.gmail.com",
-    MAIL_STARTTLS = True,
-    MAIL_SSL_TLS = False,
-    USE_CREDENTIALS = True,
-    VALIDATE_CERTS = False
-)
+app = FastAPI(title="Lifetracker API", version="1.0.0", lifespan=lifespan)
 
 # Feature toggle for local development vs. production environment
 EMAIL_VERIFICATION_ENABLED = os.getenv("EMAIL_VERIFICATION_ENABLED", "True") == "True"
@@ -60,85 +94,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Gzip for larger responses (entry lists, exports); level 6 balances CPU time and size.
+# Static assets are precompressed at startup and pass through unchanged.
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE, compresslevel=6)
+
 
 # --- Helper ---
 
-def create_defaults_for_user(user_id: int, db: Session):
+def owned_by(user_id: int):
     """
-    Populates the database with default tracking categories and associated fields for a new user.
-    Ensures an immediate onboarding experience without requiring manual setup by the user.
-    System defaults cannot be deleted by the user to ensure basic analytical integrity.
+    WHERE clause for the categories of a user. Categories that are being deleted by a
+    background job are excluded, so they can neither be listed nor written to.
     """
-    # Fitness
-    cat_fit = models.Category(
-        user_id=user_id,
-        name="🚴 Fitness",
-        description="Hier kannst du dein Training tracken.",
-        is_system_default=True
-    )
-    db.add(cat_fit)
-    db.commit()
-
-    # Define and add standard metrics for Fitness
-    db.add(models.CategoryField(category_id=cat_fit.id, label="Übung", data_type="text"))
-    db.add(models.CategoryField(category_id=cat_fit.id, label="Dauer", data_type="number", unit="Minuten"))
-    db.add(models.CategoryField(category_id=cat_fit.id, label="Strecke", data_type="number", unit="km"))
-    db.add(models.CategoryField(category_id=cat_fit.id, label="Gewicht", data_type="number", unit="kg"))
-    db.add(models.CategoryField(category_id=cat_fit.id, label="Energie", data_type="number", unit="kcal"))
-
-    # Nutrition
-    cat_fit = models.Category(
-        user_id=user_id,
-        name="🍎 Ernährung",
-        description="Hier kannst du deine Ernährung tracken.",
-        is_system_default=True
-    )
-    db.add(cat_fit)
-    db.commit()
-
-    # Define and add nutrition fields
-    db.add(models.CategoryField(category_id=cat_fit.id, label="Lebensmittel", data_type="text"))
-    db.add(models.CategoryField(category_id=cat_fit.id, label="Gewicht", data_type="number", unit="g"))
-    db.add(models.CategoryField(category_id=cat_fit.id, label="Energie", data_type="number", unit="kcal"))
-    db.commit()
-
-    # Diary / Mood
-    cat_diary = models.Category(
-        user_id=user_id,
-        name="📖 Tagebuch",
-        description="Hier kannst du deine Stimmung tracken.",
-        is_system_default=True
-    )
-    db.add(cat_diary)
-    db.commit()
+    return and_(models.Category.user_id == user_id, models.Category.pending_deletion == False)
 
-    # Define and add diary fields
-    db.add(models.CategoryField(category_id=cat_diary.id, label="Laune", data_type="number", unit="/10"))
-    db.add(models.CategoryField(category_id=cat_diary.id, label="Highlight", data_type="text"))
-    db.commit()
 
-    # Sleep
-    cat_diary = models.Category(
-        user_id=user_id,
-        name="💤 Schlaf",
-        description="Hier kannst du deinen Schlaf tracken.",
-        is_system_default=True
-    )
-    db.add(cat_diary)
-    db.commit()
+def visible_entries(user_id: int):
+    """WHERE clause for the entries of a user, without those of categories that are being deleted."""
+    pending = select(models.Category.id).where(models.Category.user_id == user_id,
+                                               models.Category.pending_deletion == True)
+    return and_(models.Entry.user_id == user_id, models.Entry.category_id.notin_(pending))
 
-    # Define and add sleep fields
-    db.add(models.CategoryField(category_id=cat_diary.id, label="Dauer", data_type="number", unit="Stunden"))
-    db.add(models.CategoryField(category_id=cat_diary.id, label="Erholung", data_type="number", unit="/10"))
-    db.commit()
 
+def categories_of(user_id: int, db: Session):
+    """
+    Base query for the categories of a user. Fields are loaded eagerly with one additional
+    SELECT for all categories, instead of one lazy load per category during serialization.
+    """
+    return db.query(models.Category).options(selectinload(models.Category.fields)).filter(owned_by(user_id))
 
-# --- Authentication routes (public) ---
 
-@app.post("/register", response_model=schemas.LoginSuccess)
-async def register(user_data: schemas.UserRegister, db: Session = Depends(get_db)):
+def release_stale_registration(user_data: schemas.UserRegister, db: Session):
     """
-    Handles user registration.
+    Rejects registrations that collide with an existing account.
     Implements security measures against duplicate accounts and handles stale, unverified registrations.
     """
     existing_user = db.query(models.User).filter(
@@ -165,20 +153,24 @@ async def register(user_data: schemas.UserRegister, db: Session = Depends(get_db
 
             # If registration is expired, delete old user and allow new registration
             if created_at_utc < expiry_limit:
-                db.delete(existing_user)
+                delete_users(db, [existing_user.id])
                 db.commit()
 
             # If registration is not expired, reject registration and ask user to check email or wait
             else:
                 raise HTTPException(400, detail="Registrierung wurde gestartet. Bitte E-Mails überprüfen oder 15 Minuten warten.")
 
-    # Email verification
-    is_active_status = True
+
+def persist_registration(user_data: schemas.UserRegister, password_hash: str, db: Session) -> dict:
+    """
+    Stores the new user with its default categories and, if verification is disabled,
+    opens the first session. Otherwise the verification email is queued in the outbox.
+    Everything is written in a single transaction with a constant number of statements.
+    """
     verification_code = None
 
     # Double opt-in logic
     if EMAIL_VERIFICATION_ENABLED:
-        is_active_status = False
         verification_code = ''.join(random.choices(string.digits, k=6))
 
         html_content = f"""
@@ -187,40 +179,29 @@ async def register(user_data: schemas.UserRegister, db: Session = Depends(get_db
                 <h2 style="background: #eee; padding: 10px; display: inline-block;">{verification_code}</h2>
                 <p>Bitte gib diesen Code in der App ein.</p>
                 """
+        enqueue(db, user_data.email, "Dein Lifetracker Code", html_content)
 
-        message = MessageSchema(
-            subject="Dein Lifetracker Code",
-            recipients=[user_data.email],
-            body=html_content,
-            subtype=MessageType.html
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message)
-
-    # Persist new user
     new_user = models.User(
         name=user_data.name,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
-        is_active = is_active_status,
+        password_hash=password_hash,
+        is_active = not EMAIL_VERIFICATION_ENABLED,
         verification_code=verification_code
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    db.flush() # Assigns the user ID for the default categories
 
-    # Trigger default category generation
-    create_defaults_for_user(new_user.id, db)
+    seed_default_categories(db, new_user.id)
 
     # Return immediately if verification is required
     if EMAIL_VERIFICATION_ENABLED:
+        db.commit()
         return {
             "success": True,
             "message": "Bitte E-Mail prüfen und Code eingeben.",
             "token": None,
-            "name": new_user.name
+            "name": user_data.name
         }
 
     # Direct login if verification is disabled
@@ -229,7 +210,31 @@ async def register(user_data: schemas.UserRegister, db: Session = Depends(get_db
     db.add(models.Session(token=token, user_id=new_user.id, expires_at=expires))
     db.commit()
 
-    return {"success": True, "token": token, "name": new_user.name}
+    return {"success": True, "token": token, "name": user_data.name}
+
+
+# --- Authentication routes (public) ---
+
+@app.post("/register", response_model=schemas.LoginSuccess)
+async def register(user_data: schemas.UserRegister, request: Request, db: Session = Depends(get_db)):
+    """
+    Handles user registration.
+    Blocking work never runs on the event loop: database access is delegated to the
+    threadpool and Argon2 hashing to the bounded hashing executor. The verification
+    email is delivered by the outbox worker, so the response does not wait for SMTP.
+    """
+    await run_in_threadpool(release_stale_registration, user_data, db)
+
+    # Persist new user
+    password_hash = await get_password_hash_async(user_data.password)
+    result = await run_in_threadpool(persist_registration, user_data, password_hash, db)
+
+    # Deliver the queued verification email right away instead of at the next poll
+    worker = getattr(request.app.state, "outbox_worker", None)
+    if EMAIL_VERIFICATION_ENABLED and worker:
+        worker.notify()
+
+    return result
 
 
 @app.post("/verify")
@@ -275,20 +280,20 @@ def login(user_data: schemas.UserLogin, db: Session = Depends(get_db)):
 
 # --- User routes ---
 
-@app.get("/user", response_model=schemas.UserOut)
-def get_user_profile(user: models.User = Depends(get_current_user)):
+@app.get("/user", response_model=schemas.UserOut, dependencies=[Depends(conditional_get)])
+def get_user_profile(db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
     """Returns the authenticated user's profile data."""
-    return user
+    return db.get(models.User, user.id)
 
 
 @app.put("/user", response_model=schemas.UserOut)
 def update_user_profile(
         user_data: schemas.UserUpdate,
         db: Session = Depends(get_db),
-        current_user: models.User = Depends(get_current_user)
+        current_user: CurrentUser = Depends(get_current_user)
 ):
     """Allows partial updates to the user profile while preventing constraint violations."""
-    user_in_db = db.query(models.User).filter(models.User.id == current_user.id).first()
+    user_in_db = db.get(models.User, current_user.id)
 
     if not user_in_db:
         raise HTTPException(404, "Benutzer nicht gefunden!")
@@ -308,39 +313,73 @@ def update_user_profile(
     if user_data.password:
         user_in_db.password_hash = get_password_hash(user_data.password)
 
+    bump_data_version(db, user_in_db.id)
     db.commit()
+    invalidate_user(user_in_db.id)
     db.refresh(user_in_db)
     return user_in_db
 
 
 @app.delete("/user")
-def delete_user_account(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def delete_user_account(
+        response: Response,
+        background_tasks: BackgroundTasks,
+        db: Session = Depends(get_db),
+        session_factory=Depends(get_session_factory),
+        current_user: CurrentUser = Depends(get_current_user)
+):
     """
-    Deletes the user account.
-    Triggers cascading deletes in the database for all associated categories, fields, and entries.
+    Deletes the user account with all associated categories, fields, and entries.
+    Accounts with many entries are deactivated and logged out immediately and removed by a
+    background job in batches (202 with the job ID).
     """
-    user_to_delete = db.query(models.User).filter(models.User.id == current_user.id).first()
+    total = count_entries(db, "user", current_user.id)
 
-    if user_to_delete:
-        db.delete(user_to_delete)
+    if total <= DELETION_JOB_THRESHOLD:
+        delete_users(db, [current_user.id])
         db.commit()
+        invalidate_user(current_user.id)
+        return {"status": "deleted", "id": current_user.id}
 
-    return {"status": "deleted", "id": current_user.id}
+    job = create_job(db, current_user.id, "user", current_user.id, total)
+    db.query(models.User).filter(models.User.id == current_user.id).update({"is_active": False})
+    db.query(models.Session).filter(models.Session.user_id == current_user.id).delete(synchronize_session=False)
+    db.commit()
+    invalidate_user(current_user.id)
+
+    background_tasks.add_task(run_job, session_factory, job.id)
+    response.status_code = 202
+    return {"status": "pending", "id": current_user.id, "job_id": job.id}
 
 
 # --- Category routes ---
 
-@app.get("/categories/", response_model=List[schemas.CategoryOut])
-def get_categories(db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
-    """Retrieves all tracking categories belonging to the authenticated user."""
-    return db.query(models.Category).filter(models.Category.user_id == user.id).order_by(models.Category.id).all()
+@app.get("/categories/", response_model=List[schemas.CategoryOut], dependencies=[Depends(conditional_get)])
+@db_route
+def get_categories(response: Response, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
+    """
+    Retrieves all tracking categories belonging to the authenticated user.
+    Selects plain columns (categories, then all their fields) and encodes them without ORM objects.
+    """
+    categories = db.execute(
+        select(models.Category.id, models.Category.name, models.Category.description,
+               models.Category.is_system_default)
+        .where(owned_by(user.id)).order_by(models.Category.id)
+    ).all()
+    fields = db.execute(
+        select(models.CategoryField.category_id, models.CategoryField.label, models.CategoryField.data_type,
+               models.CategoryField.unit)
+        .join(models.Category).where(owned_by(user.id)).order_by(models.CategoryField.id)
+    ).all()
+    return fast_json(category_dicts(categories, fields), response)
 
 
 @app.post("/categories/", response_model=schemas.CategoryOut)
+@db_route
 def create_category(
         cat: schemas.CategoryCreate,
         db: Session = Depends(get_db),
-        user: models.User = Depends(get_current_user)
+        user: CurrentUser = Depends(get_current_user)
 ):
     """Creates a new tracking category and its associated dynamically defined fields."""
     db_cat = models.Category(name=cat.name, description=cat.description, user_id=user.id)
@@ -351,23 +390,25 @@ def create_category(
     # Process and append nested field definitions
     for f in cat.fields:
         db.add(models.CategoryField(category_id=db_cat.id, label=f.label, data_type=f.data_type, unit=f.unit))
+    bump_data_version(db, user.id)
     db.commit()
-    db.refresh(db_cat)
 
-    return db_cat
+    # Reloaded with its fields, so the response needs no lazy load
+    return categories_of(user.id, db).filter(models.Category.id == db_cat.id).one()
 
 
 @app.put("/categories/{category_id}", response_model=schemas.CategoryOut)
+@db_route
 def update_category(
         category_id: int,
         cat_update: schemas.CategoryUpdate,
         db: Session = Depends(get_db),
-        user: models.User = Depends(get_current_user)
+        user: CurrentUser = Depends(get_current_user)
 ):
     """Updates category metadata. Blocks modifications to system categories."""
 
     cat = db.query(models.Category).filter(models.Category.id == category_id,
-                                           models.Category.user_id == user.id).first()
+                                           owned_by(user.id)).first()
 
     if not cat: raise HTTPException(404, "Category not found")
 
@@ -382,17 +423,29 @@ def update_category(
     if cat_update.description is not None:
         cat.description = cat_update.description
 
+    bump_data_version(db, user.id)
     db.commit()
-    db.refresh(cat)
 
-    return cat
+    # Reloaded with its fields, so the response needs no lazy load
+    return categories_of(user.id, db).filter(models.Category.id == category_id).one()
 
 
 @app.delete("/categories/{category_id}")
-def delete_category(category_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
-    """Deletes a category. Blocks deletion of core system categories."""
+@db_route
+def delete_category(
+        category_id: int,
+        response: Response,
+        background_tasks: BackgroundTasks,
+        db: Session = Depends(get_db),
+        session_factory=Depends(get_session_factory),
+        user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Deletes a category with its fields and entries. Blocks deletion of core system categories.
+    Categories with many entries are removed by a background job in batches (202 with the job ID).
+    """
     cat = db.query(models.Category).filter(models.Category.id == category_id,
-                                           models.Category.user_id == user.id).first()
+                                           owned_by(user.id)).first()
 
     if not cat: raise HTTPException(404, "Not found")
 
@@ -401,48 +454,309 @@ def delete_category(category_id: int, db: Session = Depends(get_db), user: model
         raise HTTPException(status_code=400,
                             detail="Standard-Kategorien können nicht gelöscht werden, da sie für die Auswertung benötigt werden.")
 
-    db.delete(cat) # Cascading delete automatically removes fields and tracking entries
+    db.add(models.Tombstone(user_id=user.id, entity="category", entity_id=category_id))
+    bump_data_version(db, user.id)
+
+    total = count_entries(db, "category", category_id)
+    if total <= DELETION_JOB_THRESHOLD:
+        delete_category_rows(db, category_id) # Set-based: fields and entries are never loaded
+        db.commit()
+        return {"status": "deleted", "id": category_id}
+
+    # Hidden from all routes until the job has removed it
+    cat.pending_deletion = True
+    job = create_job(db, user.id, "category", category_id, total)
     db.commit()
 
-    return {"status": "deleted", "id": category_id}
+    background_tasks.add_task(run_job, session_factory, job.id)
+    response.status_code = 202
+    return {"status": "pending", "id": category_id, "job_id": job.id}
+
+
+@app.get("/categories/{category_id}/fields/{label}/values", response_model=List[schemas.FieldValueOut],
+         dependencies=[Depends(conditional_get)])
+@db_route
+def get_field_values(
+        category_id: int,
+        label: str,
+        prefix: Optional[str] = None,
+        limit: int = Query(10, ge=1, le=50),
+        db: Session = Depends(get_db),
+        user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Suggests values of a text field for autocompletion: the most frequently used values,
+    optionally starting with 'prefix' (case-insensitive). Read from the maintained value
+    statistics, so the entries themselves are not scanned.
+    """
+    field = db.query(models.CategoryField).join(models.Category).filter(
+        models.Category.id == category_id,
+        owned_by(user.id),
+        models.CategoryField.label == label
+    ).first()
+
+    if not field: raise HTTPException(404, "Field not found")
+
+    if field.data_type != "text":
+        raise HTTPException(400, "Vorschläge gibt es nur für Textfelder.")
+
+    return top_values(db, field.id, prefix, limit)
+
+
+@app.get("/deletions/{job_id}", response_model=schemas.DeletionJobOut)
+@db_route
+def get_deletion_job(job_id: int, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
+    """Reports the progress of a background deletion."""
+    job = db.query(models.DeletionJob).filter(models.DeletionJob.id == job_id,
+                                              models.DeletionJob.user_id == user.id).first()
+
+    if not job: raise HTTPException(404, "Deletion job not found")
+
+    return job
 
 
 # --- Entry routes ---
 
-@app.get("/entries/", response_model=List[schemas.EntryOut])
+@app.get("/entries/", response_model=schemas.EntryPage, dependencies=[Depends(conditional_get)])
+@db_route
 def get_entries(
+        response: Response,
         category_id: Optional[int] = None,
         start: Optional[datetime] = None,
         end: Optional[datetime] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        where: List[str] = Query([]),
         db: Session = Depends(get_db),
-        user: models.User = Depends(get_current_user)
+        user: CurrentUser = Depends(get_current_user)
 ):
     """
-    Retrieves tracking entries.
+    Retrieves tracking entries page by page (newest first).
     Supports optional query parameters for targeted data aggregation in the frontend.
+    The returned 'next_cursor' is passed back as 'cursor' to fetch the following page.
+    Values inside 'data' are filtered with repeatable 'where=label:op:value' predicates,
+    e.g. 'where=Übung:eq:Joggen&where=Energie:gt:500' (op: eq, ne, gt, gte, lt, lte).
     """
-    query = db.query(models.Entry).filter(models.Entry.user_id == user.id)
+    # Plain column tuples: no ORM objects and no per-row validation on the way out
+    query = db.query(models.Entry.id, models.Entry.category_id, models.Entry.occurred_at, models.Entry.note,
+                     models.Entry.data).filter(visible_entries(user.id))
 
     # Dynamic query building based on provided parameters
     if category_id: query = query.filter(models.Entry.category_id == category_id)
     if start: query = query.filter(models.Entry.occurred_at >= start)
     if end: query = query.filter(models.Entry.occurred_at <= end)
 
-    return query.order_by(models.Entry.occurred_at.desc()).all()
+    dialect = db.get_bind().dialect.name
+    for predicate in where:
+        query = query.filter(parse_where(predicate, dialect))
+
+    # Keyset condition: continue strictly after the last row of the previous page
+    keyset = after_cursor(models.Entry.occurred_at, models.Entry.id, cursor)
+    if keyset is not None: query = query.filter(keyset)
+
+    # Fetch one row more than requested to detect whether another page exists
+    rows = query.order_by(models.Entry.occurred_at.desc(), models.Entry.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].occurred_at, rows[-1].id)
+
+    return fast_json({"items": entry_dicts(rows), "next_cursor": next_cursor}, response)
+
+
+@app.get("/entries/search", response_model=List[schemas.EntryOut], dependencies=[Depends(conditional_get)])
+@db_route
+def search_entries(
+        q: str = Query(..., min_length=1, max_length=200),
+        category_id: Optional[int] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        db: Session = Depends(get_db),
+        user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Full-text search over the notes and text values of the user's entries, best matches first.
+    All words must occur; each word also matches as prefix ('pizz marg' finds 'Pizza Margherita').
+    """
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(400, "Parameter 'q' must contain at least one word")
+
+    query = db.query(models.Entry).filter(visible_entries(user.id))
+    if category_id: query = query.filter(models.Entry.category_id == category_id)
+
+    query = apply_search(query, models.Entry.id, terms, db.get_bind().dialect.name)
+    return query.order_by(models.Entry.occurred_at.desc()).limit(limit).all()
+
+
+def parse_where(predicate: str, dialect: str):
+    """
+    Translates a 'label:op:value' filter of GET /entries/ into a WHERE clause.
+    'eq'/'ne' compare the raw value inside Entry.data, range operators the typed values
+    of the 'number' fields (entry_value).
+
+    :raises HTTPException: On malformed predicates or non-numeric range values (400).
+    """
+    parts = predicate.split(":", 2)
+    if len(parts) != 3 or not parts[0] or parts[1] not in FILTER_OPERATORS:
+        raise HTTPException(400, f"Invalid filter '{predicate}', expected 'label:op:value' "
+                                 f"with op in {', '.join(FILTER_OPERATORS)}")
+
+    label, op, value = parts
+    if op in ("eq", "ne"):
+        return json_predicate(models.Entry.data, label, op, value, dialect)
+
+    number = parse_number(value)
+    if number is None:
+        raise HTTPException(400, f"Invalid filter '{predicate}': '{op}' requires a numeric value")
+    return range_predicate(models.Entry.id, label, op, number)
+
+
+# Aggregate functions available for reporting
+AGGREGATE_FUNCTIONS = {"sum": func.sum, "avg": func.avg, "min": func.min, "max": func.max, "count": func.count}
+
+
+@app.get("/entries/aggregate", response_model=schemas.AggregateSeries, dependencies=[Depends(conditional_get)])
+@db_route
+def aggregate_entries(
+        bucket: Literal["day", "week", "month"] = "day",
+        fn: Literal["sum", "avg", "min", "max", "count"] = "sum",
+        field: Optional[str] = None,
+        category_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        db: Session = Depends(get_db),
+        user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Aggregates a numeric field per category and time bucket.
+    Runs as GROUP BY inside the database and returns only the bucketed series for the charts.
+    Periods of whole days are read from the daily rollup (one row per day), other periods
+    from the typed values of the entries (entry_value).
+    Without 'field', only fn=count is allowed and counts the entries themselves.
+    """
+    if not field and fn != "count":
+        raise HTTPException(400, "Parameter 'field' is required for this function")
+
+    if field and covers_whole_days(start, end):
+        rows = rollup_series(db, user.id, field, fn, bucket, category_id, start, end)
+        return {
+            "field": field,
+            "bucket": bucket,
+            "fn": fn,
+            "points": [
+                {"category_id": r.category_id, "bucket": r.bucket, "value": r.value, "count": r.count}
+                for r in rows
+            ]
+        }
+
+    dialect = db.get_bind().dialect.name
+    bucket_col = date_bucket(models.Entry.occurred_at, bucket, dialect)
+
+    # Typed value of the field, or the entry itself when counting entries
+    value = models.EntryValue.num_value if field else models.Entry.id
+
+    query = db.query(
+        models.Entry.category_id,
+        bucket_col.label("bucket"),
+        AGGREGATE_FUNCTIONS[fn](value).label("value"),
+        func.count(value).label("count")
+    ).filter(visible_entries(user.id))
+
+    # Only entries with a numeric value for the field (joined via the 'number' fields of that label)
+    if field:
+        query = query.join(models.EntryValue, models.EntryValue.entry_id == models.Entry.id).join(
+            models.CategoryField, and_(models.CategoryField.id == models.EntryValue.category_field_id,
+                                       models.CategoryField.label == field))
+
+    # Dynamic query building based on provided parameters
+    if category_id: query = query.filter(models.Entry.category_id == category_id)
+    if start: query = query.filter(models.Entry.occurred_at >= start)
+    if end: query = query.filter(models.Entry.occurred_at <= end)
+
+    rows = query.group_by(models.Entry.category_id, bucket_col).order_by(bucket_col, models.Entry.category_id).all()
+
+    return {
+        "field": field,
+        "bucket": bucket,
+        "fn": fn,
+        "points": [
+            {"category_id": r.category_id, "bucket": r.bucket, "value": r.value, "count": r.count}
+            for r in rows
+        ]
+    }
+
+
+# Number of rows fetched per round trip from the server-side cursor during exports
+EXPORT_BATCH_SIZE = 1000
+
+
+@app.get("/entries/export")
+def export_entries(
+        format: Literal["csv", "ndjson"] = "csv",
+        category_id: Optional[int] = None,
+        db: Session = Depends(get_db),
+        user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Streams all entries of the user (optionally of one category) as CSV or NDJSON download.
+    Rows are read in batches from a server-side cursor and written to the response immediately.
+    """
+    if category_id and not db.query(models.Category).filter(models.Category.id == category_id,
+                                                            owned_by(user.id)).first():
+        raise HTTPException(404, "Category not found")
+
+    stmt = select(
+        models.Entry.id,
+        models.Entry.category_id,
+        models.Entry.occurred_at,
+        models.Entry.note,
+        models.Entry.data
+    ).where(visible_entries(user.id))
+
+    if category_id: stmt = stmt.where(models.Entry.category_id == category_id)
+
+    stmt = stmt.order_by(models.Entry.occurred_at, models.Entry.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    def partitions():
+        # Executed lazily by the response, so the first byte is sent before the first batch is read
+        yield from db.execute(stmt).partitions()
+
+    if format == "ndjson":
+        body = iter_ndjson(partitions())
+        media_type = "application/x-ndjson"
+    else:
+        # CSV columns are derived from the field definitions of the exported categories
+        label_query = db.query(models.CategoryField.label).join(models.Category).filter(
+            owned_by(user.id))
+        if category_id: label_query = label_query.filter(models.Category.id == category_id)
+
+        labels = list(dict.fromkeys(
+            label for (label,) in label_query.order_by(models.Category.id, models.CategoryField.id)
+        ))
+        body = iter_csv(partitions(), labels)
+        media_type = "text/csv; charset=utf-8"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="lifetracker-export.{format}"'}
+    )
 
 
 @app.post("/entries/", response_model=schemas.EntryOut)
+@db_route
 def create_entry(
         item: schemas.EntryCreate,
         db: Session = Depends(get_db),
-        user: models.User = Depends(get_current_user)
+        user: CurrentUser = Depends(get_current_user)
 ):
     """
     Creates a new tracking entry.
     Accepts highly flexible payloads due to the schemaless JSON 'data' column mapping.
     """
     if not db.query(models.Category).filter(models.Category.id == item.category_id,
-                                            models.Category.user_id == user.id).first():
+                                            owned_by(user.id)).first():
         raise HTTPException(404, "Category not found")
 
     new_entry = models.Entry(
@@ -453,34 +767,111 @@ def create_entry(
         data=item.values # Inserts the dynamic dictionary into the JSON column
     )
     db.add(new_entry)
+    db.flush()
+    values = write_entry_values(db, [(new_entry.id, new_entry.category_id, new_entry.data)], replace=False)
+    add_to_rollup(db, [(user.id, new_entry.category_id, new_entry.occurred_at, values.get(new_entry.id, {}))])
+    record_field_values(db, added=[(new_entry.category_id, new_entry.data, new_entry.occurred_at)])
+    bump_data_version(db, user.id)
     db.commit()
     db.refresh(new_entry)
     return new_entry
 
 
+@app.post("/entries/bulk", response_model=schemas.BulkResult)
+@db_route
+def create_entries_bulk(
+        payload: schemas.EntryBulkCreate,
+        db: Session = Depends(get_db),
+        user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Creates many tracking entries in a single transaction (e.g. imports of a year of history).
+    Category ownership is checked once per distinct category, valid items are inserted with
+    one multi-row INSERT, and every item is reported as success or failure.
+    """
+    results = [None] * len(payload.items)
+    valid = []
+
+    # Validate each item individually so malformed items don't reject the whole batch
+    for index, raw in enumerate(payload.items):
+        try:
+            valid.append((index, schemas.EntryCreate.model_validate(raw)))
+        except ValidationError as e:
+            error = e.errors()[0]
+            results[index] = {"index": index, "success": False,
+                              "error": f"{'.'.join(map(str, error['loc']))}: {error['msg']}"}
+
+    # One ownership query for all distinct categories of the batch
+    requested = {item.category_id for _, item in valid}
+    owned = {cid for (cid,) in db.query(models.Category.id).filter(models.Category.id.in_(requested),
+                                                                    owned_by(user.id))}
+
+    rows, positions = [], []
+    for index, item in valid:
+        if item.category_id not in owned:
+            results[index] = {"index": index, "success": False, "error": "Category not found"}
+            continue
+
+        rows.append({
+            "category_id": item.category_id,
+            "user_id": user.id,
+            "occurred_at": item.occurred_at,
+            "note": item.note,
+            "data": item.values
+        })
+        positions.append(index)
+
+    if rows:
+        # Multi-row INSERT (batched by SQLAlchemy); RETURNING keeps the order of the parameters
+        stmt = insert(models.Entry).returning(models.Entry.id, sort_by_parameter_order=True)
+        new_ids = db.scalars(stmt, rows).all()
+        values = write_entry_values(db, [(new_id, row["category_id"], row["data"])
+                                         for new_id, row in zip(new_ids, rows)], replace=False)
+        add_to_rollup(db, [(user.id, row["category_id"], row["occurred_at"], values.get(new_id, {}))
+                           for new_id, row in zip(new_ids, rows)])
+        record_field_values(db, added=[(row["category_id"], row["data"], row["occurred_at"]) for row in rows])
+        bump_data_version(db, user.id)
+        db.commit()
+
+        for index, new_id in zip(positions, new_ids):
+            results[index] = {"index": index, "success": True, "id": new_id}
+
+    return {"created": len(rows), "failed": len(results) - len(rows), "results": results}
+
+
 @app.put("/entries/{entry_id}", response_model=schemas.EntryOut)
+@db_route
 def update_entry(
         entry_id: int,
         item: schemas.EntryCreate,
         db: Session = Depends(get_db),
-        user: models.User = Depends(get_current_user)
+        user: CurrentUser = Depends(get_current_user)
 ):
     """Updates an existing tracking entry."""
-    entry = db.query(models.Entry).filter(models.Entry.id == entry_id, models.Entry.user_id == user.id).first()
+    entry = db.query(models.Entry).filter(models.Entry.id == entry_id, visible_entries(user.id)).first()
 
     if not entry: raise HTTPException(404, "Entry not found")
 
     # Verify category ownership if category ID is being changed
     if item.category_id != entry.category_id:
         if not db.query(models.Category).filter(models.Category.id == item.category_id,
-                                                models.Category.user_id == user.id).first():
+                                                owned_by(user.id)).first():
             raise HTTPException(404, "Category not found")
 
+    # Previous contribution to the daily rollup (reversed below, also when day or category change)
+    previous = (user.id, entry.category_id, entry.occurred_at, stored_values(db, [entry.id]).get(entry.id, {}))
+    previous_usage = (entry.category_id, entry.data, entry.occurred_at)
+
     entry.category_id = item.category_id
     entry.occurred_at = item.occurred_at
     entry.note = item.note
     entry.data = item.values
+    values = write_entry_values(db, [(entry.id, entry.category_id, entry.data)])
 
+    subtract_from_rollup(db, [previous])
+    add_to_rollup(db, [(user.id, entry.category_id, entry.occurred_at, values.get(entry.id, {}))])
+    record_field_values(db, added=[(entry.category_id, entry.data, entry.occurred_at)], removed=[previous_usage])
+    bump_data_version(db, user.id)
     db.commit()
     db.refresh(entry)
 
@@ -488,25 +879,98 @@ def update_entry(
 
 
 @app.delete("/entries/{entry_id}")
-def delete_entry(entry_id: int, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
+@db_route
+def delete_entry(entry_id: int, db: Session = Depends(get_db), user: CurrentUser = Depends(get_current_user)):
     """Deletes a specific tracking entry."""
-    entry = db.query(models.Entry).filter(models.Entry.id == entry_id, models.Entry.user_id == user.id).first()
+    entry = db.query(models.Entry).filter(models.Entry.id == entry_id, visible_entries(user.id)).first()
 
     if not entry: raise HTTPException(404, "Not found")
 
+    previous = (user.id, entry.category_id, entry.occurred_at, stored_values(db, [entry.id]).get(entry.id, {}))
+
+    # Explicit instead of relying on ON DELETE CASCADE (SQLite enforces it only with foreign_keys=ON)
+    db.execute(delete(models.EntryValue).where(models.EntryValue.entry_id == entry_id))
     db.delete(entry)
+    subtract_from_rollup(db, [previous])
+    record_field_values(db, removed=[(entry.category_id, entry.data, entry.occurred_at)])
+    db.add(models.Tombstone(user_id=user.id, entity="entry", entity_id=entry_id))
+    bump_data_version(db, user.id)
     db.commit()
 
     return {"status": "deleted", "id": entry_id}
 
 
+# --- Sync routes ---
+
+@app.get("/sync", response_model=schemas.SyncOut)
+@db_route
+def sync_changes(
+        since: Optional[str] = None,
+        db: Session = Depends(get_db),
+        user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Returns only the categories and entries that changed since the given sync token,
+    plus the IDs of deleted objects. Without a (valid) token, all categories are returned
+    and the client is asked to reset its cache.
+    """
+    # Taken before querying, so concurrent changes are part of the next window
+    now = datetime.now(UTC)
+    window_start = changes_since(since, now)
+
+    categories = categories_of(user.id, db)
+
+    if window_start is None:
+        return {
+            "token": encode_token(now),
+            "reset": True,
+            "categories": categories.order_by(models.Category.id).all(),
+            "entries": [],
+            "deleted_categories": [],
+            "deleted_entries": []
+        }
+
+    entries = db.query(models.Entry).filter(visible_entries(user.id),
+                                            models.Entry.updated_at > window_start)
+    tombstones = db.query(models.Tombstone.entity, models.Tombstone.entity_id).filter(
+        models.Tombstone.user_id == user.id,
+        models.Tombstone.deleted_at > window_start
+    ).all()
+
+    return {
+        "token": encode_token(now),
+        "reset": False,
+        "categories": categories.filter(models.Category.updated_at > window_start).order_by(models.Category.id).all(),
+        "entries": entries.order_by(models.Entry.occurred_at.desc(), models.Entry.id.desc()).all(),
+        "deleted_categories": [entity_id for entity, entity_id in tombstones if entity == "category"],
+        "deleted_entries": [entity_id for entity, entity_id in tombstones if entity == "entry"]
+    }
+
+
+# --- Monitoring routes ---
+
+@app.get("/stats/cache")
+def cache_stats(user: CurrentUser = Depends(get_current_user)):
+    """Returns size and hit/miss counters of the in-process token cache of this worker."""
+    return {"auth_tokens": token_cache.stats()}
+
+
+@app.get("/stats/maintenance")
+def maintenance_stats(request: Request, user: CurrentUser = Depends(get_current_user)):
+    """Returns the metrics of the last maintenance run performed by this worker (if any)."""
+    scheduler = getattr(request.app.state, "maintenance", None)
+    report = scheduler.last_report if scheduler else None
+    return {"last_run": asdict(report) if report else None}
+
+
 # --- Static files (frontend routing) ---
 
 # Mounts the static directory to serve the frontend Single Page Application
+# (hashed, precompressed assets with long-lived caching, see app/static_assets.py)
 script_dir = os.path.dirname(os.path.abspath(__file__))
 static_files_path = os.path.join(script_dir, "../static")
 
-app.mount("/", StaticFiles(directory=static_files_path, html=True), name="static")
+app.mount("/", SpaStaticFiles(directory=static_files_path), name="static")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,240 @@
+"""
+Database maintenance module.
+Periodically purges expired sessions, stale unverified accounts, outdated sync tombstones and
+delivered or given-up outbox mails, and resumes interrupted background deletions.
+The scheduler runs inside the app lifespan of every worker; a lease row in 'maintenance_lock'
+ensures that only one worker performs a run per interval. The lease is renewed after every
+batch, so it does not expire while a long run (e.g. a resumed deletion) is still going. Rows are deleted with set-based
+DELETEs in bounded batches, each batch in its own short transaction.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from typing import Callable, Optional
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+import app.models as models
+from app.deletion import delete_users, resume_stale_jobs
+from app.mailer import OUTBOX_RETENTION
+from app.sync import TOMBSTONE_RETENTION
+
+
+logger = logging.getLogger(__name__)
+
+# Interval between two maintenance runs (across all workers)
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "3600"))
+
+# Rows deleted per statement and transaction
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", "1000"))
+
+# Unverified accounts older than this are removed (matches the re-registration window by default)
+UNVERIFIED_USER_TTL = timedelta(minutes=int(os.getenv("UNVERIFIED_USER_TTL_MINUTES", "15")))
+
+# Name of the lease row in 'maintenance_lock'
+LOCK_NAME = "maintenance"
+
+
+@dataclass(frozen=True)
+class MaintenanceReport:
+    """Metrics of a single maintenance run."""
+    started_at: datetime
+    duration_ms: float
+    expired_sessions: int
+    unverified_users: int
+    tombstones: int
+    outbox_mails: int
+    resumed_deletions: int
+    batches: int
+
+
+def acquire_lock(session_factory: sessionmaker, owner: str, lease: timedelta, name: str = LOCK_NAME) -> bool:
+    """
+    Takes the lease of a job if it is free or expired. The conditional UPDATE ensures that
+    only one of several concurrently starting workers gets it.
+
+    :return: True if the caller holds the lease now.
+    """
+    now = datetime.now(UTC)
+
+    with session_factory() as db:
+        if db.get(models.MaintenanceLock, name) is None:
+            try:
+                db.add(models.MaintenanceLock(name=name, owner=None, locked_until=now - timedelta(seconds=1)))
+                db.commit()
+            except IntegrityError:
+                db.rollback() # Created by another worker in the meantime
+
+        result = db.execute(
+            update(models.MaintenanceLock)
+            .where(models.MaintenanceLock.name == name, models.MaintenanceLock.locked_until < now)
+            .values(owner=owner, locked_until=now + lease)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+
+def renew_lock(session_factory: sessionmaker, owner: str, lease: timedelta, name: str = LOCK_NAME) -> bool:
+    """
+    Extends the lease of its current owner by 'lease' from now.
+
+    :return: False if another worker has taken over the lease in the meantime.
+    """
+    with session_factory() as db:
+        result = db.execute(
+            update(models.MaintenanceLock)
+            .where(models.MaintenanceLock.name == name, models.MaintenanceLock.owner == owner)
+            .values(locked_until=datetime.now(UTC) + lease)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+
+def purge_in_batches(session_factory: sessionmaker, ids, remove: Callable[[Session, list], None],
+                     batch_size: int, heartbeat: Optional[Callable[[], None]] = None) -> tuple:
+    """
+    Repeatedly selects up to 'batch_size' primary keys and deletes them in a separate transaction,
+    so locks are held only briefly even when many rows are due.
+
+    :param ids: SELECT of the primary keys of the rows to delete.
+    :param heartbeat: Called after every batch (renews the lease of the run).
+    :return: (deleted rows, number of batches)
+    """
+    deleted, batches = 0, 0
+
+    while True:
+        with session_factory() as db:
+            batch = db.scalars(ids.limit(batch_size)).all()
+            if not batch:
+                break
+            remove(db, batch)
+            db.commit()
+
+        deleted += len(batch)
+        batches += 1
+        if heartbeat:
+            heartbeat()
+        if len(batch) < batch_size:
+            break
+
+    return deleted, batches
+
+
+def run_maintenance(session_factory: sessionmaker, batch_size: int = MAINTENANCE_BATCH_SIZE,
+                    heartbeat: Optional[Callable[[], None]] = None) -> MaintenanceReport:
+    """
+    Performs all purge steps once and returns their metrics.
+
+    :param heartbeat: Called after every batch of every step (renews the lease of the run).
+    """
+    started_at = datetime.now(UTC)
+    start = time.perf_counter()
+
+    sessions, session_batches = purge_in_batches(
+        session_factory,
+        select(models.Session.id).where(models.Session.expires_at < started_at),
+        lambda db, ids: db.execute(delete(models.Session).where(models.Session.id.in_(ids))),
+        batch_size,
+        heartbeat
+    )
+    users, user_batches = purge_in_batches(
+        session_factory,
+        select(models.User.id).where(
+            models.User.is_active == False,
+            models.User.created_at < started_at - UNVERIFIED_USER_TTL,
+            # Deactivated accounts with many entries are removed by their deletion job in batches
+            ~exists().where(models.DeletionJob.entity == "user", models.DeletionJob.entity_id == models.User.id,
+                            models.DeletionJob.status != "done")
+        ),
+        delete_users,
+        batch_size,
+        heartbeat
+    )
+    tombstones, tombstone_batches = purge_in_batches(
+        session_factory,
+        select(models.Tombstone.id).where(models.Tombstone.deleted_at < started_at - TOMBSTONE_RETENTION),
+        lambda db, ids: db.execute(delete(models.Tombstone).where(models.Tombstone.id.in_(ids))),
+        batch_size,
+        heartbeat
+    )
+    mails, mail_batches = purge_in_batches(
+        session_factory,
+        select(models.EmailOutbox.id).where(models.EmailOutbox.status.in_(["sent", "failed"]),
+                                            models.EmailOutbox.created_at < started_at - OUTBOX_RETENTION),
+        lambda db, ids: db.execute(delete(models.EmailOutbox).where(models.EmailOutbox.id.in_(ids))),
+        batch_size,
+        heartbeat
+    )
+    resumed = resume_stale_jobs(session_factory, heartbeat)
+
+    return MaintenanceReport(
+        started_at=started_at,
+        duration_ms=round((time.perf_counter() - start) * 1000, 2),
+        expired_sessions=sessions,
+        unverified_users=users,
+        tombstones=tombstones,
+        outbox_mails=mails,
+        resumed_deletions=resumed,
+        batches=session_batches + user_batches + tombstone_batches + mail_batches
+    )
+
+
+class MaintenanceScheduler:
+    """
+    Background task running the maintenance every MAINTENANCE_INTERVAL_SECONDS.
+    Every worker starts one; the lease lets only one of them run per interval.
+    """
+
+    def __init__(self, session_factory: sessionmaker, interval: float = MAINTENANCE_INTERVAL_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.last_report: Optional[MaintenanceReport] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Starts the scheduler loop on the running event loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancels the scheduler loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_once(self) -> Optional[MaintenanceReport]:
+        """
+        Runs the maintenance if this worker gets the lease.
+
+        :return: The metrics of the run, or None if another worker holds the lease.
+        """
+        lease = timedelta(seconds=self.interval)
+        if not await asyncio.to_thread(acquire_lock, self.session_factory, self.owner, lease):
+            return None
+
+        def heartbeat():
+            if not renew_lock(self.session_factory, self.owner, lease):
+                logger.warning("Maintenance lease of %s was taken over by another worker", self.owner)
+
+        report = await asyncio.to_thread(run_maintenance, self.session_factory, heartbeat=heartbeat)
+        self.last_report = report
+        logger.info("Maintenance run: %s expired sessions, %s unverified users, %s tombstones, %s outbox mails, "
+                    "%s resumed deletions in %s batches (%s ms)", report.expired_sessions, report.unverified_users,
+                    report.tombstones, report.outbox_mails, report.resumed_deletions, report.batches,
+                    report.duration_ms)
+        return report
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Maintenance run failed")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,227 @@
+"""
+Schema migration module.
+Brings existing SQLite and PostgreSQL databases up to date with the ORM models without
+dropping data. 'Base.metadata.create_all' only creates missing tables, so additive
+changes to existing tables (new columns and indexes) are applied here in an idempotent way.
+"""
+import json
+from sqlalchemy import JSON, inspect, insert, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.database import Base, serialize_json
+from app.entry_values import backfill as backfill_entry_values
+from app.field_values import rebuild as rebuild_field_values
+from app.rollups import rebuild as rebuild_rollups
+from app.search import install_search
+import app.models  # noqa: F401 (registers all models on the metadata)
+
+
+def add_missing_columns(engine: Engine) -> list:
+    """
+    Adds columns declared in the models that are missing in existing tables.
+    Existing rows keep their data; new columns are NULL (or their server default).
+
+    :param engine: Engine of the database to migrate.
+    :return: Names of the added columns as 'table.column'.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    added = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+
+                ddl = (f"ALTER TABLE {preparer.format_table(table)} "
+                       f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(engine.dialect)}")
+
+                # NOT NULL is only possible together with a default for the existing rows
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    ddl += f" DEFAULT '{default}'" if isinstance(default, str) else f" DEFAULT {default}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+
+                conn.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+
+    return added
+
+
+def existing_index_names(conn, table_name: str) -> set:
+    """
+    Returns the names of all indexes of a table.
+    SQLite is read from sqlite_master, because the inspector skips expression indexes.
+    """
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t"),
+                            {"t": table_name})
+        return {name for (name,) in rows}
+    return {ix["name"] for ix in inspect(conn).get_indexes(table_name)}
+
+
+def create_missing_indexes(engine: Engine) -> list:
+    """
+    Creates every index declared in the models that does not yet exist in the database.
+    Indexes restricted to another dialect (ddl_if) are skipped by SQLAlchemy.
+
+    :param engine: Engine of the database to migrate.
+    :return: Names of the indexes that were created.
+    """
+    created = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = existing_index_names(conn, table.name)
+
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(bind=conn)
+
+            created += sorted(existing_index_names(conn, table.name) - existing)
+
+    return created
+
+
+def convert_json_to_jsonb(engine: Engine) -> list:
+    """
+    Converts JSON columns of existing PostgreSQL tables to JSONB where the models declare
+    JSONB (required for the GIN indexes). No-op on SQLite.
+
+    :param engine: Engine of the database to migrate.
+    :return: Names of the converted columns as 'table.column'.
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    converted = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            reflected = {col["name"]: col["type"] for col in inspector.get_columns(table.name)}
+
+            for column in table.columns:
+                declared = column.type.dialect_impl(engine.dialect)
+                if isinstance(declared, JSONB) and column.name in reflected \
+                        and not isinstance(reflected[column.name], JSONB):
+                    conn.execute(text(
+                        f"ALTER TABLE {preparer.format_table(table)} ALTER COLUMN {preparer.format_column(column)} "
+                        f"TYPE JSONB USING {preparer.format_column(column)}::jsonb"
+                    ))
+                    converted.append(f"{table.name}.{column.name}")
+
+    return converted
+
+
+def is_applied(engine: Engine, name: str) -> bool:
+    """Whether a one-off data migration has been recorded in 'schema_migration'."""
+    m = app.models.SchemaMigration
+    with engine.connect() as conn:
+        return conn.execute(select(m.name).where(m.name == name)).first() is not None
+
+
+def mark_applied(engine: Engine, name: str):
+    """Records a one-off data migration, so later starts skip it."""
+    with engine.begin() as conn:
+        conn.execute(insert(app.models.SchemaMigration).values(name=name))
+
+
+def unescape_sqlite_json(engine: Engine) -> list:
+    """
+    Rewrites JSON values stored with escaped non-ASCII characters (e.g. '\\u00dcbung') on SQLite,
+    so json_extract and the expression indexes find their keys. No-op on PostgreSQL.
+
+    :param engine: Engine of the database to migrate.
+    :return: 'table.column' for every column with rewritten rows.
+    """
+    if engine.dialect.name != "sqlite":
+        return []
+
+    rewritten = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            pk = list(table.primary_key.columns)
+            if len(pk) != 1:
+                continue
+
+            for column in table.columns:
+                if not isinstance(column.type, JSON):
+                    continue
+
+                # Raw text of the column, only rows that contain an escape sequence
+                raw = text(f"SELECT {pk[0].name}, {column.name} FROM {table.name} "
+                           f"WHERE {column.name} LIKE '%\\u%'")
+                rows = conn.execute(raw).all()
+
+                changed = []
+                for row_id, value in rows:
+                    unescaped = serialize_json(json.loads(value))
+                    if unescaped != value:
+                        changed.append((row_id, unescaped))
+
+                for row_id, value in changed:
+                    conn.execute(text(f"UPDATE {table.name} SET {column.name} = :value WHERE {pk[0].name} = :id"),
+                                 {"value": value, "id": row_id})
+                if changed:
+                    rewritten.append(f"{table.name}.{column.name}")
+
+    return rewritten
+
+
+def upgrade(engine: Engine) -> list:
+    """
+    Applies all migration steps. Safe to run on every start (steps are idempotent).
+
+    :param engine: Engine of the database to migrate.
+    :return: Human-readable list of the applied changes.
+    """
+    # New tables (including their indexes) are created directly
+    new_tables = set(Base.metadata.tables) - set(inspect(engine).get_table_names())
+    Base.metadata.create_all(bind=engine)
+
+    changes = [f"column {name}" for name in add_missing_columns(engine)]
+    changes += [f"jsonb {name}" for name in convert_json_to_jsonb(engine)]
+
+    # Full-table scan, so it only runs once per database (new values are stored unescaped)
+    if not is_applied(engine, "unescape_sqlite_json"):
+        changes += [f"unescaped json {name}" for name in unescape_sqlite_json(engine)]
+        mark_applied(engine, "unescape_sqlite_json")
+
+    changes += [f"index {name}" for name in create_missing_indexes(engine)]
+
+    # Full-text index of existing installations (created with the entry table otherwise)
+    with engine.begin() as conn:
+        if install_search(conn):
+            changes.append("full-text search index")
+
+    # Typed values of entries created before the entry_value table existed (one-off).
+    # Marked only after the backfill committed, so an interrupted run is repeated on the next start.
+    if not is_applied(engine, "entry_value_backfill"):
+        if "entry" not in new_tables:
+            with Session(engine) as db:
+                changes.append(f"entry_value backfill ({backfill_entry_values(db)} entries)")
+        mark_applied(engine, "entry_value_backfill")
+
+    # Daily totals of entries created before the daily_rollup table existed (one-off, resumable like above)
+    if not is_applied(engine, "daily_rollup_rebuild"):
+        if "entry" not in new_tables:
+            with Session(engine) as db:
+                changes.append(f"daily_rollup rebuild ({rebuild_rollups(db)} days)")
+        mark_applied(engine, "daily_rollup_rebuild")
+
+    # Value statistics of entries created before the field_value_stat table existed (one-off, resumable)
+    if not is_applied(engine, "field_value_stat_rebuild"):
+        if "entry" not in new_tables:
+            with Session(engine) as db:
+                changes.append(f"field_value_stat rebuild ({rebuild_field_values(db)} values)")
+        mark_applied(engine, "field_value_stat_rebuild")
+
+    return changes
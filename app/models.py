@@ -3,10 +3,16 @@ Database models definition module.
 Utilizes SQLAlchemy's Object-Relational Mapping (ORM) to define the database schema,
 relationships, and constraints using Python classes.
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, DateTime, Boolean
+import os
+import re
+import unicodedata
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, Text, JSON, Date, DateTime, Boolean, Index, event, false, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime, UTC
 from app.database import Base
+from app.json_fields import json_path_literal
+from app.search import install_search
 
 
 # --- User & Session ---
@@ -31,10 +37,16 @@ class User(Base):
     is_active = Column(Boolean, default=False)
     verification_code = Column(String, nullable=True)
 
-    # Relationships with cascading deletes: Removing a user removes all their associated data
-    sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan")
-    categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")
-    entries = relationship("Entry", back_populates="user", cascade="all, delete-orphan")
+    # Counter bumped on every write to the user's data; basis for ETags of the read routes
+    data_version = Column(Integer, nullable=False, default=0, server_default=text("0"))
+
+    # Relationships with cascading deletes: Removing a user removes all their associated data.
+    # Children are removed by the database (ON DELETE CASCADE) or by the set-based deletes in
+    # app/deletion.py, never loaded into the session just to be deleted (passive_deletes).
+    sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    categories = relationship("Category", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    entries = relationship("Entry", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    tombstones = relationship("Tombstone", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Session(Base):
@@ -47,8 +59,10 @@ class Session(Base):
 
     id = Column(Integer, primary_key=True)
     token = Column(String, unique=True, nullable=False)
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+
+    # Indexed for the periodic purge of expired sessions
+    expires_at = Column(DateTime, nullable=False, index=True)
 
     user = relationship("User", back_populates="sessions")
 
@@ -61,19 +75,30 @@ class Category(Base):
     Acts as a schema provider dictating the structure of tracking entries to the frontend.
     """
     __tablename__ = "category"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Delta sync: changes of a user since a given point in time
+        Index("ix_category_user_updated", "user_id", "updated_at"),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(50), nullable=False)
     description = Column(Text)
 
     # Protects system-generated core categories from being deleted or modified by the user
     is_system_default = Column(Boolean, default=False)
 
+    # Set while a background job deletes the category; the API then treats it as deleted
+    pending_deletion = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    # Change tracking for the delta sync (set on insert and on every ORM update)
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
     user = relationship("User", back_populates="categories")
-    fields = relationship("CategoryField", back_populates="category", cascade="all, delete-orphan")
-    entries = relationship("Entry", back_populates="category", cascade="all, delete-orphan")
+    fields = relationship("CategoryField", back_populates="category", cascade="all, delete-orphan",
+                          passive_deletes=True)
+    entries = relationship("Entry", back_populates="category", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class CategoryField(Base):
@@ -85,7 +110,7 @@ class CategoryField(Base):
     __table_args__ = {'extend_existing': True}
 
     id = Column(Integer, primary_key=True)
-    category_id = Column(Integer, ForeignKey("category.id"))
+    category_id = Column(Integer, ForeignKey("category.id", ondelete="CASCADE"), index=True)
     label = Column(String, nullable=False)
     data_type = Column(String, nullable=False) # Expected values: 'number' or 'text'
     unit = Column(String)
@@ -102,17 +127,208 @@ class Entry(Base):
     a schemaless JSON column for highly flexible data point storage.
     """
     __tablename__ = "entry"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Composite indexes for the per-user access patterns (timeline and per-category timeline)
+        Index("ix_entry_user_occurred", "user_id", "occurred_at"),
+        Index("ix_entry_user_category_occurred", "user_id", "category_id", "occurred_at"),
+        # Delta sync: changes of a user since a given point in time
+        Index("ix_entry_user_updated", "user_id", "updated_at"),
+        {'extend_existing': True}
+    )
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
-    category_id = Column(Integer, ForeignKey("category.id"))
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    category_id = Column(Integer, ForeignKey("category.id", ondelete="CASCADE"))
 
     # Lambda ensures the datetime is evaluated at insertion time, not at module load
     occurred_at = Column(DateTime, default=lambda: datetime.now(UTC))
 
     note = Column(Text)
-    data = Column(JSON)
+
+    # Binary JSON on PostgreSQL (indexable with GIN), plain JSON text on SQLite
+    data = Column(JSON().with_variant(JSONB(), "postgresql"))
+
+    # Change tracking for the delta sync (set on insert and on every ORM update)
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
 
     user = relationship("User", back_populates="entries")
-    category = relationship("Category", back_populates="entries")
\ No newline at end of file
+    category = relationship("Category", back_populates="entries")
+
+
+# Labels inside Entry.data that get an expression index on SQLite (comma-separated).
+# PostgreSQL covers all labels with a single GIN index on the JSONB column.
+ENTRY_INDEXED_FIELDS = [
+    label.strip() for label in os.getenv("ENTRY_INDEXED_FIELDS", "Übung,Lebensmittel").split(",") if label.strip()
+]
+
+
+def index_suffix(label: str) -> str:
+    """Converts a field label into an ASCII identifier for index names (e.g. 'Übung' -> 'ubung')."""
+    ascii_label = unicodedata.normalize("NFKD", label).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", ascii_label.lower()).strip("_")
+
+
+# Filters on Entry.data (GET /entries/?where=...): GIN for JSONB containment on PostgreSQL,
+# expression indexes matching json_extract(data, '$."label"') on SQLite
+Index("ix_entry_data_gin", Entry.data, postgresql_using="gin").ddl_if(dialect="postgresql")
+
+for indexed_label in ENTRY_INDEXED_FIELDS:
+    Index(f"ix_entry_data_{index_suffix(indexed_label)}", Entry.user_id,
+          func.json_extract(Entry.data, json_path_literal(indexed_label))).ddl_if(dialect="sqlite")
+
+# Full-text index of notes and text values (FTS5 / tsvector), maintained by triggers (see app/search.py)
+event.listen(Entry.__table__, "after_create", lambda target, connection, **kw: install_search(connection))
+
+
+class EntryValue(Base):
+    """
+    Typed copy of the numeric values inside Entry.data (one row per entry and 'number' field).
+    Maintained together with the entry, so aggregations and range filters run on an indexed
+    REAL column instead of parsing JSON row by row.
+    """
+    __tablename__ = "entry_value"
+    __table_args__ = (
+        # Range filters on a field ('Energie > 500')
+        Index("ix_entry_value_field_value", "category_field_id", "num_value"),
+        {'extend_existing': True}
+    )
+
+    # Rows disappear with their entry or field (database-side cascade, no ORM relationship)
+    entry_id = Column(Integer, ForeignKey("entry.id", ondelete="CASCADE"), primary_key=True)
+    category_field_id = Column(Integer, ForeignKey("category_field.id", ondelete="CASCADE"), primary_key=True)
+    num_value = Column(Float, nullable=False)
+
+
+class FieldValueStat(Base):
+    """
+    Usage count of every distinct value of a 'text' field (e.g. each exercise of 'Übung').
+    Maintained together with the entries and serves the autocomplete suggestions.
+    """
+    __tablename__ = "field_value_stat"
+    __table_args__ = (
+        # Most frequent values of a field first
+        Index("ix_field_value_stat_count", "category_field_id", "count"),
+        {'extend_existing': True}
+    )
+
+    category_field_id = Column(Integer, ForeignKey("category_field.id", ondelete="CASCADE"), primary_key=True)
+    value = Column(String, primary_key=True)
+    normalized = Column(String, nullable=False) # Case-folded value for prefix matching
+    count = Column(Integer, nullable=False)
+    last_used = Column(DateTime, nullable=False)
+
+
+class DailyRollup(Base):
+    """
+    Per-day totals of a numeric field per user and category (e.g. kcal of a day).
+    Adjusted in the same transaction as the entries, so dashboards read one row per day
+    instead of all entries of the period.
+    """
+    __tablename__ = "daily_rollup"
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("category.id", ondelete="CASCADE"), primary_key=True)
+    field = Column(String, primary_key=True) # Label of the 'number' field
+    day = Column(Date, primary_key=True)
+
+    count = Column(Integer, nullable=False)
+    sum = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+
+
+# --- Synchronization ---
+
+class Tombstone(Base):
+    """
+    Marker for a deleted category or entry.
+    Lets clients remove locally cached objects during the delta sync without a full reload.
+    """
+    __tablename__ = "tombstone"
+    __table_args__ = (
+        Index("ix_tombstone_user_deleted", "user_id", "deleted_at"),
+        {'extend_existing': True}
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    entity = Column(String, nullable=False) # Expected values: 'category' or 'entry'
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+
+    user = relationship("User", back_populates="tombstones")
+
+# --- Email outbox ---
+
+class EmailOutbox(Base):
+    """
+    Queued outgoing email.
+    Written in the same transaction as the triggering change and delivered asynchronously
+    by the outbox worker (app/mailer.py), which retries failed deliveries with backoff.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next", "status", "next_attempt_at"),
+        {'extend_existing': True}
+    )
+
+    id = Column(Integer, primary_key=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False) # HTML content
+
+    status = Column(String, default="pending", nullable=False) # Expected values: 'pending', 'sent' or 'failed'
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+
+class SchemaMigration(Base):
+    """
+    One-off data migration that has been applied to this database.
+    Lets 'app.migrations.upgrade' skip expensive steps (e.g. full-table scans) on later starts.
+    """
+    __tablename__ = "schema_migration"
+    __table_args__ = {'extend_existing': True}
+
+    name = Column(String, primary_key=True)
+    applied_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+
+
+class MaintenanceLock(Base):
+    """
+    Lease of a periodic background job. Only the worker holding an unexpired lease runs the job,
+    so multiple app processes sharing the database do not run it concurrently or repeatedly.
+    """
+    __tablename__ = "maintenance_lock"
+    __table_args__ = {'extend_existing': True}
+
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=True)
+    locked_until = Column(DateTime, nullable=False)
+
+
+class DeletionJob(Base):
+    """
+    Progress of a large deletion (account or category) that runs in the background in batches.
+    """
+    __tablename__ = "deletion_job"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False) # No foreign key: the job outlives a deleted account
+    entity = Column(String, nullable=False) # Expected values: 'user' or 'category'
+    entity_id = Column(Integer, nullable=False)
+
+    status = Column(String, default="pending", nullable=False) # Expected values: 'pending', 'running', 'done' or 'failed'
+    total = Column(Integer, default=0, nullable=False) # Entries to delete
+    deleted = Column(Integer, default=0, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0")) # Started runs
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC), nullable=False)
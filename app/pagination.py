@@ -0,0 +1,56 @@
+"""
+Keyset (cursor) pagination module.
+Encodes the sort key of the last delivered row into an opaque token, so that the
+next page can be fetched with an indexed range condition instead of an OFFSET scan.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+# Page size boundaries for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(occurred_at: datetime, entry_id: int) -> str:
+    """
+    Serializes the sort key (occurred_at, id) of a row into an opaque, URL-safe token.
+
+    :param occurred_at: Timestamp of the last row on the current page.
+    :param entry_id: Primary key of the last row (tie-breaker for equal timestamps).
+    :return: Base64 encoded cursor string.
+    """
+    raw = json.dumps([occurred_at.isoformat(), entry_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Restores the sort key from a cursor created by encode_cursor.
+
+    :param cursor: Opaque token sent by the client.
+    :raises HTTPException: On manipulated or malformed tokens (400).
+    :return: Tuple of (occurred_at, id).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        occurred_at, entry_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(occurred_at), int(entry_id)
+    except (ValueError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def after_cursor(column, id_column, cursor: Optional[str]):
+    """
+    Builds the keyset condition for a descending (column, id) sort order.
+    Returns None if no cursor is given, i.e. the first page is requested.
+    """
+    if not cursor:
+        return None
+
+    occurred_at, entry_id = decode_cursor(cursor)
+    return or_(column < occurred_at, and_(column == occurred_at, id_column < entry_id))
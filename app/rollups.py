@@ -0,0 +1,189 @@
+"""
+Daily rollup module.
+Maintains 'daily_rollup' (count, sum, min and max of every numeric field per user, category
+and day) incrementally inside the transactions that create, change or delete entries, and
+rebuilds it from the typed entry values for repairs.
+"""
+from datetime import datetime, time
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import app.models as models
+from app.json_fields import date_bucket, day_of
+
+
+# Aggregate functions of GET /entries/aggregate, expressed on the per-day totals
+ROLLUP_FUNCTIONS = {
+    "sum": lambda r: func.sum(r.sum),
+    "avg": lambda r: func.sum(r.sum) / func.sum(r.count),
+    "min": lambda r: func.min(r.min),
+    "max": lambda r: func.max(r.max),
+    "count": lambda r: func.sum(r.count)
+}
+
+# Contribution of one entry: (user_id, category_id, occurred_at, {label: value})
+Contribution = Tuple[int, int, datetime, dict]
+
+
+def group_totals(items: Iterable[Contribution]) -> dict:
+    """
+    Sums up contributions per rollup row.
+
+    :return: {(user_id, category_id, field, day): [count, sum, min, max]}
+    """
+    totals = {}
+    for user_id, category_id, occurred_at, values in items:
+        for label, number in values.items():
+            key = (user_id, category_id, label, occurred_at.date())
+            if key not in totals:
+                totals[key] = [1, number, number, number]
+            else:
+                t = totals[key]
+                t[0] += 1
+                t[1] += number
+                t[2] = min(t[2], number)
+                t[3] = max(t[3], number)
+    return totals
+
+
+def row_filter(key: tuple):
+    """WHERE clause selecting the rollup row of a (user_id, category_id, field, day) key."""
+    user_id, category_id, field, day = key
+    r = models.DailyRollup
+    return (r.user_id == user_id) & (r.category_id == category_id) & (r.field == field) & (r.day == day)
+
+
+def add_to_rollup(db: Session, items: Iterable[Contribution]):
+    """
+    Adds the values of new (or changed) entries to their days with a single upsert statement.
+    Runs inside the caller's transaction.
+    """
+    totals = group_totals(items)
+    if not totals:
+        return
+
+    r = models.DailyRollup
+    postgres = db.get_bind().dialect.name == "postgresql"
+    lower, upper = (func.least, func.greatest) if postgres else (func.min, func.max)
+
+    rows = [
+        {"user_id": user_id, "category_id": category_id, "field": field, "day": day,
+         "count": t[0], "sum": t[1], "min": t[2], "max": t[3]}
+        for (user_id, category_id, field, day), t in totals.items()
+    ]
+
+    # One statement executed for all rows (executemany): compiled once and cached, unlike a
+    # multi-row VALUES clause whose SQL changes with the number of rows
+    stmt = (pg_insert if postgres else sqlite_insert)(r.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[r.user_id, r.category_id, r.field, r.day],
+        set_={
+            "count": r.count + stmt.excluded.count,
+            "sum": r.sum + stmt.excluded.sum,
+            "min": lower(r.min, stmt.excluded.min),
+            "max": upper(r.max, stmt.excluded.max)
+        }
+    )
+    db.execute(stmt, rows)
+
+
+def subtract_from_rollup(db: Session, items: Iterable[Contribution]):
+    """
+    Reverses the contribution of deleted entries (or of the previous state of changed entries).
+    Count and sum are adjusted by the difference; min and max are recomputed for the affected
+    day only if the removed value was the current extreme. Empty days are deleted.
+    Must run after the entry changes are applied to the session (they are flushed here).
+    """
+    totals = group_totals(items)
+    if not totals:
+        return
+
+    db.flush()
+    r = models.DailyRollup
+    dialect = db.get_bind().dialect.name
+
+    for key, (count, total, lowest, highest) in totals.items():
+        db.execute(update(r).where(row_filter(key)).values(count=r.count - count, sum=r.sum - total))
+        row = db.execute(select(r.count, r.min, r.max).where(row_filter(key))).first()
+
+        if row is None:
+            continue
+        if row.count <= 0:
+            db.execute(delete(r).where(row_filter(key)))
+        elif lowest <= row.min or highest >= row.max:
+            user_id, category_id, field, day = key
+            extremes = db.execute(
+                select(func.min(models.EntryValue.num_value), func.max(models.EntryValue.num_value))
+                .join(models.Entry, models.Entry.id == models.EntryValue.entry_id)
+                .join(models.CategoryField, models.CategoryField.id == models.EntryValue.category_field_id)
+                .where(models.Entry.user_id == user_id, models.Entry.category_id == category_id,
+                       models.CategoryField.label == field, day_of(models.Entry.occurred_at, dialect) == day)
+            ).one()
+            db.execute(update(r).where(row_filter(key)).values(min=extremes[0], max=extremes[1]))
+
+
+def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recomputes the rollup from the typed entry values (all users or a single user).
+
+    :return: Number of rollup rows written.
+    """
+    r = models.DailyRollup
+    dialect = db.get_bind().dialect.name
+    day = day_of(models.Entry.occurred_at, dialect)
+
+    source = (
+        select(models.Entry.user_id, models.Entry.category_id, models.CategoryField.label, day,
+               func.count(models.EntryValue.num_value), func.sum(models.EntryValue.num_value),
+               func.min(models.EntryValue.num_value), func.max(models.EntryValue.num_value))
+        .join(models.Entry, models.Entry.id == models.EntryValue.entry_id)
+        .join(models.CategoryField, models.CategoryField.id == models.EntryValue.category_field_id)
+        .group_by(models.Entry.user_id, models.Entry.category_id, models.CategoryField.label, day)
+    )
+
+    cleanup = delete(r)
+    if user_id is not None:
+        source = source.where(models.Entry.user_id == user_id)
+        cleanup = cleanup.where(r.user_id == user_id)
+
+    db.execute(cleanup)
+    result = db.execute(insert(r).from_select(
+        ["user_id", "category_id", "field", "day", "count", "sum", "min", "max"], source))
+    db.commit()
+    return result.rowcount
+
+
+def covers_whole_days(start: Optional[datetime], end: Optional[datetime]) -> bool:
+    """Whether a period can be answered from the rollup (it starts and ends at day boundaries)."""
+    return (start is None or start.time() == time.min) and (end is None or end.time() == time.max)
+
+
+def rollup_series(db: Session, user_id: int, field: str, fn: str, bucket: str, category_id: Optional[int] = None,
+                  start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """
+    Aggregates a numeric field per category and bucket from the daily rollup.
+    Returns the same rows as the aggregation over the entries (category_id, bucket, value, count).
+    """
+    r = models.DailyRollup
+    bucket_col = date_bucket(r.day, bucket, db.get_bind().dialect.name)
+
+    query = db.query(
+        r.category_id,
+        bucket_col.label("bucket"),
+        ROLLUP_FUNCTIONS[fn](r).label("value"),
+        func.sum(r.count).label("count")
+    ).filter(r.user_id == user_id, r.field == field)
+
+    # Categories that are being deleted in the background are no longer visible
+    pending = select(models.Category.id).where(models.Category.user_id == user_id,
+                                               models.Category.pending_deletion == True)
+    query = query.filter(r.category_id.notin_(pending))
+
+    if category_id: query = query.filter(r.category_id == category_id)
+    if start: query = query.filter(r.day >= start.date())
+    if end: query = query.filter(r.day <= end.date())
+
+    return query.group_by(r.category_id, bucket_col).order_by(bucket_col, r.category_id).all()
+
@@ -5,7 +5,7 @@ for incoming requests and filtering sensitive information from outgoing response
 """
 from pydantic import BaseModel, Field, EmailStr, field_validator
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import date, datetime
 import re
 
 
@@ -153,4 +153,93 @@ class EntryOut(BaseModel):
     note: Optional[str]
     data: Dict[str, Any]
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+class EntryPage(BaseModel):
+    """
+    Response schema for a single page of tracking entries.
+    'next_cursor' is None once the last page has been delivered.
+    """
+    items: List[EntryOut]
+    next_cursor: Optional[str] = None
+
+
+class EntryBulkCreate(BaseModel):
+    """
+    Schema for bulk ingestion of tracking entries (e.g. imports from other apps).
+    Items are validated individually against EntryCreate, so a single malformed item
+    is reported in the result instead of rejecting the whole batch.
+    """
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=5000)
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of a single item of a bulk request (position refers to the request list)."""
+    index: int
+    success: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    """Response schema for bulk ingestion with per-item success or failure."""
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class DeletionJobOut(BaseModel):
+    """Progress of a background deletion (account or category with many entries)."""
+    id: int
+    entity: str
+    entity_id: int
+    status: str
+    total: int
+    deleted: int
+
+    model_config = {"from_attributes": True}
+
+
+class FieldValueOut(BaseModel):
+    """Autocomplete suggestion: a value of a text field and how often it was used."""
+    value: str
+    count: int
+
+    model_config = {"from_attributes": True}
+
+# --- Reporting ---
+
+class AggregatePoint(BaseModel):
+    """Single bucket of an aggregated series (one per category and time bucket)."""
+    category_id: int
+    bucket: date
+    value: Optional[float]
+    count: int
+
+
+class AggregateSeries(BaseModel):
+    """
+    Response schema for server-side aggregations.
+    Contains only the bucketed result, so charts can be rendered without downloading raw entries.
+    """
+    field: Optional[str]
+    bucket: str
+    fn: str
+    points: List[AggregatePoint]
+
+
+# --- Synchronization ---
+
+class SyncOut(BaseModel):
+    """
+    Response schema for the delta sync.
+    With 'reset' set, the client discards its cache: 'categories' then holds all categories
+    and entries have to be reloaded page by page via GET /entries/.
+    """
+    token: str
+    reset: bool
+    categories: List[CategoryOut]
+    entries: List[EntryOut]
+    deleted_categories: List[int]
+    deleted_entries: List[int]
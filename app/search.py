@@ -0,0 +1,119 @@
+"""
+Full-text search module.
+Indexes the note and the text-typed values of every entry: an FTS5 table on SQLite and a
+'tsvector' column with GIN index on PostgreSQL. Both are maintained by database triggers, so
+every write path (routes, bulk inserts, scripts, set-based deletes) keeps the index in sync.
+"""
+import re
+from sqlalchemy import column, func, literal_column, table, text
+
+
+# FTS5 tokenizer: Unicode-aware, case- and accent-insensitive ('ubung' finds 'Übung')
+SQLITE_TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Text search configuration of PostgreSQL (language independent, no stemming)
+POSTGRES_CONFIG = "simple"
+
+
+def document_sql(row: str, dialect: str) -> str:
+    """
+    SQL expression of the searchable text of an entry row: the note plus the values of the
+    category's 'text' fields inside the JSON data.
+
+    :param row: Alias of the entry row (e.g. 'new' inside a trigger).
+    """
+    if dialect == "postgresql":
+        values = (f"SELECT string_agg(j.value, ' ') FROM jsonb_each_text({row}.data) AS j "
+                  f"JOIN category_field AS f ON f.category_id = {row}.category_id "
+                  f"AND f.label = j.key AND f.data_type = 'text'")
+    else:
+        values = (f"SELECT group_concat(j.value, ' ') FROM json_each({row}.data) AS j "
+                  f"JOIN category_field AS f ON f.category_id = {row}.category_id "
+                  f"AND f.label = j.key AND f.data_type = 'text' WHERE j.type = 'text'")
+    return f"coalesce({row}.note, '') || ' ' || coalesce(({values}), '')"
+
+
+def install_search(conn) -> bool:
+    """
+    Creates the search index and its triggers if they are missing and indexes the existing entries.
+    Idempotent; called after the entry table is created and by the migration.
+
+    :return: True if the index was created by this call.
+    """
+    if conn.dialect.name == "postgresql":
+        return install_postgres(conn)
+    return install_sqlite(conn)
+
+
+def install_sqlite(conn) -> bool:
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entry_fts'")).first()
+    if exists:
+        return False
+
+    conn.execute(text(f"CREATE VIRTUAL TABLE entry_fts USING fts5(content, tokenize = '{SQLITE_TOKENIZER}')"))
+    conn.execute(text(f"""
+        CREATE TRIGGER entry_fts_insert AFTER INSERT ON entry BEGIN
+            INSERT INTO entry_fts (rowid, content) VALUES (new.id, {document_sql('new', 'sqlite')});
+        END"""))
+    conn.execute(text(f"""
+        CREATE TRIGGER entry_fts_update AFTER UPDATE OF note, data, category_id ON entry BEGIN
+            DELETE FROM entry_fts WHERE rowid = old.id;
+            INSERT INTO entry_fts (rowid, content) VALUES (new.id, {document_sql('new', 'sqlite')});
+        END"""))
+    conn.execute(text("""
+        CREATE TRIGGER entry_fts_delete AFTER DELETE ON entry BEGIN
+            DELETE FROM entry_fts WHERE rowid = old.id;
+        END"""))
+
+    conn.execute(text(f"INSERT INTO entry_fts (rowid, content) SELECT e.id, {document_sql('e', 'sqlite')} FROM entry AS e"))
+    return True
+
+
+def install_postgres(conn) -> bool:
+    exists = conn.execute(text(
+        "SELECT 1 FROM information_schema.columns WHERE table_name = 'entry' AND column_name = 'search_vector'"
+    )).first()
+    if exists:
+        return False
+
+    conn.execute(text("ALTER TABLE entry ADD COLUMN search_vector tsvector"))
+    conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION entry_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := to_tsvector('{POSTGRES_CONFIG}', {document_sql('NEW', 'postgresql')});
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql"""))
+    conn.execute(text("DROP TRIGGER IF EXISTS entry_search_vector ON entry"))
+    conn.execute(text("CREATE TRIGGER entry_search_vector BEFORE INSERT OR UPDATE OF note, data, category_id "
+                      "ON entry FOR EACH ROW EXECUTE FUNCTION entry_search_vector()"))
+
+    # Fires the trigger for the existing rows
+    conn.execute(text("UPDATE entry SET note = note"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_entry_search ON entry USING GIN (search_vector)"))
+    return True
+
+
+def search_terms(query: str) -> list:
+    """Splits user input into plain search terms (punctuation and operators are dropped)."""
+    return re.findall(r"\w+", query)
+
+
+def apply_search(query, entry_id_column, terms: list, dialect: str):
+    """
+    Restricts an entry query to entries containing all terms and orders it by relevance.
+    Every term also matches as prefix ('pizz' finds 'Pizza').
+
+    :param entry_id_column: Primary key column of the queried entries (models.Entry.id).
+    """
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(POSTGRES_CONFIG, " & ".join(f"{t}:*" for t in terms))
+        vector = literal_column("entry.search_vector")
+        return query.filter(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc())
+
+    # Terms are quoted, so FTS5 never interprets user input as query syntax
+    match = " ".join('"' + t + '"*' for t in terms)
+    fts = table("entry_fts", column("rowid"))
+    return query.join(fts, fts.c.rowid == entry_id_column).filter(
+        literal_column("entry_fts").op("MATCH")(match)
+    ).order_by(func.bm25(literal_column("entry_fts"))) # Lower is better
@@ -0,0 +1,62 @@
+"""
+Fast serialization module.
+List routes select plain column tuples and encode them with orjson in a single pass instead of
+converting every ORM object into a Pydantic model and validating it on the way out. The JSON
+is identical to the declared response models, which stay in place for the OpenAPI docs.
+"""
+import json
+from collections import defaultdict
+from typing import Iterable
+import orjson
+from fastapi import Response
+
+
+# Columns of an entry in the order of schemas.EntryOut
+ENTRY_KEYS = ("id", "category_id", "occurred_at", "note", "data")
+
+# UTC datetimes end with 'Z' like in Pydantic's output
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        try:
+            return orjson.dumps(content, option=ORJSON_OPTIONS)
+        except TypeError:
+            # orjson rejects integers beyond 64 bit, which may occur inside the JSON data
+            return json.dumps(content, ensure_ascii=False, default=str).encode()
+
+
+def fast_json(content, response: Response) -> FastJSONResponse:
+    """
+    Builds the response of a fast list route. Returning a response object bypasses the
+    response model, so headers set by dependencies (e.g. the ETag of conditional_get)
+    are copied from the injected response.
+    """
+    return FastJSONResponse(content, headers=dict(response.headers))
+
+
+def entry_dicts(rows: Iterable) -> list:
+    """Converts (id, category_id, occurred_at, note, data) rows into entry objects."""
+    return [dict(zip(ENTRY_KEYS, row)) for row in rows]
+
+
+def category_dicts(categories: Iterable, fields: Iterable) -> list:
+    """
+    Assembles categories with their nested fields.
+
+    :param categories: (id, name, description, is_system_default) rows.
+    :param fields: (category_id, label, data_type, unit) rows, in display order.
+    """
+    fields_of = defaultdict(list)
+    for category_id, label, data_type, unit in fields:
+        fields_of[category_id].append({"label": label, "data_type": data_type, "unit": unit})
+
+    return [
+        {"name": name, "description": description, "fields": fields_of[category_id],
+         "id": category_id, "is_system_default": is_system_default}
+        for category_id, name, description, is_system_default in categories
+    ]
@@ -0,0 +1,145 @@
+"""
+Static asset module.
+Serves the SPA with long-lived caching: at startup script.js and stylesheet.css get
+content-hashed URLs (e.g. 'script.3f2a9c1b7d4e.js') that are cached as immutable, and
+index.html is rewritten to reference them and revalidated via its ETag on every visit.
+Gzip (and, if the 'brotli' package is installed, Brotli) variants are compressed once
+at startup and chosen per request by Accept-Encoding.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError: # Optional: without it only gzip variants are produced
+    brotli = None
+
+
+# Assets referenced by index.html that get a content-hashed URL
+HASHED_ASSETS = ["script.js", "stylesheet.css"]
+
+# Hashed URLs never change their content
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# index.html and unhashed URLs are stored, but revalidated on every use
+REVALIDATE = "no-cache"
+
+# Smaller files are served uncompressed (compression would not pay off)
+MIN_COMPRESS_SIZE = 1024
+
+
+@dataclass
+class Asset:
+    """An in-memory static file with its precompressed variants."""
+    body: bytes
+    media_type: str
+    cache_control: str
+    etag: str = ""
+    encoded: dict = field(default_factory=dict) # {'br'|'gzip': compressed body}
+
+    def __post_init__(self):
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:16] + '"'
+        if len(self.body) >= MIN_COMPRESS_SIZE:
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(self.body, quality=11)
+            self.encoded["gzip"] = gzip.compress(self.body, compresslevel=9, mtime=0)
+
+
+def hashed_name(name: str, body: bytes) -> str:
+    """'script.js' -> 'script.<first 12 hex digits of the SHA-256>.js'."""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(body).hexdigest()[:12]}{ext}"
+
+
+def build_assets(directory: str) -> dict:
+    """
+    Loads index.html and the hashed assets of a directory into memory.
+
+    :return: {request path relative to the mount: Asset}
+    """
+    assets = {}
+    index = open(os.path.join(directory, "index.html"), "rb").read().decode("utf-8")
+
+    for name in HASHED_ASSETS:
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            continue
+        body = open(path, "rb").read()
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+        hashed = hashed_name(name, body)
+        assets[hashed] = Asset(body, media_type, IMMUTABLE)
+        assets[name] = Asset(body, media_type, REVALIDATE) # Pages cached before the hashing was introduced
+        index = re.sub(rf'((?:src|href)=")(?:\./)?{re.escape(name)}"', rf'\g<1>{hashed}"', index)
+
+    page = Asset(index.encode("utf-8"), "text/html; charset=utf-8", REVALIDATE)
+    assets["."] = assets["index.html"] = page
+    return assets
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict:
+    """'gzip;q=0.5, br' -> {'gzip': 0.5, 'br': 1.0}. Malformed q values count as 0."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def choose_encoding(asset: Asset, accept_encoding: str):
+    """
+    Picks the precompressed variant with the highest q value the client accepts
+    (Brotli before gzip on ties). Encodings with q=0 are never chosen.
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in ("br", "gzip"):
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in asset.encoded and q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class SpaStaticFiles(StaticFiles):
+    """StaticFiles serving index.html and the hashed assets from memory; other files from disk."""
+
+    def __init__(self, directory: str):
+        super().__init__(directory=directory, html=True)
+        self.assets = build_assets(directory)
+
+    async def get_response(self, path: str, scope) -> Response:
+        asset = self.assets.get(path)
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(asset, request_headers.get("accept-encoding", ""))
+
+        # Every encoding is a different representation and gets its own validator
+        etag = asset.etag if encoding is None else f'{asset.etag[:-1]}-{encoding}"'
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+
+        if etag in [tag.strip() for tag in request_headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        body = asset.body if encoding is None else asset.encoded[encoding]
+        return Response(body, media_type=asset.media_type, headers=headers)
@@ -0,0 +1,62 @@
+"""
+Delta synchronization module.
+Encodes the point in time of the last synchronization into an opaque token, so that
+clients only download categories and entries that changed since their last request.
+"""
+import base64
+import os
+from datetime import datetime, timedelta, UTC
+from typing import Optional
+from fastapi import HTTPException
+
+
+# Tombstones are kept for this many days. Older tokens require a full reload.
+TOMBSTONE_RETENTION = timedelta(days=int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30")))
+
+# Overlap of consecutive sync windows. Covers transactions that started before but
+# committed after the previous sync. Clients apply changes idempotently.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def encode_token(timestamp: datetime) -> str:
+    """
+    Serializes the server time of a synchronization into an opaque, URL-safe token.
+
+    :param timestamp: Server time (UTC) at the start of the synchronization.
+    :return: Base64 encoded token string.
+    """
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> datetime:
+    """
+    Restores the synchronization time from a token created by encode_token.
+
+    :param token: Opaque token sent by the client.
+    :raises HTTPException: On manipulated or malformed tokens (400).
+    :return: Timezone-aware UTC datetime.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        timestamp = datetime.fromisoformat(base64.urlsafe_b64decode(padded).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, "Invalid sync token")
+
+    # Ensure timezone consistency (UTC) for time comparison
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=UTC)
+    return timestamp
+
+
+def changes_since(token: Optional[str], now: datetime) -> Optional[datetime]:
+    """
+    Determines the lower bound of the change window for a sync request.
+    Returns None if the client has to reload everything (no token or token older than the tombstones).
+    """
+    if not token:
+        return None
+
+    since = decode_token(token)
+    if since < now - TOMBSTONE_RETENTION:
+        return None
+    return since - SYNC_OVERLAP
@@ -0,0 +1,91 @@
+"""
+In-process cache module.
+Provides a bounded, thread-safe LRU cache whose entries expire after a fixed time to live.
+Used for data that is read on (almost) every request but changes rarely.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Least-recently-used cache with a per-entry expiry time.
+    All operations are guarded by a lock, so the cache can be shared by the threadpool
+    workers that execute FastAPI's synchronous dependencies and routes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        :param maxsize: Maximum number of entries; the least recently used entry is evicted first.
+        :param ttl: Default time to live of an entry in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the cached value, or None if the key is missing or expired.
+        Counts the lookup as hit or miss.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            item = self._data.get(key)
+
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Stores a value. A shorter ttl can be given for values that become invalid earlier.
+        """
+        expires = time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl))
+
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        """Removes a single entry, if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Removes all entries whose value matches the predicate.
+
+        :return: Number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        """Removes all entries and resets the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns size and hit/miss counters for monitoring."""
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
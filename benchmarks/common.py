@@ -0,0 +1,104 @@
+"""
+Shared helpers for the HTTP benchmarks.
+The benchmarks talk to a running server (uvicorn) and never import the app, so they
+measure the complete stack including the event loop and the threadpool.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import statistics
+import time
+import uuid
+import httpx
+
+
+# Target server; registration must work without email verification (EMAIL_VERIFICATION_ENABLED=False)
+BASE_URL = os.getenv("BENCH_URL", "http://127.0.0.1:8000")
+
+# Repository root, working directory of servers started by the benchmarks
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples: list, p: float) -> float:
+    """Returns the p-th percentile (0-100) of the samples using nearest-rank."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(name: str, samples: list):
+    """Prints count, median, p95, p99 and maximum of latency samples (seconds) in milliseconds."""
+    if not samples:
+        print(f"{name:<28} no samples")
+        return
+    print(f"{name:<28} n={len(samples):<6} p50={statistics.median(samples) * 1000:8.1f}ms "
+          f"p95={percentile(samples, 95) * 1000:8.1f}ms p99={percentile(samples, 99) * 1000:8.1f}ms "
+          f"max={max(samples) * 1000:8.1f}ms")
+
+
+def summarize(samples: list) -> dict:
+    """Latency statistics of samples (seconds) in milliseconds, for machine-readable results."""
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2)
+    }
+
+
+def git_commit() -> str:
+    """Current commit of the repository (with '-dirty' for uncommitted changes), to label results."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def timed(coro) -> float:
+    """Awaits a request coroutine and returns its duration in seconds."""
+    start = time.perf_counter()
+    response = await coro
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def register_user(client: httpx.AsyncClient, prefix: str = "bench") -> dict:
+    """Registers a fresh user and returns the Bearer header of its session."""
+    suffix = uuid.uuid4().hex[:10]
+    response = await client.post("/register", json={
+        "name": f"{prefix}_{suffix}",
+        "email": f"{prefix}_{suffix}@example.com",
+        "password": "Benchmark123"
+    })
+    response.raise_for_status()
+    return {"Authorization": "Bearer " + response.json()["token"]}
+
+
+def start_server(database_url: str, port: int, **env_overrides) -> subprocess.Popen:
+    """Starts a single uvicorn worker for the given database URL and additional environment variables."""
+    env = {**os.environ, "DATABASE_URL": database_url, "EMAIL_VERIFICATION_ENABLED": "False", **env_overrides}
+    env.setdefault("MAIL_USERNAME", "bench@example.com")
+    env.setdefault("MAIL_PASSWORD", "bench")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient):
+    """Waits until the server started by start_server accepts requests."""
+    for _ in range(100):
+        try:
+            await client.get("/docs")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not start")
@@ -0,0 +1,75 @@
+"""
+Benchmark: synchronous vs. async database layer at high concurrency.
+
+Starts one uvicorn worker per mode (sync: 'sqlite:///', async: 'sqlite+aiosqlite:///' or
+the given URLs), seeds a user with entries and hammers the ported entry and category
+routes with many concurrent clients. Reports requests per second and tail latency.
+
+Usage:
+    python benchmarks/db_modes.py --concurrency 200 --duration 10
+    python benchmarks/db_modes.py --sync-url postgresql://... --async-url postgresql+asyncpg://...
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import httpx
+from common import register_user, report, start_server, wait_until_ready
+
+
+async def run_mode(name: str, database_url: str, port: int, concurrency: int, duration: float):
+    server = start_server(database_url, port)
+    limits = httpx.Limits(max_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_until_ready(client)
+            headers = await register_user(client, name)
+            category_id = (await client.get("/categories/", headers=headers)).json()[0]["id"]
+            await client.post("/entries/bulk", headers=headers, json={"items": [
+                {"category_id": category_id, "occurred_at": f"2025-01-{1 + i % 28:02d}T10:00:00", "values": {}}
+                for i in range(1000)
+            ]})
+
+            samples, errors = [], 0
+            deadline = time.perf_counter() + duration
+
+            async def client_loop(n: int):
+                nonlocal errors
+                requests = [("/entries/", {"limit": 50}), ("/categories/", {}), ("/entries/aggregate", {"fn": "count"})]
+                while time.perf_counter() < deadline:
+                    path, params = requests[n % len(requests)]
+                    start = time.perf_counter()
+                    response = await client.get(path, headers=headers, params=params)
+                    if response.status_code != 200:
+                        errors += 1
+                    samples.append(time.perf_counter() - start)
+                    n += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*[client_loop(i) for i in range(concurrency)])
+            elapsed = time.perf_counter() - started
+
+        print(f"\n[{name}] {database_url}")
+        print(f"{'requests per second':<28} {len(samples) / elapsed:.1f} ({errors} errors)")
+        report("latency", samples)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_url = args.sync_url or f"sqlite:///{os.path.join(tmp, 'sync.db')}"
+        async_url = args.async_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'async.db')}"
+        await run_mode("sync", sync_url, 8801, args.concurrency, args.duration)
+        await run_mode("async", async_url, 8802, args.concurrency, args.duration)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10, help="Measurement duration per mode in seconds")
+    parser.add_argument("--sync-url", help="Database URL of the sync run (default: temporary SQLite file)")
+    parser.add_argument("--async-url", help="Database URL of the async run (default: temporary SQLite file)")
+    asyncio.run(main(parser.parse_args()))
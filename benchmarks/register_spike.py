@@ -0,0 +1,69 @@
+"""
+Load test: latency of GET /entries/ during a burst of registrations.
+
+Measures the entry listing of an existing user twice: once on an idle server and once
+while many clients register at the same time. If registration blocks the event loop
+(synchronous database access or Argon2 hashing inside 'async def'), the p95/max
+latency of the second phase grows with the number of sign-ups.
+
+Usage (server started with EMAIL_VERIFICATION_ENABLED=False):
+    uvicorn app.main:app --workers 1
+    python benchmarks/register_spike.py --registrations 50 --readers 4
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from common import BASE_URL, register_user, report, timed
+
+
+async def read_entries(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, samples: list):
+    """Requests the first entry page in a loop until stopped and records every latency."""
+    while not stop.is_set():
+        samples.append(await timed(client.get("/entries/", headers=headers, params={"limit": 100})))
+
+
+async def measure(client: httpx.AsyncClient, headers: dict, readers: int, during=None) -> list:
+    """Runs the readers for the duration of 'during' (a coroutine) or for two seconds."""
+    samples = []
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(read_entries(client, headers, stop, samples)) for _ in range(readers)]
+
+    await (during if during is not None else asyncio.sleep(2))
+    stop.set()
+    await asyncio.gather(*tasks)
+    return samples
+
+
+async def main(registrations: int, readers: int):
+    limits = httpx.Limits(max_connections=registrations + readers)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=120) as client:
+        headers = await register_user(client, "reader")
+        categories = (await client.get("/categories/", headers=headers)).json()
+        await client.post("/entries/bulk", headers=headers, json={"items": [
+            {"category_id": categories[0]["id"], "occurred_at": f"2025-01-01T{i % 24:02d}:00:00", "values": {}}
+            for i in range(500)
+        ]})
+
+        report("GET /entries/ (idle)", await measure(client, headers, readers))
+
+        signup_samples = []
+
+        async def signup():
+            start = time.perf_counter()
+            await register_user(client, "spike")
+            signup_samples.append(time.perf_counter() - start)
+
+        async def spike():
+            await asyncio.gather(*[signup() for _ in range(registrations)])
+
+        report("GET /entries/ (sign-up spike)", await measure(client, headers, readers, spike()))
+        report("POST /register", signup_samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--registrations", type=int, default=50, help="Concurrent registrations in the spike")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent clients reading /entries/")
+    args = parser.parse_args()
+    asyncio.run(main(args.registrations, args.readers))
@@ -0,0 +1,98 @@
+"""
+Microbenchmark: serialization of entry lists on the old and the fast path of GET /entries/.
+
+Unlike the HTTP benchmarks this one imports the app and runs in-process against an
+in-memory SQLite database, so it isolates loading and encoding from network and server.
+  old:  ORM objects -> validated schemas.EntryPage -> JSON (what the response model did)
+  fast: plain column tuples -> dicts -> orjson (app/serialization.py)
+Reports the median time per 10k entries of both paths and the speedup.
+
+Usage:
+    python benchmarks/serialization.py --entries 10000 --repeat 7
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+# The app package lives in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, serialize_json
+from app.serialization import FastJSONResponse, entry_dicts
+import app.models as models
+import app.schemas as schemas
+
+
+def seed(engine, count: int):
+    """Creates one user and category with 'count' entries of a typical fitness payload."""
+    with Session(engine) as db:
+        user = models.User(name="bench", email="bench@example.com", password_hash="x", is_active=True)
+        db.add(user)
+        db.flush()
+        category = models.Category(name="Fitness", user_id=user.id)
+        db.add(category)
+        db.flush()
+
+        start = datetime(2025, 1, 1, 6, 0)
+        db.execute(insert(models.Entry), [
+            {"user_id": user.id, "category_id": category.id, "occurred_at": start + timedelta(minutes=i),
+             "note": f"Eintrag {i}", "data": {"Übung": "Laufen", "Dauer": 30 + i % 60, "Strecke": 5.5}}
+            for i in range(count)
+        ])
+        db.commit()
+
+
+def old_path(engine) -> bytes:
+    with Session(engine) as db:
+        rows = db.scalars(select(models.Entry).order_by(models.Entry.occurred_at.desc())).all()
+        page = schemas.EntryPage.model_validate({"items": rows, "next_cursor": None}, from_attributes=True)
+        return json.dumps(page.model_dump(mode="json"), ensure_ascii=False).encode()
+
+
+def fast_path(engine) -> bytes:
+    with Session(engine) as db:
+        rows = db.execute(
+            select(models.Entry.id, models.Entry.category_id, models.Entry.occurred_at, models.Entry.note,
+                   models.Entry.data).order_by(models.Entry.occurred_at.desc())
+        ).all()
+        return FastJSONResponse({"items": entry_dicts(rows), "next_cursor": None}).body
+
+
+def measure(fn, engine, repeat: int) -> float:
+    """Median duration of 'repeat' runs in seconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(engine)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main(args):
+    engine = create_engine("sqlite://", json_serializer=serialize_json)
+    Base.metadata.create_all(engine)
+    seed(engine, args.entries)
+
+    assert json.loads(old_path(engine)) == json.loads(fast_path(engine)), "Both paths must produce the same JSON"
+
+    scale = 10000 / args.entries
+    old = measure(old_path, engine, args.repeat) * scale
+    fast = measure(fast_path, engine, args.repeat) * scale
+
+    print(f"\n{args.entries} entries, median of {args.repeat} runs, normalized to 10k entries")
+    print(f"{'old (ORM + Pydantic + json)':<32} {old * 1000:8.1f}ms")
+    print(f"{'fast (tuples + orjson)':<32} {fast * 1000:8.1f}ms")
+    print(f"{'speedup':<32} {old / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=10000, help="Number of entries in the list")
+    parser.add_argument("--repeat", type=int, default=7, help="Measured runs per path")
+    main(parser.parse_args())
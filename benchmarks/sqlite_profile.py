@@ -0,0 +1,75 @@
+"""
+Benchmark: mixed read/write throughput of SQLite with and without the production profile.
+
+Runs the same workload twice against a fresh SQLite file: once with SQLite's defaults
+(SQLITE_PRAGMAS_ENABLED=False: rollback journal, synchronous=FULL) and once with the
+production pragmas (WAL, synchronous=NORMAL, busy_timeout, mmap, cache). Each client
+alternates between reading the entry list and creating entries according to --write-ratio.
+Reports requests per second, failed requests (e.g. 'database is locked') and latency.
+
+Usage:
+    python benchmarks/sqlite_profile.py --concurrency 64 --duration 10 --write-ratio 0.2
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import httpx
+from common import register_user, report, start_server, wait_until_ready
+
+
+async def run_profile(name: str, database_url: str, port: int, args, **env):
+    server = start_server(database_url, port, **env)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_until_ready(client)
+            headers = await register_user(client, name.split()[0])
+            category_id = (await client.get("/categories/", headers=headers)).json()[0]["id"]
+
+            reads, writes, errors = [], [], 0
+            deadline = time.perf_counter() + args.duration
+
+            async def client_loop():
+                nonlocal errors
+                while time.perf_counter() < deadline:
+                    write = random.random() < args.write_ratio
+                    start = time.perf_counter()
+                    if write:
+                        response = await client.post("/entries/", headers=headers, json={
+                            "category_id": category_id, "occurred_at": "2025-01-01T10:00:00", "values": {"Dauer": 30}
+                        })
+                    else:
+                        response = await client.get("/entries/", headers=headers, params={"limit": 50})
+                    if response.status_code != 200:
+                        errors += 1
+                    (writes if write else reads).append(time.perf_counter() - start)
+
+            started = time.perf_counter()
+            await asyncio.gather(*[client_loop() for _ in range(args.concurrency)])
+            elapsed = time.perf_counter() - started
+
+        print(f"\n[{name}]")
+        print(f"{'requests per second':<28} {(len(reads) + len(writes)) / elapsed:.1f} ({errors} failed)")
+        report("GET /entries/", reads)
+        report("POST /entries/", writes)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        await run_profile("defaults", f"sqlite:///{os.path.join(tmp, 'defaults.db')}", 8811, args,
+                          SQLITE_PRAGMAS_ENABLED="False")
+        await run_profile("production profile", f"sqlite:///{os.path.join(tmp, 'profile.db')}", 8812, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10, help="Measurement duration per profile in seconds")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Share of requests that create entries")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,26 @@
+import os
+import sys
+
+# System path manipulation MUST occur before local imports to resolve modules correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import SessionLocal
+from app.entry_values import backfill
+
+
+def run():
+    """Rebuilds the typed numeric values (entry_value) of all entries from their JSON data."""
+    print("\n--- Starting Entry Value Backfill ---")
+
+    db = SessionLocal()
+    try:
+        processed = backfill(db)
+        print(f"Processed {processed} entries.")
+    finally:
+        db.close()
+
+    print("--- Backfill Finished ---\n")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,33 +1,62 @@
+"""
+Test data generator for scale tests.
+Creates N users (with the default categories) and fills each with a coherent history of
+entries. Every user gets its own random generator derived from --seed and its name, so the
+data is reproducible and independent of the number of worker processes. Entries are written
+in chunks with one Core executemany each (no ORM objects, constant memory), users are spread
+over --workers processes, and the derived tables (typed values, daily totals, value statistics)
+are written in the same transaction as every chunk.
+
+Usage:
+    python scripts/generate_test_data.py --users 5000 --workers 8 --seed 42
+    python scripts/generate_test_data.py --user Testuser   # adds a history to an existing account
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
 import random
+import sys
+import time
 from datetime import datetime, timedelta
-from app.database import SessionLocal
+
+# System path manipulation MUST occur before local imports to resolve modules correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, select
+from app.auth import get_password_hash
+from app.caching import bump_data_version
+from app.database import SessionLocal, engine
+from app.default_categories import seed_default_categories
+from app.entry_values import write_entry_values
+from app.field_values import record_field_values
+from app.migrations import upgrade as upgrade_schema
+from app.rollups import add_to_rollup
 from app import models
 
 # --- CONFIGURATION ---
-TARGET_USERNAME = "Testuser"
 START_DATE = datetime(2025, 1, 1)
 END_DATE = datetime(2026, 3, 31)
 SKIP_PROBABILITY = 0.3  # 30% chance to skip tracking for non-essential categories
 
-db = SessionLocal()
-
+# Rows per executemany and transaction
+CHUNK_SIZE = 10000
 
-def get_user(username):
-    """Retrieves the user object from the database."""
-    return db.query(models.User).filter(models.User.name == username).first()
+# Password of generated accounts (they are created as verified)
+DEFAULT_PASSWORD = "Testdaten123"
 
 
-def create_timestamp(target_date):
+def create_timestamp(rng, target_date):
     """Generates a random time for a specific date within the defined range."""
     # Random time between 07:00 and 23:00
-    hour = random.randint(7, 23)
-    minute = random.randint(0, 59)
+    hour = rng.randint(7, 23)
+    minute = rng.randint(0, 59)
     return target_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
 
 
 # --- LOGIC GENERATORS ---
 
-def generate_fitness_data(available_labels):
+def generate_fitness_data(rng, available_labels):
     """
     Generates coherent fitness data.
     E.g.: Jogging includes distance, bench press includes weight.
@@ -40,8 +69,8 @@ def generate_fitness_data(available_labels):
         {"name": "Yoga", "type": "flex", "kcal_per_min": 3},
     ]
 
-    act = random.choice(activities)
-    duration = random.choice([20, 30, 45, 60, 90])  # Minutes
+    act = rng.choice(activities)
+    duration = rng.choice([20, 30, 45, 60, 90])  # Minutes
 
     # Calculate base data
     data = {}
@@ -55,7 +84,7 @@ def generate_fitness_data(available_labels):
     # Energy (Calculation: duration * factor)
     kcal = duration * act["kcal_per_min"]
     # Add some variance (+/- 10%)
-    kcal = int(kcal * random.uniform(0.9, 1.1))
+    kcal = int(kcal * rng.uniform(0.9, 1.1))
     data["Energie"] = kcal
 
     # Distance (Logical only for cardio)
@@ -68,7 +97,7 @@ def generate_fitness_data(available_labels):
 
     # Weight (Logical only for strength training)
     if act["type"] == "kraft":
-        data["Gewicht"] = random.choice([40, 50, 60, 80, 100])
+        data["Gewicht"] = rng.choice([40, 50, 60, 80, 100])
     else:
         data["Gewicht"] = 0
 
@@ -87,7 +116,7 @@ def generate_fitness_data(available_labels):
     return result_values
 
 
-def generate_nutrition_data(available_labels):
+def generate_nutrition_data(rng, available_labels):
     """Generates coherent nutrition data (calories match the amount)."""
     foods = [
         {"name": "Apfel", "kcal_100g": 52},
@@ -99,8 +128,8 @@ def generate_nutrition_data(available_labels):
         {"name": "Schokolade", "kcal_100g": 546},
     ]
 
-    food = random.choice(foods)
-    amount = random.choice([100, 150, 200, 300, 500])  # Grams
+    food = rng.choice(foods)
+    amount = rng.choice([100, 150, 200, 300, 500])  # Grams
 
     total_kcal = int((amount / 100) * food["kcal_100g"])
 
@@ -119,12 +148,12 @@ def generate_nutrition_data(available_labels):
     return result_values
 
 
-def generate_sleep_data(available_labels):
+def generate_sleep_data(rng, available_labels):
     """Generates sleep data (recovery slightly correlates with duration)."""
-    duration = random.randint(5, 10)  # Hours
+    duration = rng.randint(5, 10)  # Hours
 
     # Logic: Longer sleep usually implies better recovery
-    recovery = duration + random.randint(-2, 1)
+    recovery = duration + rng.randint(-2, 1)
     # Clamp value between 1 and 10
     recovery = max(1, min(10, recovery))
 
@@ -140,7 +169,7 @@ def generate_sleep_data(available_labels):
     return result_values
 
 
-def generate_diary_data(available_labels):
+def generate_diary_data(rng, available_labels):
     """Generates diary data with randomized moods and highlights."""
     highlights = ["Sport gemacht", "Projekt beendet", "Gut gegessen", "Freunde getroffen", "Film geschaut",
                   "Code geschrieben"]
@@ -149,9 +178,9 @@ def generate_diary_data(available_labels):
     for label in available_labels:
         l = label.lower()
         if "laune" in l or "stimmung" in l:
-            result_values[label] = random.randint(3, 10)
+            result_values[label] = rng.randint(3, 10)
         elif "highlight" in l or "notiz" in l:
-            result_values[label] = random.choice(highlights)
+            result_values[label] = rng.choice(highlights)
         else:
             result_values[label] = "-"
     return result_values
@@ -159,86 +188,188 @@ def generate_diary_data(available_labels):
 
 # --- MAIN PROGRAM ---
 
-def run():
-    print(f"--- Starting Smart Data Generator for User: {TARGET_USERNAME} ---")
-
-    user = get_user(TARGET_USERNAME)
-    if not user:
-        print(f"User '{TARGET_USERNAME}' not found. Please register/login first.")
-        return
-
-    categories = db.query(models.Category).filter(models.Category.user_id == user.id).all()
-    if not categories:
-        print("No categories found.")
-        return
-
-    total_entries = 0
+def generate_entries(rng, user_id, categories, start, end):
+    """
+    Yields the entry rows of a user, category by category and day by day.
 
+    :param categories: (category_id, name, field labels) of the user.
+    """
     # Calculate the total number of days between start and end date
-    delta = END_DATE - START_DATE
+    delta = end - start
 
     # Iterate over all categories
-    for cat in categories:
-        cat_name_lower = cat.name.lower()
-        field_labels = [f.label for f in cat.fields]
-
-        print(f"Processing category: {cat.name}...")
+    for cat_id, cat_name, field_labels in categories:
+        cat_name_lower = cat_name.lower()
 
         # Determine if the current category MUST be tracked every day
         is_essential = "ernährung" in cat_name_lower or "essen" in cat_name_lower or "schlaf" in cat_name_lower
 
         # Iterate through the specific date range
         for day_offset in range(delta.days + 1):
-            current_date = START_DATE + timedelta(days=day_offset)
+            current_date = start + timedelta(days=day_offset)
 
             # Apply random skip logic for non-essential categories
             if not is_essential:
-                if random.random() < SKIP_PROBABILITY:
+                if rng.random() < SKIP_PROBABILITY:
                     continue
 
             # Decide how many entries to create for this category today
             count = 1
             if "ernährung" in cat_name_lower:
-                count = random.randint(1, 4)  # People eat multiple times a day
+                count = rng.randint(1, 4)  # People eat multiple times a day
 
             for _ in range(count):
-                ts = create_timestamp(current_date)
+                ts = create_timestamp(rng, current_date)
                 values = {}
                 note = ""
 
                 # --- Choose strategy based on category name ---
                 if "fitness" in cat_name_lower or "sport" in cat_name_lower:
-                    values = generate_fitness_data(field_labels)
+                    values = generate_fitness_data(rng, field_labels)
                     note = "Training"
                 elif "ernährung" in cat_name_lower or "essen" in cat_name_lower:
-                    values = generate_nutrition_data(field_labels)
+                    values = generate_nutrition_data(rng, field_labels)
                 elif "schlaf" in cat_name_lower:
-                    values = generate_sleep_data(field_labels)
+                    values = generate_sleep_data(rng, field_labels)
                     # Sleep usually occurs only once per day
                     if _ > 0: continue
                 elif "tagebuch" in cat_name_lower:
-                    values = generate_diary_data(field_labels)
+                    values = generate_diary_data(rng, field_labels)
                     if _ > 0: continue
                 else:
                     # Fallback for unknown categories (simple random values)
                     for l in field_labels:
-                        values[l] = "Test-" + str(random.randint(1, 100))
-
-                # Save the entry
-                entry = models.Entry(
-                    user_id=user.id,
-                    category_id=cat.id,
-                    occurred_at=ts,
-                    note=note,
-                    data=values
-                )
-                db.add(entry)
-                total_entries += 1
+                        values[l] = "Test-" + str(rng.randint(1, 100))
 
+                yield {"user_id": user_id, "category_id": cat_id, "occurred_at": ts, "note": note, "data": values}
+
+
+def ensure_user(db, name, password_hash):
+    """Returns the ID of the user with this name, creating a verified account with the default categories."""
+    user_id = db.scalar(select(models.User.id).where(models.User.name == name))
+    if user_id is not None:
+        return user_id
+
+    user = models.User(name=name, email=f"{name}@example.com", password_hash=password_hash, is_active=True)
+    db.add(user)
+    db.flush()
+    seed_default_categories(db, user.id)
+    db.commit()
+    return user.id
+
+
+def load_categories(db, user_id):
+    """Categories of a user with the labels of their fields: [(category_id, name, [labels])]."""
+    labels = {}
+    for category_id, label in db.execute(
+        select(models.CategoryField.category_id, models.CategoryField.label).join(models.Category)
+        .where(models.Category.user_id == user_id).order_by(models.CategoryField.id)
+    ):
+        labels.setdefault(category_id, []).append(label)
+
+    return [
+        (category_id, name, labels.get(category_id, []))
+        for category_id, name in db.execute(select(models.Category.id, models.Category.name)
+                                            .where(models.Category.user_id == user_id).order_by(models.Category.id))
+    ]
+
+
+def write_chunk(db, chunk):
+    """
+    Inserts a chunk of entry rows with one Core executemany and writes their typed values,
+    daily totals (from the written typed values) and value statistics in the same transaction.
+    """
+    # Core path (no ORM bulk bookkeeping); RETURNING yields the assigned IDs in row order
+    table = models.Entry.__table__
+    ids = db.scalars(insert(table).returning(table.c.id, sort_by_parameter_order=True), chunk).all()
+    values = write_entry_values(db, [(entry_id, row["category_id"], row["data"])
+                                     for entry_id, row in zip(ids, chunk)], replace=False)
+
+    add_to_rollup(db, [(row["user_id"], row["category_id"], row["occurred_at"], values.get(entry_id, {}))
+                       for entry_id, row in zip(ids, chunk)])
+    record_field_values(db, added=[(row["category_id"], row["data"], row["occurred_at"]) for row in chunk])
     db.commit()
-    print(f"Done! {total_entries} entries were created.")
-    db.close()
+
+
+def generate_user(task):
+    """Creates (or reuses) one user and writes its entries in chunks. Runs in a worker process."""
+    name, password_hash, args = task
+    rng = random.Random(f"{args.seed}-{name}")
+
+    with SessionLocal() as db:
+        user_id = ensure_user(db, name, password_hash)
+        categories = load_categories(db, user_id)
+
+        rows = generate_entries(rng, user_id, categories, args.start, args.end)
+        created = 0
+        while chunk := list(itertools.islice(rows, args.chunk_size)):
+            write_chunk(db, chunk)
+            created += len(chunk)
+
+        bump_data_version(db, user_id)
+        db.commit()
+    return created
+
+
+def init_worker():
+    """Forked workers must not reuse the pooled connections of the parent process."""
+    engine.dispose(close=False)
+
+
+def run(args):
+    print("--- Starting Test Data Generator ---")
+    upgrade_schema(engine) # Also works on an empty database
+
+    if args.user:
+        with SessionLocal() as db:
+            if db.scalar(select(models.User.id).where(models.User.name == args.user)) is None:
+                print(f"User '{args.user}' not found. Please register/login first.")
+                return
+        names = [args.user]
+    else:
+        names = [f"{args.prefix}{i}" for i in range(1, args.users + 1)]
+
+    # Hashed once: Argon2 is deliberately slow
+    password_hash = get_password_hash(args.password)
+    tasks = [(name, password_hash, args) for name in names]
+
+    started = time.perf_counter()
+    total, done = 0, 0
+    step = max(1, len(tasks) // 20)
+
+    def progress(created):
+        nonlocal total, done
+        total += created
+        done += 1
+        if done % step == 0 or done == len(tasks):
+            elapsed = time.perf_counter() - started
+            print(f"{done}/{len(tasks)} users, {total} entries ({total / elapsed:,.0f} entries/s)")
+
+    if args.workers > 1:
+        with multiprocessing.Pool(args.workers, initializer=init_worker) as pool:
+            for created in pool.imap_unordered(generate_user, tasks):
+                progress(created)
+    else:
+        for task in tasks:
+            progress(generate_user(task))
+
+    print(f"Done! {total} entries were created in {time.perf_counter() - started:.1f}s.")
+
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1, help="Number of generated users")
+    parser.add_argument("--prefix", default="testuser", help="Name prefix of generated users (testuser1, testuser2, ...)")
+    parser.add_argument("--user", help="Fill an existing account instead of generating users")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of generated users")
+    parser.add_argument("--start", type=parse_date, default=START_DATE, help="First day of the history (YYYY-MM-DD)")
+    parser.add_argument("--end", type=parse_date, default=END_DATE, help="Last day of the history (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for reproducible data")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parallel processes (PostgreSQL scales best; SQLite serializes the writes)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per INSERT and transaction")
+    run(parser.parse_args())
@@ -0,0 +1,27 @@
+import os
+import sys
+
+# System path manipulation MUST occur before local imports to resolve modules correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import engine
+from app.migrations import upgrade
+
+
+def run():
+    """Applies pending schema changes (e.g. new indexes) to the configured database."""
+    print("\n--- Starting Database Migration ---")
+
+    changes = upgrade(engine)
+
+    if changes:
+        for change in changes:
+            print(f"Created {change}")
+    else:
+        print("Database schema is up to date.")
+
+    print("--- Migration Finished ---\n")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,26 @@
+import os
+import sys
+
+# System path manipulation MUST occur before local imports to resolve modules correctly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database import SessionLocal
+from app.field_values import rebuild
+
+
+def run(user_id=None):
+    """Recomputes the autocomplete value statistics from the entries (all users, or only the given user ID)."""
+    print("\n--- Starting Field Value Statistics Rebuild ---")
+
+    db = SessionLocal()
+    try:
+        rows = rebuild(db, user_id)
+        print(f"Counted {rows} distinct field values.")
+    finally:
+        db.close()
+
+    print("--- Rebuild Finished ---\n")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -10,7 +10,9 @@ let currentUser = sessionStorage.getItem('lifetracker_user');
 
 // Data-Cache
 let categories = [];
-let entries = [];
+let entries = [];        // loaded window of entries for the current category
+const PAGE_SIZE = 1000;  // maximum page size accepted by GET /entries/
+let syncToken = null;    // token of the last delta sync (GET /sync)
 
 // UI State
 let currentCategory = null;
@@ -62,6 +64,59 @@ async function apiFetch(endpoint, options = {}) {
     }
 }
 
+// Delay between the last keystroke and the suggestion request
+const SUGGESTION_DELAY_MS = 250;
+
+// Fill a datalist with the most frequently used values of a text field (optionally by prefix)
+async function loadSuggestions(categoryId, label, datalist, prefix = '') {
+    // Sequence number of this request: responses of older requests arriving later are ignored
+    const request = Number(datalist.dataset.request || 0) + 1;
+    datalist.dataset.request = request;
+
+    const query = new URLSearchParams({ limit: 20 });
+    if (prefix) query.set('prefix', prefix);
+
+    const res = await apiFetch(`/categories/${categoryId}/fields/${encodeURIComponent(label)}/values?` + query.toString());
+    if (!res || !res.ok) return;
+
+    const values = await res.json();
+    if (request !== Number(datalist.dataset.request)) return;
+
+    datalist.innerHTML = '';
+    values.forEach(v => {
+        const option = document.createElement('option');
+        option.value = v.value;
+        datalist.appendChild(option);
+    });
+}
+
+// Debounced loadSuggestions while typing: only the last keystroke within the delay sends a request
+function scheduleSuggestions(categoryId, label, datalist, prefix) {
+    clearTimeout(Number(datalist.dataset.timer));
+    datalist.dataset.timer = setTimeout(() => loadSuggestions(categoryId, label, datalist, prefix), SUGGESTION_DELAY_MS);
+}
+
+// Fetch entries page by page (keyset pagination) until 'max' entries or the last page is reached
+async function fetchEntries(params = {}, max = Infinity) {
+    const result = [];
+    let cursor = null;
+
+    do {
+        const query = new URLSearchParams(params);
+        query.set('limit', Math.min(PAGE_SIZE, max - result.length));
+        if (cursor) query.set('cursor', cursor);
+
+        const res = await apiFetch('/entries/?' + query.toString());
+        if (!res || !res.ok) break;
+
+        const page = await res.json();
+        result.push(...page.items);
+        cursor = page.next_cursor;
+    } while (cursor && result.length < max);
+
+    return result;
+}
+
 // Helper for local ISO string (without seconds)
 function toLocalISOString(dateObj) {
     const pad = (n) => n < 10 ? '0' + n : n;
@@ -322,6 +377,7 @@ function cancelVerification() {
 function logout() {
     authToken = null;
     currentUser = null;
+    syncToken = null;
     sessionStorage.clear();
 
     // Clear login fields
@@ -344,17 +400,14 @@ async function loadData() {
 
     if (!authToken) return;
 
-    // Get categories and entries from database
-    const catRes = await apiFetch('/categories/');
-    if (catRes && catRes.ok) {
-        categories = await catRes.json();
+    // Get categories and a fresh sync token (entries are loaded per category view)
+    const syncRes = await apiFetch('/sync');
+    if (syncRes && syncRes.ok) {
+        const state = await syncRes.json();
+        categories = state.categories;
+        syncToken = state.token;
     }
 
-    const entRes = await apiFetch('/entries/');
-    if (entRes && entRes.ok) {
-        entries = await entRes.json();
-    }
-     
     renderSidebar();
 
     // Try to reopen the previously opened category
@@ -373,6 +426,58 @@ async function loadData() {
     }
 }
 
+// Apply only the changes since the last sync instead of reloading all data after a write
+async function syncData() {
+    if (!syncToken) return loadData();
+
+    const res = await apiFetch('/sync?since=' + encodeURIComponent(syncToken));
+    if (!res || !res.ok) return;
+
+    const changes = await res.json();
+
+    // Token too old or unknown: fall back to a full reload
+    if (changes.reset) return loadData();
+    syncToken = changes.token;
+
+    // Upsert changed categories and drop deleted ones
+    changes.categories.forEach(cat => {
+        const index = categories.findIndex(c => c.id === cat.id);
+        if (index >= 0) categories[index] = cat;
+        else categories.push(cat);
+    });
+    categories = categories.filter(c => !changes.deleted_categories.includes(c.id));
+    categories.sort((a, b) => a.id - b.id);
+
+    renderSidebar();
+
+    if (!currentCategory) return;
+
+    // The current category was deleted (e.g. in another tab)
+    const current = categories.find(c => c.id === currentCategory.id);
+    if (!current) {
+        currentCategory = null;
+        switchTab('homepage');
+        return;
+    }
+
+    currentCategory = current;
+    document.getElementById('gen-title').innerText = current.name;
+    document.getElementById('gen-desc').innerText = current.description;
+    document.getElementById('nav-cat-' + current.id).classList.add('active');
+
+    // Update the loaded entry window: replace changed entries, remove deleted ones, keep sort order and limit
+    const changedIds = changes.entries.map(e => e.id);
+    entries = entries
+        .filter(e => !changedIds.includes(e.id) && !changes.deleted_entries.includes(e.id))
+        .concat(changes.entries.filter(e => e.category_id === current.id))
+        .sort((a, b) => new Date(b.occurred_at) - new Date(a.occurred_at) || b.id - a.id);
+
+    const limitInput = document.getElementById('entry-limit');
+    entries = entries.slice(0, limitInput ? parseInt(limitInput.value) : 10);
+
+    renderEntryList();
+}
+
 // Render sidebar with categories of current user
 function renderSidebar() {
     const nav = document.getElementById('nav-container');
@@ -497,7 +602,7 @@ async function createCategory() {
     });
 
     if (res && res.ok) {
-        await loadData();
+        await syncData();
         // Open the newly created category (last in the list)
         if (categories.length > 0) {
             openCategory(categories[categories.length - 1]);
@@ -530,7 +635,7 @@ async function editCurrentCategory() {
 
     if (res && res.ok) {
         alert("Kategorie aktualisiert!");
-        await loadData(); // Reload data to see changes
+        await syncData(); // Fetch only the changes
     } else {
         try {
             const err = await res.json();
@@ -558,18 +663,29 @@ async function deleteCurrentCategory() {
         // Reset currentCategory
         currentCategory = null; 
         alert("Kategorie gelöscht.");
-        await loadData(); 
+        await syncData();
+        switchTab('homepage');
     } else {
         alert("Fehler beim Löschen der Kategorie.");
     }
-    loadData();
 }
 
 /*=============================
 * Entry Management
 *==============================*/
+// Load the entry window of the current category (newest first, limited by the dropdown)
+async function loadEntries() {
+    if (!currentCategory) return;
+
+    const limitInput = document.getElementById('entry-limit');
+    // Fallback to 10 if not found
+    const limit = limitInput ? parseInt(limitInput.value) : 10;
+
+    entries = await fetchEntries({ category_id: currentCategory.id }, limit);
+}
+
 // Open a category view to show entries
-function openCategory(cat) {
+async function openCategory(cat) {
     // RESET Edit Mode
     editingEntryId = null;
     editingEntryDate = null;
@@ -584,6 +700,8 @@ function openCategory(cat) {
     document.getElementById('gen-title').innerText = cat.name;
     document.getElementById('gen-desc').innerText = cat.description;
     
+    await loadEntries();
+
     // Render input fields
     const container = document.getElementById('gen-inputs-container');
     container.innerHTML = '';
@@ -613,39 +731,17 @@ function openCategory(cat) {
             input.dataset.label = field.label;
             input.placeholder = field.label;
             
-            // If field label is "Übung", add datalist for correct suggestions
-            if (field.label === "Übung") {
-                input.type = "text";
-                
-                // Fetch all existing exercises from entries for this category
-                const existingExercises = new Set();
-                
-                entries.forEach(e => {
-                    // Only consider entries of the current category (fitness)
-                    if (e.category_id === cat.id && e.data && e.data[field.label]) {
-                        existingExercises.add(e.data[field.label]);
-                    }
-                });
-
-                // Set up datalist id
+            // Text fields get autocomplete suggestions from the server (most frequently used values first)
+            if (field.data_type === 'text') {
                 const listId = "list-" + field.label + "-" + cat.id;
                 input.setAttribute("list", listId);
 
-                // Create datalist element
                 const datalist = document.createElement('datalist');
                 datalist.id = listId;
-                
-                // Add options to datalist
-                existingExercises.forEach(val => {
-                    const option = document.createElement('option');
-                    option.value = val;
-                    datalist.appendChild(option);
-                });
-
                 wrapper.appendChild(datalist);
-            } else {
-                // Standard Verhalten für andere Felder
-                input.type = field.data_type === 'number' ? 'number' : 'text';
+
+                loadSuggestions(cat.id, field.label, datalist);
+                input.addEventListener('input', () => scheduleSuggestions(cat.id, field.label, datalist, input.value));
             }
 
             // --- NEUE LOGIK ENDE ---
@@ -834,7 +930,7 @@ async function saveEntry() {
         editingEntryDate = null;
         document.getElementById('btn-save-entry').innerText = "Speichern";
 
-        await loadData(); // Reload data to see changes
+        await syncData(); // Fetch only the changes
     } else {
         alert("Fehler beim Speichern.");
     }
@@ -882,26 +978,22 @@ async function deleteEntry(id) {
     
     const res = await apiFetch('/entries/' + id, { method: 'DELETE' });
     if(res && res.ok) {
-        await loadData();
+        await syncData();
     }
 }
 
+// Reload the entry window after the limit dropdown changed
+async function changeEntryLimit() {
+    await loadEntries();
+    renderEntryList();
+}
+
 // Render the list of entries for the current category
 function renderEntryList() {
     const tbody = document.getElementById('list-generic');
-    
-    // Read limit from input dropdown
-    const limitInput = document.getElementById('entry-limit');
-    // Fallback to 10 if not found
-    const limit = limitInput ? parseInt(limitInput.value) : 10;
-
-    // Only show entries of the current category
-    const catEntries = entries.filter(e => e.category_id === currentCategory.id);
-
-    // Sort by occurred_at descending and slice at limit
-    const displayedEntries = catEntries.slice(0, limit);
 
-    tbody.innerHTML = displayedEntries.map(e => {
+    // Entries are already filtered by category, sorted by occurred_at descending and limited by the backend
+    tbody.innerHTML = entries.map(e => {
         // e.data is an object with key-value pairs
         let detailsHtml = '';
         if (e.data) {
@@ -939,21 +1031,57 @@ function renderEntryList() {
 * Reporting and Charts
 *==============================*/
 
-function renderReporting() {
-    
-    renderEntryCountChart();
-    renderKcalChart();
-    renderSleepChart();
-    renderFitnessChart();
+async function renderReporting() {
+    // Each chart only requests the time window and category it needs
+    await Promise.all([
+        renderEntryCountChart(),
+        renderKcalChart(),
+        renderSleepChart(),
+        renderFitnessChart()
+    ]);
+}
+
+// Find the first category whose name contains one of the given keywords
+function findCategory(...keywords) {
+    return categories.find(c => keywords.some(k => c.name.toLowerCase().includes(k)));
 }
 
+// Find the first field of a category whose label contains one of the given keywords
+function findField(cat, ...keywords) {
+    if (!cat) return undefined;
+    return cat.fields.find(f => keywords.some(k => f.label.toLowerCase().includes(k)));
+}
+
+// Request a bucketed series from the aggregation endpoint (GROUP BY runs in the database)
+async function fetchAggregate(params) {
+    const res = await apiFetch('/entries/aggregate?' + new URLSearchParams(params).toString());
+    if (!res || !res.ok) return [];
+    return (await res.json()).points;
+}
+
+// Local midnight 'daysAgo' days before today as ISO string (matches the stored local timestamps)
+function startOfDay(daysAgo = 0) {
+    const d = new Date();
+    d.setDate(d.getDate() - daysAgo);
+    d.setHours(0, 0, 0, 0);
+    return toLocalISOString(d);
+}
+
+// Time window and maximum number of entries of the progress chart (one request, no full history)
+const FITNESS_DAYS = 90;
+const FITNESS_MAX_POINTS = 500;
+
 // Chart 1: Sleeping hours past 5 days
-function renderSleepChart() {
+async function renderSleepChart() {
     const ctx = document.getElementById('chart-sleep');
     if (!ctx) return;
 
-    // Find category "schlaf"
-    const sleepCat = categories.find(c => c.name.toLowerCase().includes('schlaf'));
+    // Find category "schlaf" and let the server sum up the sleep duration per day (last 5 days)
+    const sleepCat = findCategory('schlaf');
+    const durationField = findField(sleepCat, 'dauer');
+    const points = durationField ? await fetchAggregate({
+        category_id: sleepCat.id, field: durationField.label, fn: 'sum', bucket: 'day', start: startOfDay(4)
+    }) : [];
     
     const labels = [];
     const dataPoints = [];
@@ -963,29 +1091,15 @@ function renderSleepChart() {
     for (let i = 4; i >= 0; i--) {
         const d = new Date();
         d.setDate(today.getDate() - i);
-        const dateStr = d.toISOString().split('T')[0]; 
+        const dateStr = toLocalISOString(d).split('T')[0]; 
         
         // set label
         const label = d.toLocaleDateString('de-DE', { weekday: 'short', day: '2-digit', month: '2-digit' });
         labels.push(label);
 
-        // sum up sleeping hours for that day
-        let hours = 0;
-        if (sleepCat) {
-            const daysEntries = entries.filter(e => 
-                e.category_id === sleepCat.id && 
-                e.occurred_at.startsWith(dateStr)
-            );
-            
-            daysEntries.forEach(e => {
-                for (const [key, val] of Object.entries(e.data || {})) {
-                    if (key.toLowerCase().includes('dauer')) {
-                        hours += parseFloat(val) || 0;
-                    }
-                }
-            });
-        }
-        dataPoints.push(hours);
+        // sleeping hours of that day (0 if nothing was tracked)
+        const point = points.find(p => p.bucket === dateStr);
+        dataPoints.push(point ? point.value : 0);
     }
 
     // Calculate average sleep hours over the past 5 days
@@ -1022,38 +1136,25 @@ function renderSleepChart() {
 
 
 // Chart 2: Calorie balance today
-function renderKcalChart() {
+async function renderKcalChart() {
     const ctx = document.getElementById('chart-kcal');
     if (!ctx) return;
 
     // Find cat "ernährung" and "fitness"
-    const foodCat = categories.find(c => c.name.toLowerCase().includes('ernährung') || c.name.toLowerCase().includes('essen'));
-    const fitCat = categories.find(c => c.name.toLowerCase().includes('fitness') || c.name.toLowerCase().includes('sport'));
-
-    // Set today's date string
-    const todayStr = new Date().toISOString().split('T')[0];
-
-    // Sum up kcal for a given category today
-    const sumKcal = (cat) => {
-        if (!cat) return 0;
-        let sum = 0;
-        const relevantEntries = entries.filter(e => 
-            e.category_id === cat.id && 
-            e.occurred_at.startsWith(todayStr)
-        );
-        relevantEntries.forEach(e => {
-            for (const [key, val] of Object.entries(e.data || {})) {
-                const k = key.toLowerCase();
-                if (k.includes('energie') || k.includes('kcal') || k.includes('kalorien')) {
-                    sum += parseFloat(val) || 0;
-                }
-            }
+    const foodCat = findCategory('ernährung', 'essen');
+    const fitCat = findCategory('fitness', 'sport');
+
+    // Sum up kcal for a given category today (aggregated by the server)
+    const sumKcal = async (cat) => {
+        const kcalField = findField(cat, 'energie', 'kcal', 'kalorien');
+        if (!kcalField) return 0;
+        const points = await fetchAggregate({
+            category_id: cat.id, field: kcalField.label, fn: 'sum', bucket: 'day', start: startOfDay(0)
         });
-        return sum;
+        return points.reduce((sum, p) => sum + p.value, 0);
     };
 
-    const kcalIn = sumKcal(foodCat);
-    const kcalOut = sumKcal(fitCat);
+    const [kcalIn, kcalOut] = await Promise.all([sumKcal(foodCat), sumKcal(fitCat)]);
 
     // calculate balance
     const balance = kcalIn - kcalOut;
@@ -1090,7 +1191,7 @@ function renderKcalChart() {
 }
 
 // Chart 3: Count of entries per category
-function renderEntryCountChart() {
+async function renderEntryCountChart() {
 const ctx = document.getElementById('chart-balance');
     if(!ctx) return;
     
@@ -1101,10 +1202,11 @@ const ctx = document.getElementById('chart-balance');
     // Map category IDs to names
     categories.forEach(c => catNames[c.id] = c.name);
 
-    // Count entries per category
-    entries.forEach(e => {
-        const name = catNames[e.category_id] || "Unbekannt";
-        counts[name] = (counts[name] || 0) + 1;
+    // Count entries per category (the server returns monthly counts per category)
+    const points = await fetchAggregate({ fn: 'count', bucket: 'month' });
+    points.forEach(p => {
+        const name = catNames[p.category_id] || "Unbekannt";
+        counts[name] = (counts[name] || 0) + p.count;
     });
 
     if(countChart) countChart.destroy();
@@ -1130,35 +1232,30 @@ const ctx = document.getElementById('chart-balance');
     });
 }
 
-// Chart 4: Fitness exercises over past 7 days
-function renderFitnessChart() {
+// Chart 4: Progress of a fitness exercise over the last FITNESS_DAYS days
+async function renderFitnessChart() {
     const exerciseSelect = document.getElementById('prog-exercise');
     const metricSelect = document.getElementById('prog-metric');
     
     // 1. Find fitness category (we look for keywords in the name)
-    const fitCat = categories.find(c => {
-        const n = c.name.toLowerCase();
-        return n.includes('fitness') || n.includes('sport') || n.includes('training');
-    });
+    const fitCat = findCategory('fitness', 'sport', 'training');
 
     if (!fitCat) {
         exerciseSelect.innerHTML = '<option>Keine Fitness-Kategorie gefunden</option>';
         return;
     }
 
-    // 2. Get unique exercise names from entries of this category to populate the exercise dropdown
-    const exerciseNames = new Set();
-    const relevantEntries = entries.filter(e => e.category_id === fitCat.id);
-
-    relevantEntries.forEach(e => {
-        if (e.data && e.data['Übung']) {
-            exerciseNames.add(e.data['Übung']);
-        }
-    });
+    // 2. Get the most used exercise names from the value statistics of the server (no entries are loaded)
+    let exerciseNames = [];
+    const exerciseField = findField(fitCat, 'übung');
+    if (exerciseField && exerciseField.data_type === 'text') {
+        const res = await apiFetch(`/categories/${fitCat.id}/fields/${encodeURIComponent(exerciseField.label)}/values?limit=50`);
+        if (res && res.ok) exerciseNames = (await res.json()).map(v => v.value);
+    }
 
     // 3. Fill exercise dropdown
     exerciseSelect.innerHTML = '<option value="">-- Übung wählen --</option>';
-    Array.from(exerciseNames).sort().forEach(name => {
+    exerciseNames.sort().forEach(name => {
         const opt = document.createElement('option');
         opt.value = name;
         opt.innerText = name;
@@ -1182,33 +1279,31 @@ function renderFitnessChart() {
     });
 }
 
-function updateFitnessChart() {
+async function updateFitnessChart() {
     const ctx = document.getElementById('chart-fitness');
     const exerciseName = document.getElementById('prog-exercise').value;
     const metricLabel = document.getElementById('prog-metric').value;
+    const fitCat = findCategory('fitness', 'sport', 'training');
+    const exerciseField = findField(fitCat, 'übung');
 
     if (!ctx) return;
     
     // If either exercise or metric is not selected, destroy chart and exit
-    if (!exerciseName || !metricLabel) {
+    if (!exerciseName || !metricLabel || !exerciseField) {
         if (fitnessChart) fitnessChart.destroy();
         return;
     }
 
-    // 1. Filter entries for the selected exercise and metric in the fitness category
-
-    // Find fitness category again
-    const fitCat = categories.find(c => {
-        const n = c.name.toLowerCase();
-        return n.includes('fitness') || n.includes('sport') || n.includes('training');
-    });
-    if(!fitCat) return;
+    // 1. Load only the entries of the selected exercise in the recent time window (filtered by the server)
+    const entries = await fetchEntries({
+        category_id: fitCat.id,
+        where: `${exerciseField.label}:eq:${exerciseName}`,
+        start: startOfDay(FITNESS_DAYS)
+    }, FITNESS_MAX_POINTS);
 
-    // Filter entries that belong to the fitness category, have the selected exercise name, and contain the selected metric
-    let dataPoints = entries.filter(e => 
-        e.category_id === fitCat.id && 
-        e.data && 
-        e.data['Übung'] === exerciseName &&
+    // Keep entries that contain the selected metric
+    let dataPoints = entries.filter(e =>
+        e.data &&
         e.data[metricLabel] !== undefined &&
         e.data[metricLabel] !== ""
     );
@@ -1341,6 +1436,23 @@ async function saveUserAccount() {
     }
 }
 
+// Download all entries as CSV or NDJSON file (streamed by the backend)
+async function exportEntries(format) {
+    const res = await apiFetch('/entries/export?format=' + format);
+    if (!res || !res.ok) {
+        alert("Fehler beim Export.");
+        return;
+    }
+
+    // Trigger the browser download via a temporary object URL
+    const url = URL.createObjectURL(await res.blob());
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = 'lifetracker-export.' + format;
+    link.click();
+    URL.revokeObjectURL(url);
+}
+
 // DELETE user account
 async function deleteUserAccount() {
     const confirmName = prompt(`WARNUNG: Dies löscht deinen Account und ALLE Daten endgültig!\n\nBitte tippe deinen Benutzernamen ("${currentUser}") zur Bestätigung:`);
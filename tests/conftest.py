@@ -0,0 +1,105 @@
+import os
+
+# Test configuration MUST be set before the app is imported (settings are read at import time)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("MAIL_USERNAME", "test@example.com")
+os.environ.setdefault("MAIL_PASSWORD", "test")
+os.environ.setdefault("EMAIL_VERIFICATION_ENABLED", "False")
+
+import pytest
+from contextlib import contextmanager
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.auth import token_cache
+from app.database import Base, apply_sqlite_pragmas, get_db, get_session_factory, serialize_json
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """User IDs repeat across the isolated test databases, so cached tokens must not leak between tests."""
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+@pytest.fixture
+def db_engine():
+    """Isolated in-memory database per test (production pragmas), shared across the threads of the TestClient."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+                           json_serializer=serialize_json)
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """Direct database access for preparing and inspecting test data."""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db_engine):
+    """TestClient whose requests run against the isolated test database."""
+    TestingSession = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+    def override_get_db():
+        db = TestingSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSession
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Registers a user (verification disabled) and returns the Bearer header of its session."""
+    response = client.post("/register", json={
+        "name": "Testuser",
+        "email": "testuser@example.com",
+        "password": "SicheresPasswort123"
+    })
+    return {"Authorization": "Bearer " + response.json()["token"]}
+
+
+@pytest.fixture
+def category_id(client, auth_headers):
+    """ID of the default fitness category of the test user."""
+    categories = client.get("/categories/", headers=auth_headers).json()
+    return next(c["id"] for c in categories if "Fitness" in c["name"])
+
+
+@pytest.fixture
+def max_queries(db_engine):
+    """
+    Context manager that fails if the enclosed block executes more SQL statements than allowed.
+    Counts every statement sent to the test database via the 'before_cursor_execute' event.
+    """
+    @contextmanager
+    def check(limit):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", count)
+        try:
+            yield statements
+        finally:
+            event.remove(db_engine, "before_cursor_execute", count)
+
+        assert len(statements) <= limit, (
+            f"{len(statements)} queries executed, at most {limit} allowed:\n" + "\n".join(statements))
+
+    return check
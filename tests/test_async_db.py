@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import pytest
+
+
+# The database mode is chosen at import time, so the async app runs in its own interpreter
+SCENARIO = """
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+token = client.post("/register", json={
+    "name": "Asyncnutzer", "email": "async@example.com", "password": "SicheresPasswort123"
+}).json()["token"]
+headers = {"Authorization": "Bearer " + token}
+
+fitness = next(c for c in client.get("/categories/", headers=headers).json() if "Fitness" in c["name"])
+created = client.post("/entries/", headers=headers, json={
+    "category_id": fitness["id"], "occurred_at": "2025-01-01T10:00:00", "values": {"Dauer": 30}
+}).json()
+assert client.get("/entries/", headers=headers).json()["items"][0]["id"] == created["id"]
+
+category = client.post("/categories/", headers=headers, json={
+    "name": "Lesen", "fields": [{"label": "Seiten", "data_type": "number"}]
+}).json()
+assert category["fields"][0]["label"] == "Seiten"
+assert client.delete(f"/categories/{category['id']}", headers=headers).status_code == 200
+assert client.get("/sync", headers=headers).json()["reset"] is True
+"""
+
+
+def test_async_mode_end_to_end(tmp_path):
+    """PRÜFUNG: Funktionieren Kategorie- und Eintragsrouten mit aiosqlite (DATABASE_URL=sqlite+aiosqlite)?"""
+    pytest.importorskip("aiosqlite")
+
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'async.db'}",
+           "EMAIL_VERIFICATION_ENABLED": "False"}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", SCENARIO], env=env, cwd=root,
+                            capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,71 @@
+import time
+from datetime import datetime, timedelta, UTC
+import app.models as models
+from app.auth import token_cache
+from app.ttl_cache import TTLCache
+
+
+def test_ttl_cache_expires_entries():
+    """PRÜFUNG: Werden Einträge nach Ablauf der TTL verworfen und als Miss gezählt?"""
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.06)
+
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """PRÜFUNG: Wird bei voller Kapazität der am längsten ungenutzte Eintrag entfernt?"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_repeated_requests_hit_cache(client, auth_headers, max_queries):
+    """PRÜFUNG: Wird das Token nach der ersten Anfrage ohne Datenbankzugriff validiert?"""
+    client.get("/entries/", headers=auth_headers)
+    hits = token_cache.hits
+
+    # Only the data version and the entries are queried
+    with max_queries(2):
+        client.get("/entries/", headers=auth_headers)
+    assert token_cache.hits == hits + 1
+
+
+def test_deleted_account_invalidates_token(client, auth_headers):
+    """NEGATIV-TEST: Ist ein gecachtes Token nach dem Löschen des Accounts ungültig?"""
+    client.get("/user", headers=auth_headers)
+    client.delete("/user", headers=auth_headers)
+
+    response = client.get("/user", headers=auth_headers)
+    assert response.status_code == 401
+
+
+def test_cached_token_respects_expiry(client, auth_headers, db_session):
+    """NEGATIV-TEST: Wird ein Token abgelehnt, dessen Ablaufdatum während der Cache-Dauer überschritten ist?"""
+    token = auth_headers["Authorization"].split()[1]
+    session = db_session.query(models.Session).filter(models.Session.token == token).one()
+    session.expires_at = datetime.now(UTC) + timedelta(milliseconds=100)
+    db_session.commit()
+
+    assert client.get("/user", headers=auth_headers).status_code == 200
+    time.sleep(0.15)
+    assert client.get("/user", headers=auth_headers).status_code == 401
+
+
+def test_cache_stats_exposed(client, auth_headers):
+    """PRÜFUNG: Liefert der Monitoring-Endpunkt die Hit- und Miss-Zähler?"""
+    client.get("/user", headers=auth_headers)
+    stats = client.get("/stats/cache", headers=auth_headers).json()["auth_tokens"]
+    assert stats["hits"] >= 1
+    assert stats["misses"] >= 1
@@ -0,0 +1,36 @@
+def test_read_route_sets_etag(client, auth_headers):
+    """PRÜFUNG: Liefern die Lese-Routen ein ETag und Cache-Control?"""
+    response = client.get("/categories/", headers=auth_headers)
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["cache-control"] == "private, no-cache"
+
+
+def test_unchanged_data_returns_304(client, auth_headers):
+    """PRÜFUNG: Antwortet die API mit 304 ohne Body, wenn sich nichts geändert hat?"""
+    etag = client.get("/entries/", headers=auth_headers).headers["etag"]
+
+    response = client.get("/entries/", headers={**auth_headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_write_invalidates_etag(client, auth_headers, category_id):
+    """PRÜFUNG: Ändert sich das ETag nach einem Schreibzugriff?"""
+    etag = client.get("/entries/", headers=auth_headers).headers["etag"]
+
+    client.post("/entries/", headers=auth_headers, json={
+        "category_id": category_id, "occurred_at": "2025-01-01T10:00:00", "values": {"Dauer": 10}
+    })
+    response = client.get("/entries/", headers={**auth_headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_etag_depends_on_query(client, auth_headers):
+    """PRÜFUNG: Haben unterschiedliche Filter unterschiedliche ETags?"""
+    first = client.get("/entries/", headers=auth_headers, params={"limit": 5}).headers["etag"]
+    second = client.get("/entries/", headers=auth_headers, params={"limit": 10}).headers["etag"]
+    assert first != second
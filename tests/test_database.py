@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, event, text
+from app.database import apply_sqlite_pragmas, pool_options
+
+
+def file_engine(tmp_path):
+    """Hilfsfunktion: SQLite-Datei mit Produktionsprofil (Pragmas + Pool-Einstellungen)."""
+    url = f"sqlite:///{tmp_path / 'profil.db'}"
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **pool_options(url))
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+
+def test_sqlite_pragmas_applied(tmp_path):
+    """PRÜFUNG: Werden WAL, synchronous=NORMAL, busy_timeout und foreign_keys bei jeder Verbindung gesetzt?"""
+    engine = file_engine(tmp_path)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1 # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+    engine.dispose()
+
+
+def test_pool_options_skip_in_memory_database():
+    """PRÜFUNG: Erhalten nur Datei- und Server-Datenbanken Pool-Einstellungen?"""
+    assert pool_options("sqlite://") == {}
+    assert pool_options("sqlite:///:memory:") == {}
+    assert pool_options("sqlite:///./tracker.db")["pool_pre_ping"] is True
+    assert "max_overflow" in pool_options("postgresql://user@localhost/tracker")
+
+
+def test_concurrent_writers_do_not_fail(tmp_path):
+    """NEGATIV-TEST: Treten bei parallelen Schreibern und Lesern keine 'database is locked'-Fehler auf?"""
+    engine = file_engine(tmp_path)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE messwert (id INTEGER PRIMARY KEY, wert INTEGER)"))
+
+    def work(worker):
+        for i in range(50):
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO messwert (wert) VALUES (:w)"), {"w": worker * 100 + i})
+            with engine.connect() as conn:
+                conn.execute(text("SELECT count(*) FROM messwert")).scalar()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(8)))
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM messwert")).scalar() == 400
+    engine.dispose()
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, UTC
+from sqlalchemy.orm import sessionmaker
+import app.deletion as deletion
+import app.main as main
+import app.models as models
+from app.deletion import DELETION_JOB_MAX_ATTEMPTS, create_job, resume_stale_jobs, run_job
+
+
+def create_category_with_entries(client, headers, count):
+    """Hilfsfunktion: Legt eine eigene Kategorie mit 'count' Einträgen an und liefert ihre ID."""
+    category_id = client.post("/categories/", headers=headers, json={
+        "name": "Lesen", "fields": [{"label": "Seiten", "data_type": "number"}]
+    }).json()["id"]
+    items = [{"category_id": category_id, "occurred_at": "2025-01-01T10:00:00", "values": {"Seiten": i}}
+             for i in range(count)]
+    client.post("/entries/bulk", headers=headers, json={"items": items})
+    return category_id
+
+
+def test_category_deleted_without_loading_entries(client, auth_headers, db_session, max_queries):
+    """PRÜFUNG: Löscht die Kategorie-Löschung Felder, Einträge und Zahlenwerte mit wenigen Abfragen?"""
+    category_id = create_category_with_entries(client, auth_headers, 50)
+
+    with max_queries(12):
+        response = client.delete(f"/categories/{category_id}", headers=auth_headers)
+
+    assert response.json() == {"status": "deleted", "id": category_id}
+    assert db_session.query(models.Entry).filter(models.Entry.category_id == category_id).count() == 0
+    assert db_session.query(models.CategoryField).filter(models.CategoryField.category_id == category_id).count() == 0
+    assert db_session.query(models.EntryValue).count() == 0
+
+
+def test_large_category_deleted_by_background_job(client, auth_headers, db_session, monkeypatch):
+    """PRÜFUNG: Werden große Kategorien im Hintergrund gelöscht und ist der Fortschritt abrufbar?"""
+    monkeypatch.setattr(main, "DELETION_JOB_THRESHOLD", 5)
+    category_id = create_category_with_entries(client, auth_headers, 12)
+
+    response = client.delete(f"/categories/{category_id}", headers=auth_headers)
+    assert response.status_code == 202
+
+    # The TestClient runs background tasks before returning the response
+    job = client.get(f"/deletions/{response.json()['job_id']}", headers=auth_headers).json()
+    assert (job["status"], job["total"], job["deleted"]) == ("done", 12, 12)
+    assert db_session.query(models.Category).filter(models.Category.id == category_id).count() == 0
+
+
+def test_large_account_deleted_by_background_job(client, auth_headers, db_session, monkeypatch):
+    """PRÜFUNG: Wird ein großes Konto sofort abgemeldet und anschließend vollständig gelöscht?"""
+    monkeypatch.setattr(main, "DELETION_JOB_THRESHOLD", 5)
+    create_category_with_entries(client, auth_headers, 12)
+
+    response = client.delete("/user", headers=auth_headers)
+    assert response.status_code == 202
+
+    assert client.get("/user", headers=auth_headers).status_code == 401
+    assert db_session.query(models.User).count() == 0
+    assert db_session.query(models.Entry).count() == 0
+    assert db_session.get(models.DeletionJob, response.json()["job_id"]).status == "done"
+
+
+def test_interrupted_job_resumes(client, auth_headers, db_engine, db_session):
+    """PRÜFUNG: Setzt ein erneut gestarteter Job die Löschung mit den verbleibenden Einträgen fort?"""
+    category_id = create_category_with_entries(client, auth_headers, 7)
+    job = create_job(db_session, 1, "category", category_id, 7)
+    job.status, job.deleted = "running", 4 # Progress of an interrupted run
+    db_session.commit()
+    db_session.query(models.Entry).filter(models.Entry.id.in_([1, 2, 3, 4])).delete()
+    db_session.commit()
+
+    run_job(sessionmaker(bind=db_engine), job.id, batch_size=2)
+
+    db_session.refresh(job)
+    assert (job.status, job.deleted) == ("done", 7)
+    assert db_session.query(models.Category).filter(models.Category.id == category_id).count() == 0
+
+
+def test_failing_job_is_given_up(client, auth_headers, db_engine, db_session, monkeypatch):
+    """NEGATIV-TEST: Wird ein Job, der jedes Mal fehlschlägt, nach der maximalen Anzahl an Läufen aufgegeben?"""
+    category_id = create_category_with_entries(client, auth_headers, 3)
+    job = create_job(db_session, 1, "category", category_id, 3)
+    db_session.commit()
+
+    def broken(db, category_id):
+        raise RuntimeError("Datenfehler")
+
+    monkeypatch.setattr(deletion, "delete_category", broken)
+    factory = sessionmaker(bind=db_engine)
+    resumed = 0
+    for _ in range(DELETION_JOB_MAX_ATTEMPTS + 2):
+        # Makes the job look stale for every maintenance run
+        db_session.query(models.DeletionJob).update({"updated_at": datetime.now(UTC) - timedelta(hours=1)})
+        db_session.commit()
+        resumed += resume_stale_jobs(factory)
+
+    db_session.refresh(job)
+    assert resumed == DELETION_JOB_MAX_ATTEMPTS
+    assert (job.status, job.attempts, job.error) == ("failed", DELETION_JOB_MAX_ATTEMPTS, "Datenfehler")
+
+
+def test_category_hidden_while_job_pending(client, auth_headers, db_engine, monkeypatch):
+    """PRÜFUNG: Ist eine Kategorie während der Hintergrund-Löschung unsichtbar und gesperrt, und wird das ETag danach ungültig?"""
+    monkeypatch.setattr(main, "DELETION_JOB_THRESHOLD", 5)
+    monkeypatch.setattr(main, "run_job", lambda *args: None) # Job stays pending
+    category_id = create_category_with_entries(client, auth_headers, 12)
+
+    job_id = client.delete(f"/categories/{category_id}", headers=auth_headers).json()["job_id"]
+
+    assert category_id not in [c["id"] for c in client.get("/categories/", headers=auth_headers).json()]
+    assert client.get("/entries/", headers=auth_headers).json()["items"] == []
+    assert client.post("/entries/", headers=auth_headers, json={
+        "category_id": category_id, "occurred_at": "2025-01-02T10:00:00", "values": {"Seiten": 1}
+    }).status_code == 404
+
+    etag = client.get("/categories/", headers=auth_headers).headers["etag"]
+    run_job(sessionmaker(bind=db_engine), job_id)
+    assert client.get("/categories/", headers={**auth_headers, "If-None-Match": etag}).status_code == 200
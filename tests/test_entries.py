@@ -0,0 +1,287 @@
+import pytest
+import json
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import text as text_clause
+from app.pagination import encode_cursor, decode_cursor
+import app.models as models
+import app.schemas as schemas
+from app.json_fields import json_predicate
+
+
+def create_entries(client, headers, category_id, count, start=datetime(2025, 1, 1, 12, 0)):
+    """Hilfsfunktion: Legt 'count' Einträge im Abstand von einer Stunde an."""
+    for i in range(count):
+        client.post("/entries/", headers=headers, json={
+            "category_id": category_id,
+            "occurred_at": (start + timedelta(hours=i)).isoformat(),
+            "note": f"Eintrag {i}",
+            "values": {"Dauer": 30 + i, "Übung": "Joggen" if i % 2 else "Yoga"}
+        })
+
+
+def test_cursor_roundtrip():
+    """PRÜFUNG: Kann ein Cursor wieder in Zeitstempel und ID zerlegt werden?"""
+    ts = datetime(2025, 3, 1, 8, 30)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+def test_invalid_cursor_rejected():
+    """NEGATIV-TEST: Wird ein manipulierter Cursor mit 400 abgelehnt?"""
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("kein-gültiger-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_entries_paginated_without_gaps(client, auth_headers, category_id):
+    """PRÜFUNG: Liefern die Seiten alle Einträge genau einmal und absteigend sortiert?"""
+    create_entries(client, auth_headers, category_id, 7)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/entries/", headers=auth_headers, params=params).json()
+        seen += page["items"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert len({e["id"] for e in seen}) == 7
+    assert [e["occurred_at"] for e in seen] == sorted((e["occurred_at"] for e in seen), reverse=True)
+
+
+def test_last_page_has_no_cursor(client, auth_headers, category_id):
+    """PRÜFUNG: Ist 'next_cursor' leer, wenn alle Einträge auf eine Seite passen?"""
+    create_entries(client, auth_headers, category_id, 2)
+    page = client.get("/entries/", headers=auth_headers, params={"limit": 5}).json()
+    assert len(page["items"]) == 2
+    assert page["next_cursor"] is None
+
+
+def test_limit_upper_bound(client, auth_headers):
+    """NEGATIV-TEST: Werden zu große Seiten abgelehnt?"""
+    response = client.get("/entries/", headers=auth_headers, params={"limit": 100000})
+    assert response.status_code == 422
+
+
+def test_fast_list_output_matches_response_models(client, auth_headers, category_id):
+    """PRÜFUNG: Liefern die schnellen Listen-Routen (orjson) dasselbe JSON wie die Pydantic-Schemas?"""
+    client.post("/entries/", headers=auth_headers, json={
+        "category_id": category_id, "occurred_at": "2025-01-01T10:00:00.123456",
+        "note": None, "values": {"Übung": "Kniebeuge", "Dauer": 30.5, "Sätze": [1, 2]}
+    })
+
+    page = client.get("/entries/", headers=auth_headers).json()
+    assert page == schemas.EntryPage.model_validate(page).model_dump(mode="json")
+    assert page["items"][0]["occurred_at"] == "2025-01-01T10:00:00.123456"
+
+    categories = client.get("/categories/", headers=auth_headers).json()
+    assert categories == [schemas.CategoryOut.model_validate(c).model_dump(mode="json") for c in categories]
+    assert all(c["fields"] for c in categories)
+
+
+def test_aggregate_sums_numeric_strings_per_day(client, auth_headers, category_id):
+    """PRÜFUNG: Summiert die Datenbank Zahlenwerte (auch als Text gespeichert) pro Tag?"""
+    create_entries(client, auth_headers, category_id, 3)
+    client.post("/entries/", headers=auth_headers, json={
+        "category_id": category_id, "occurred_at": "2025-01-02T09:00:00", "values": {"Dauer": "-"}
+    })
+
+    series = client.get("/entries/aggregate", headers=auth_headers,
+                        params={"category_id": category_id, "field": "Dauer", "fn": "sum", "bucket": "day"}).json()
+
+    assert series["points"] == [{"category_id": category_id, "bucket": "2025-01-01", "value": 93.0, "count": 3}]
+
+
+def test_aggregate_counts_entries_per_week(client, auth_headers, category_id):
+    """PRÜFUNG: Werden Einträge ohne Feldangabe pro Woche (ab Montag) gezählt?"""
+    create_entries(client, auth_headers, category_id, 2, start=datetime(2025, 1, 5, 10, 0))
+
+    points = client.get("/entries/aggregate", headers=auth_headers,
+                        params={"fn": "count", "bucket": "week"}).json()["points"]
+
+    assert [(p["bucket"], p["value"]) for p in points] == [("2024-12-30", 2.0)]
+
+
+def test_aggregate_requires_field(client, auth_headers):
+    """NEGATIV-TEST: Wird eine Summe ohne Feldangabe abgelehnt?"""
+    response = client.get("/entries/aggregate", headers=auth_headers, params={"fn": "sum"})
+    assert response.status_code == 400
+
+
+def test_export_csv_uses_field_labels(client, auth_headers, category_id):
+    """PRÜFUNG: Enthält der CSV-Export die Feldnamen der Kategorie als Spalten?"""
+    create_entries(client, auth_headers, category_id, 3)
+
+    response = client.get("/entries/export", headers=auth_headers, params={"category_id": category_id})
+    lines = response.text.strip().splitlines()
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert lines[0] == "id,category_id,occurred_at,note,Übung,Dauer,Strecke,Gewicht,Energie"
+    assert len(lines) == 4
+    assert lines[1].endswith(",Eintrag 0,Yoga,30,,,")
+
+
+def test_export_ndjson_one_entry_per_line(client, auth_headers, category_id):
+    """PRÜFUNG: Liefert der NDJSON-Export pro Zeile genau einen Eintrag?"""
+    create_entries(client, auth_headers, category_id, 2)
+
+    response = client.get("/entries/export", headers=auth_headers, params={"format": "ndjson"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [r["data"]["Dauer"] for r in rows] == [30, 31]
+
+
+def test_export_foreign_category_rejected(client, auth_headers):
+    """NEGATIV-TEST: Wird der Export einer fremden Kategorie mit 404 abgelehnt?"""
+    response = client.get("/entries/export", headers=auth_headers, params={"category_id": 9999})
+    assert response.status_code == 404
+
+
+def test_bulk_insert_reports_each_item(client, auth_headers, category_id):
+    """PRÜFUNG: Werden gültige Einträge gespeichert und fehlerhafte einzeln gemeldet?"""
+    items = [
+        {"category_id": category_id, "occurred_at": "2025-02-01T08:00:00", "values": {"Dauer": 20}},
+        {"category_id": 9999, "occurred_at": "2025-02-01T09:00:00", "values": {"Dauer": 30}},
+        {"category_id": category_id, "occurred_at": "kein Datum", "values": {}},
+        {"category_id": category_id, "occurred_at": "2025-02-02T08:00:00", "values": {"Dauer": 40}},
+    ]
+
+    result = client.post("/entries/bulk", headers=auth_headers, json={"items": items}).json()
+
+    assert (result["created"], result["failed"]) == (2, 2)
+    assert [r["success"] for r in result["results"]] == [True, False, False, True]
+    assert result["results"][1]["error"] == "Category not found"
+    assert result["results"][2]["error"].startswith("occurred_at")
+
+    page = client.get("/entries/", headers=auth_headers).json()
+    assert {e["id"] for e in page["items"]} == {result["results"][0]["id"], result["results"][3]["id"]}
+
+
+def test_filter_entries_by_text_value(client, auth_headers, category_id):
+    """PRÜFUNG: Liefert der Filter 'Übung:eq:Joggen' nur passende Einträge?"""
+    create_entries(client, auth_headers, category_id, 6)
+
+    items = client.get("/entries/", headers=auth_headers, params={"where": "Übung:eq:Joggen"}).json()["items"]
+
+    assert len(items) == 3
+    assert {e["data"]["Übung"] for e in items} == {"Joggen"}
+
+
+def test_filter_entries_numeric_range_and_strings(client, auth_headers, category_id):
+    """PRÜFUNG: Vergleichen Bereichsfilter numerisch, auch bei als Text gespeicherten Zahlen?"""
+    for value in [400, "550", 700, "-"]:
+        client.post("/entries/", headers=auth_headers, json={
+            "category_id": category_id, "occurred_at": "2025-01-01T10:00:00", "values": {"Energie": value}
+        })
+
+    def energies(*where):
+        items = client.get("/entries/", headers=auth_headers, params={"where": list(where)}).json()["items"]
+        return sorted(str(e["data"]["Energie"]) for e in items)
+
+    assert energies("Energie:gt:500") == ["550", "700"]
+    assert energies("Energie:gt:500", "Energie:lte:600") == ["550"]
+    assert energies("Energie:eq:550") == ["550"]
+    assert energies("Energie:ne:400") == ["-", "550", "700"]
+
+
+def test_filter_invalid_predicate_rejected(client, auth_headers):
+    """NEGATIV-TEST: Werden unbekannte Operatoren und nicht-numerische Bereichswerte mit 400 abgelehnt?"""
+    for where in ["Energie:like:5", "Energie", "Energie:gt:viel"]:
+        response = client.get("/entries/", headers=auth_headers, params={"where": where})
+        assert response.status_code == 400
+
+
+def test_filter_uses_expression_index(db_session):
+    """PRÜFUNG: Nutzt SQLite für Filter auf indizierte Felder den Ausdrucksindex?"""
+    query = db_session.query(models.Entry).filter(
+        models.Entry.user_id == 1, json_predicate(models.Entry.data, "Übung", "eq", "Joggen", "sqlite"))
+    sql = str(query.statement.compile(compile_kwargs={"literal_binds": True}))
+    plan = " ".join(str(row) for row in db_session.execute(text_clause("EXPLAIN QUERY PLAN " + sql)))
+
+    assert "ix_entry_data_ubung" in plan
+
+
+def test_entry_values_follow_number_fields(client, auth_headers, category_id, db_session):
+    """PRÜFUNG: Werden Zahlenfelder typisiert gespeichert, beim Ändern ersetzt und beim Löschen entfernt?"""
+
+    def stored(entry_id):
+        rows = db_session.query(models.CategoryField.label, models.EntryValue.num_value).join(
+            models.EntryValue, models.EntryValue.category_field_id == models.CategoryField.id).filter(
+            models.EntryValue.entry_id == entry_id)
+        return dict(rows)
+
+    entry = client.post("/entries/", headers=auth_headers, json={
+        "category_id": category_id, "occurred_at": "2025-01-01T10:00:00",
+        "values": {"Übung": "Joggen", "Dauer": "45", "Strecke": "7.5", "Energie": "-"}
+    }).json()
+    assert stored(entry["id"]) == {"Dauer": 45.0, "Strecke": 7.5} # Text fields and '-' are skipped
+
+    client.put(f"/entries/{entry['id']}", headers=auth_headers, json={
+        "category_id": category_id, "occurred_at": "2025-01-01T10:00:00", "values": {"Dauer": 50}
+    })
+    assert stored(entry["id"]) == {"Dauer": 50.0}
+
+    client.delete(f"/entries/{entry['id']}", headers=auth_headers)
+    assert stored(entry["id"]) == {}
+
+
+def test_entry_values_removed_without_foreign_keys(client, auth_headers, category_id, db_session):
+    """NEGATIV-TEST: Bleiben ohne foreign_keys-Pragma keine Zahlenwerte gelöschter Einträge zurück (ID-Wiederverwendung)?"""
+    db_session.execute(text_clause("PRAGMA foreign_keys=OFF")) # Shared connection: applies to the client too
+    payload = {"category_id": category_id, "occurred_at": "2025-01-01T10:00:00", "values": {"Dauer": 30}}
+
+    entry_id = client.post("/entries/", headers=auth_headers, json=payload).json()["id"]
+    client.delete(f"/entries/{entry_id}", headers=auth_headers)
+
+    # SQLite reuses the ID of the deleted newest row
+    response = client.post("/entries/", headers=auth_headers, json=payload)
+    assert response.status_code == 200
+    assert response.json()["id"] == entry_id
+
+
+def test_bulk_insert_writes_entry_values(client, auth_headers, category_id, db_session):
+    """PRÜFUNG: Legt der Bulk-Import die typisierten Werte aller Einträge an?"""
+
+    items = [{"category_id": category_id, "occurred_at": "2025-01-01T10:00:00", "values": {"Dauer": i}}
+             for i in range(5)]
+    client.post("/entries/bulk", headers=auth_headers, json={"items": items})
+
+    assert sorted(v for (v,) in db_session.query(models.EntryValue.num_value)) == [0, 1, 2, 3, 4]
+
+
+def test_search_matches_notes_and_text_fields(client, auth_headers, category_id):
+    """PRÜFUNG: Findet die Volltextsuche Notizen und Textfelder per Präfix, ohne Zahlenfelder zu durchsuchen?"""
+    def post(note, values):
+        return client.post("/entries/", headers=auth_headers, json={
+            "category_id": category_id, "occurred_at": "2025-03-01T12:00:00", "note": note, "values": values
+        }).json()["id"]
+
+    pizza = post("Pizza Margherita beim Italiener", {"Übung": "Radfahren"})
+    yoga = post("Abendtraining", {"Übung": "Yoga", "Dauer": "45"})
+    post("Pizza mit Freunden", {"Übung": "Joggen"})
+
+    def search(q):
+        return [e["id"] for e in client.get("/entries/search", headers=auth_headers, params={"q": q}).json()]
+
+    assert search("pizz marg") == [pizza]
+    assert search("YOGA") == [yoga]
+    assert search("ubung") == [] # Labels are not indexed
+    assert search("45") == []    # Number fields are not indexed
+
+    # Changes are reflected immediately (maintained by triggers)
+    client.put(f"/entries/{yoga}", headers=auth_headers, json={
+        "category_id": category_id, "occurred_at": "2025-03-01T12:00:00", "values": {"Übung": "Pilates"}
+    })
+    assert search("yoga") == []
+    assert search("pilates") == [yoga]
+
+    client.delete(f"/entries/{pizza}", headers=auth_headers)
+    assert len(search("pizza")) == 1
+
+
+def test_search_rejects_query_without_words(client, auth_headers):
+    """NEGATIV-TEST: Wird eine Suche ohne Suchbegriff (nur Sonderzeichen) mit 400 abgelehnt?"""
+    response = client.get("/entries/search", headers=auth_headers, params={"q": '"*)'})
+    assert response.status_code == 400
@@ -0,0 +1,67 @@
+import app.models as models
+from app.field_values import rebuild
+
+
+def stats(db_session):
+    """Hilfsfunktion: Liest die Wertstatistik als {Wert: Anzahl}."""
+    db_session.expire_all()
+    return {s.value: s.count for s in db_session.query(models.FieldValueStat)}
+
+
+def post_entry(client, headers, category_id, exercise, occurred_at="2025-01-01T10:00:00"):
+    """Hilfsfunktion: Legt einen Fitness-Eintrag an und liefert seine ID."""
+    return client.post("/entries/", headers=headers, json={
+        "category_id": category_id, "occurred_at": occurred_at, "values": {"Übung": exercise, "Dauer": 30}
+    }).json()["id"]
+
+
+def test_suggestions_ordered_by_frequency(client, auth_headers, category_id):
+    """PRÜFUNG: Liefert der Endpunkt die häufigsten Werte zuerst und filtert nach Präfix (ohne Groß-/Kleinschreibung)?"""
+    for exercise in ["Laufen", "Laufen", "Laufen", "Langhantel", "Langhantel", "Radfahren"]:
+        post_entry(client, auth_headers, category_id, exercise)
+
+    res = client.get(f"/categories/{category_id}/fields/Übung/values", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.json() == [{"value": "Laufen", "count": 3}, {"value": "Langhantel", "count": 2},
+                          {"value": "Radfahren", "count": 1}]
+
+    res = client.get(f"/categories/{category_id}/fields/Übung/values",
+                     params={"prefix": "la", "limit": 1}, headers=auth_headers)
+    assert res.json() == [{"value": "Laufen", "count": 3}]
+
+
+def test_statistics_follow_entry_changes(client, auth_headers, category_id, db_session):
+    """PRÜFUNG: Werden die Zähler beim Anlegen, Ändern und Löschen von Einträgen nachgeführt?"""
+    first = post_entry(client, auth_headers, category_id, "Laufen")
+    second = post_entry(client, auth_headers, category_id, "Laufen")
+    client.post("/entries/bulk", headers=auth_headers, json={"items": [
+        {"category_id": category_id, "occurred_at": "2025-01-02T10:00:00", "values": {"Übung": " Yoga "}},
+        {"category_id": category_id, "occurred_at": "2025-01-02T10:00:00", "values": {"Übung": ""}}
+    ]})
+    assert stats(db_session) == {"Laufen": 2, "Yoga": 1}
+
+    client.put(f"/entries/{second}", headers=auth_headers, json={
+        "category_id": category_id, "occurred_at": "2025-01-01T10:00:00", "values": {"Übung": "Yoga"}
+    })
+    assert stats(db_session) == {"Laufen": 1, "Yoga": 2}
+
+    # Values nobody uses anymore disappear from the suggestions
+    client.delete(f"/entries/{first}", headers=auth_headers)
+    assert stats(db_session) == {"Yoga": 2}
+
+
+def test_rebuild_matches_incremental_statistics(client, auth_headers, category_id, db_session):
+    """PRÜFUNG: Liefert der Neuaufbau dieselben Zähler wie die inkrementelle Pflege?"""
+    for exercise in ["Laufen", "Yoga", "Laufen"]:
+        post_entry(client, auth_headers, category_id, exercise)
+    incremental = stats(db_session)
+
+    assert rebuild(db_session) == 2
+    assert stats(db_session) == incremental
+
+
+def test_suggestions_only_for_own_text_fields(client, auth_headers, category_id):
+    """NEGATIV-TEST: Unbekannte Felder liefern 404, Zahlenfelder 400."""
+    assert client.get(f"/categories/{category_id}/fields/Gibtsnicht/values", headers=auth_headers).status_code == 404
+    assert client.get("/categories/999999/fields/Übung/values", headers=auth_headers).status_code == 404
+    assert client.get(f"/categories/{category_id}/fields/Dauer/values", headers=auth_headers).status_code == 400
@@ -0,0 +1,128 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta, UTC
+from aiosmtpd.controller import Controller
+from sqlalchemy.orm import sessionmaker
+import app.main as main
+import app.models as models
+from app.mailer import OUTBOX_MAX_ATTEMPTS, OutboxWorker, SmtpSettings, enqueue
+
+
+def free_port():
+    """Hilfsfunktion: Liefert einen lokalen Port, auf dem (danach) kein Server lauscht."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def queue_mails(db_session, count):
+    """Hilfsfunktion: Legt mehrere Nachrichten in der Outbox an."""
+    for i in range(count):
+        enqueue(db_session, f"empfaenger{i}@example.com", "Dein Lifetracker Code", f"<p>{i}</p>")
+    db_session.commit()
+
+
+def run_worker(db_engine, port):
+    """Hilfsfunktion: Verarbeitet einen Stapel fälliger Nachrichten gegen den angegebenen SMTP-Port."""
+    worker = OutboxWorker(sessionmaker(bind=db_engine), SmtpSettings(hostname="127.0.0.1", port=port))
+
+    async def once():
+        try:
+            return await worker.process_due()
+        finally:
+            await worker.stop()
+
+    return asyncio.run(once())
+
+
+def test_register_queues_verification_mail(client, db_session, monkeypatch):
+    """PRÜFUNG: Wird die Verifizierungs-Mail in der Outbox abgelegt statt direkt versendet?"""
+    monkeypatch.setattr(main, "EMAIL_VERIFICATION_ENABLED", True)
+
+    response = client.post("/register", json={
+        "name": "Neuling", "email": "neuling@example.com", "password": "SicheresPasswort123"
+    })
+
+    assert response.status_code == 200
+    assert response.json()["token"] is None
+    mail = db_session.query(models.EmailOutbox).one()
+    assert mail.recipient == "neuling@example.com"
+    assert mail.status == "pending"
+    user = db_session.query(models.User).filter(models.User.name == "Neuling").one()
+    assert user.verification_code in mail.body
+
+
+def test_stale_registration_discards_queued_code(client, db_session, monkeypatch):
+    """PRÜFUNG: Wird der Code einer abgelaufenen Registrierung verworfen, statt noch zugestellt zu werden?"""
+    monkeypatch.setattr(main, "EMAIL_VERIFICATION_ENABLED", True)
+    payload = {"name": "Neuling", "email": "neuling@example.com", "password": "SicheresPasswort123"}
+    client.post("/register", json=payload)
+
+    user = db_session.query(models.User).one()
+    user.created_at = datetime.now(UTC) - timedelta(hours=1)
+    db_session.commit()
+
+    assert client.post("/register", json=payload).status_code == 200
+
+    db_session.expire_all()
+    mail = db_session.query(models.EmailOutbox).one()
+    assert db_session.query(models.User).one().verification_code in mail.body
+
+
+def test_failed_delivery_is_retried_later(db_engine, db_session):
+    """NEGATIV-TEST: Wird eine Nachricht bei nicht erreichbarem SMTP-Server mit Backoff neu eingeplant?"""
+    queue_mails(db_session, 1)
+
+    assert run_worker(db_engine, free_port()) == 1
+
+    mail = db_session.query(models.EmailOutbox).one()
+    assert mail.status == "pending"
+    assert mail.attempts == 1
+    assert mail.last_error
+    assert mail.next_attempt_at.replace(tzinfo=UTC) > datetime.now(UTC)
+
+    # Not due yet, so the next run does not touch it
+    assert run_worker(db_engine, free_port()) == 0
+
+
+def test_delivery_gives_up_after_max_attempts(db_engine, db_session):
+    """NEGATIV-TEST: Wird eine Nachricht nach der maximalen Anzahl an Versuchen als fehlgeschlagen markiert?"""
+    queue_mails(db_session, 1)
+    db_session.query(models.EmailOutbox).update({"attempts": OUTBOX_MAX_ATTEMPTS - 1})
+    db_session.commit()
+
+    run_worker(db_engine, free_port())
+
+    db_session.expire_all()
+    assert db_session.query(models.EmailOutbox).one().status == "failed"
+
+
+def test_batch_delivered_over_one_connection(db_engine, db_session):
+    """PRÜFUNG: Werden mehrere Nachrichten über eine einzige SMTP-Verbindung zugestellt?"""
+    class Recorder:
+        def __init__(self):
+            self.connections = 0
+            self.messages = []
+
+        async def handle_EHLO(self, server, session, envelope, hostname, responses):
+            self.connections += 1
+            session.host_name = hostname
+            return responses
+
+        async def handle_DATA(self, server, session, envelope):
+            self.messages.append(envelope.rcpt_tos[0])
+            return "250 OK"
+
+    recorder = Recorder()
+    port = free_port()
+    controller = Controller(recorder, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        queue_mails(db_session, 3)
+        assert run_worker(db_engine, port) == 3
+    finally:
+        controller.stop()
+
+    assert recorder.connections == 1
+    assert len(recorder.messages) == 3
+    assert {m.status for m in db_session.query(models.EmailOutbox)} == {"sent"}
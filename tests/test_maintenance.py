@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime, timedelta, UTC
+from sqlalchemy.orm import sessionmaker
+import app.models as models
+from app.default_categories import seed_default_categories
+from app.maintenance import MaintenanceScheduler, acquire_lock, renew_lock, run_maintenance
+
+
+def add_user(db, name, active, age):
+    """Hilfsfunktion: Legt einen Benutzer mit Standard-Kategorien an, der vor 'age' registriert wurde."""
+    user = models.User(name=name, email=f"{name}@example.com", password_hash="x", is_active=active,
+                       created_at=datetime.now(UTC) - age)
+    db.add(user)
+    db.flush()
+    seed_default_categories(db, user.id)
+    return user
+
+
+def test_maintenance_purges_in_batches(db_engine, db_session):
+    """PRÜFUNG: Werden abgelaufene Sitzungen und alte unbestätigte Konten stapelweise gelöscht?"""
+    now = datetime.now(UTC)
+    active = add_user(db_session, "aktiv", True, timedelta(days=3))
+    for i in range(3):
+        add_user(db_session, f"alt{i}", False, timedelta(hours=2))
+    add_user(db_session, "frisch", False, timedelta(minutes=1))
+    for i in range(5):
+        db_session.add(models.Session(token=f"t{i}", user_id=active.id, expires_at=now - timedelta(minutes=i + 1)))
+    db_session.add(models.Session(token="gueltig", user_id=active.id, expires_at=now + timedelta(days=1)))
+    db_session.commit()
+
+    report = run_maintenance(sessionmaker(bind=db_engine), batch_size=2)
+
+    assert (report.expired_sessions, report.unverified_users, report.tombstones) == (5, 3, 0)
+    assert report.batches == 3 + 2 # 5 sessions and 3 users in batches of two
+    assert {u.name for u in db_session.query(models.User)} == {"aktiv", "frisch"}
+    assert [s.token for s in db_session.query(models.Session)] == ["gueltig"]
+    # Categories of the removed accounts are gone, the remaining accounts keep theirs
+    assert db_session.query(models.Category).count() == 2 * db_session.query(models.Category).filter(
+        models.Category.user_id == active.id).count()
+
+
+def test_maintenance_purges_old_outbox_mails(db_engine, db_session):
+    """PRÜFUNG: Werden versendete und aufgegebene Mails nach der Aufbewahrungsfrist gelöscht, offene nicht?"""
+    old = datetime.now(UTC) - timedelta(days=30)
+    for status in ("sent", "failed", "pending"):
+        db_session.add(models.EmailOutbox(recipient=f"{status}@example.com", subject="Code", body="<p>123456</p>",
+                                          status=status, created_at=old))
+    db_session.add(models.EmailOutbox(recipient="neu@example.com", subject="Code", body="<p>1</p>", status="sent"))
+    db_session.commit()
+
+    report = run_maintenance(sessionmaker(bind=db_engine))
+
+    assert report.outbox_mails == 2
+    assert {m.recipient for m in db_session.query(models.EmailOutbox)} == {"pending@example.com", "neu@example.com"}
+
+
+def test_lock_allows_single_owner(db_engine):
+    """NEGATIV-TEST: Erhält ein zweiter Worker die Sperre erst nach Ablauf der Lease?"""
+    factory = sessionmaker(bind=db_engine)
+
+    assert acquire_lock(factory, "worker-a", timedelta(hours=1))
+    assert not acquire_lock(factory, "worker-b", timedelta(hours=1))
+
+    with factory() as db:
+        db.get(models.MaintenanceLock, "maintenance").locked_until = datetime.now(UTC) - timedelta(seconds=1)
+        db.commit()
+    assert acquire_lock(factory, "worker-b", timedelta(hours=1))
+
+
+def test_lease_renewed_during_run(db_engine, db_session):
+    """PRÜFUNG: Verlängert ein laufender Wartungslauf seine Sperre nach jedem Stapel, nur für den eigenen Worker?"""
+    factory = sessionmaker(bind=db_engine)
+    assert acquire_lock(factory, "worker-a", timedelta(seconds=1))
+
+    assert renew_lock(factory, "worker-a", timedelta(hours=1))
+    assert not renew_lock(factory, "worker-b", timedelta(hours=1))
+    locked_until = db_session.get(models.MaintenanceLock, "maintenance").locked_until.replace(tzinfo=UTC)
+    assert locked_until > datetime.now(UTC) + timedelta(minutes=59)
+
+    user = add_user(db_session, "aktiv", True, timedelta(days=3))
+    for i in range(5):
+        db_session.add(models.Session(token=f"t{i}", user_id=user.id, expires_at=datetime.now(UTC) - timedelta(days=1)))
+    db_session.commit()
+
+    beats = []
+    run_maintenance(factory, batch_size=2, heartbeat=lambda: beats.append(1))
+    assert len(beats) == 3 # One per batch of expired sessions
+
+
+def test_scheduler_skips_run_without_lease(db_engine):
+    """PRÜFUNG: Führt nur der Worker mit der Sperre die Wartung aus und hält deren Kennzahlen fest?"""
+    first = MaintenanceScheduler(sessionmaker(bind=db_engine), interval=60)
+    second = MaintenanceScheduler(sessionmaker(bind=db_engine), interval=60)
+    second.owner = "anderer-worker"
+
+    assert asyncio.run(first.run_once()) is not None
+    assert asyncio.run(second.run_once()) is None
+    assert first.last_report is not None and second.last_report is None
@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+import app.migrations as migrations
+from app.migrations import existing_index_names, upgrade
+
+
+def test_upgrade_adds_indexes_without_data_loss(tmp_path):
+    """PRÜFUNG: Ergänzt die Migration fehlende Spalten und Indizes, ohne Daten zu verlieren?"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+
+    # Schema of an existing deployment (tables without indexes)
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE entry (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, '
+                          'category_id INTEGER, occurred_at DATETIME, note TEXT, data JSON)'))
+        conn.execute(text("INSERT INTO entry (user_id, category_id, occurred_at, data) "
+                          "VALUES (1, 1, '2025-01-01 10:00:00', '{\"\\u00dcbung\": \"Joggen\"}')"))
+
+    changes = upgrade(engine)
+
+    with engine.connect() as conn:
+        indexes = existing_index_names(conn, "entry")
+    assert {"ix_entry_user_occurred", "ix_entry_user_category_occurred", "ix_entry_data_ubung"} <= indexes
+    assert "index ix_entry_user_occurred" in changes
+    assert "ix_entry_data_gin" not in indexes # PostgreSQL only
+    assert "full-text search index" in changes
+
+    columns = {col["name"] for col in inspect(engine).get_columns("entry")}
+    assert "updated_at" in columns
+    assert "column entry.updated_at" in changes
+
+    # Escaped keys are rewritten, so json_extract (and its expression index) finds them
+    assert "unescaped json entry.data" in changes
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM entry")).scalar() == 1
+        assert conn.execute(text("""SELECT json_extract(data, '$."Übung"') FROM entry""")).scalar() == "Joggen"
+
+
+def test_upgrade_is_idempotent(tmp_path):
+    """PRÜFUNG: Kann die Migration bei jedem Start erneut laufen, ohne Änderungen vorzunehmen?"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    upgrade(engine)
+    assert upgrade(engine) == []
+
+
+def test_unescape_runs_only_once(tmp_path):
+    """PRÜFUNG: Wird der Tabellen-Scan nach escapten JSON-Werten nur beim ersten Start ausgeführt?"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    upgrade(engine)
+
+    with engine.begin() as conn:
+        assert "unescape_sqlite_json" in conn.execute(text("SELECT name FROM schema_migration")).scalars().all()
+        conn.execute(text("INSERT INTO entry (user_id, category_id, occurred_at, data) "
+                          "VALUES (1, 1, '2025-01-01 10:00:00', '{\"\\u00dcbung\": \"Joggen\"}')"))
+
+    # Recorded as applied: the escaped row is no longer searched for
+    assert upgrade(engine) == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT data FROM entry")).scalar() == '{"\\u00dcbung": "Joggen"}'
+
+
+def legacy_entries(engine):
+    """Hilfsfunktion: Legt das Schema einer alten Installation mit einem Eintrag (Dauer, Übung) an."""
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE category_field (id INTEGER PRIMARY KEY, category_id INTEGER, "
+                          "label VARCHAR, data_type VARCHAR, unit VARCHAR)"))
+        conn.execute(text("INSERT INTO category_field VALUES (1, 1, 'Dauer', 'number', 'min'), "
+                          "(2, 1, 'Übung', 'text', NULL)"))
+        conn.execute(text('CREATE TABLE entry (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, '
+                          'category_id INTEGER, occurred_at DATETIME, note TEXT, data JSON)'))
+        conn.execute(text("INSERT INTO entry (user_id, category_id, occurred_at, data) VALUES "
+                          "(1, 1, '2025-01-01 10:00:00', '{\"Dauer\": \"30\", \"Übung\": \"Yoga\"}')"))
+
+
+def test_upgrade_backfills_entry_values(tmp_path):
+    """PRÜFUNG: Werden Zahlenwerte bestehender Einträge einmalig in 'entry_value' übernommen?"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    legacy_entries(engine)
+
+    assert "entry_value backfill (1 entries)" in upgrade(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT entry_id, category_field_id, num_value FROM entry_value")).all() == [(1, 1, 30.0)]
+
+
+
+@pytest.mark.parametrize("step, change", [
+    ("backfill_entry_values", "entry_value backfill (1 entries)"),
+    ("rebuild_rollups", "daily_rollup rebuild (1 days)"),
+    ("rebuild_field_values", "field_value_stat rebuild (1 values)")
+])
+def test_interrupted_backfill_is_repeated(tmp_path, monkeypatch, step, change):
+    """NEGATIV-TEST: Wird ein abgebrochener Backfill beim nächsten Start wiederholt statt übersprungen?"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    legacy_entries(engine)
+
+    def crash(db):
+        raise RuntimeError("Prozess beendet")
+
+    # The tables exist after the first (crashed) start
+    monkeypatch.setattr(migrations, step, crash)
+    with pytest.raises(RuntimeError):
+        upgrade(engine)
+    monkeypatch.undo()
+
+    assert change in upgrade(engine)
+    assert upgrade(engine) == []
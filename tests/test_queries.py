@@ -0,0 +1,45 @@
+import pytest
+
+
+@pytest.fixture
+def populated(client, auth_headers, category_id):
+    """Legt zusätzliche Kategorien und Einträge an, damit N+1-Abfragen auffallen würden."""
+    for i in range(5):
+        client.post("/categories/", headers=auth_headers, json={
+            "name": f"Kategorie {i}", "fields": [{"label": "Wert", "data_type": "number"}]
+        })
+    for day in range(1, 6):
+        client.post("/entries/", headers=auth_headers, json={
+            "category_id": category_id, "occurred_at": f"2025-01-0{day}T10:00:00", "values": {"Dauer": day}
+        })
+    return auth_headers
+
+
+@pytest.mark.parametrize("path, limit", [
+    ("/user", 2),
+    ("/categories/", 3),
+    ("/entries/", 2),
+    ("/entries/aggregate?fn=count", 2),
+    ("/sync", 3),
+])
+def test_read_routes_query_budget(client, populated, max_queries, path, limit):
+    """PRÜFUNG: Bleibt die Anzahl der SQL-Abfragen unabhängig von der Datenmenge im Budget?"""
+    with max_queries(limit):
+        response = client.get(path, headers=populated)
+    assert response.status_code == 200
+
+
+def test_not_modified_needs_single_query(client, populated, max_queries):
+    """PRÜFUNG: Kommt eine 304-Antwort mit einer einzigen Abfrage (Datenversion) aus?"""
+    etag = client.get("/categories/", headers=populated).headers["etag"]
+
+    with max_queries(1):
+        response = client.get("/categories/", headers={**populated, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_max_queries_detects_excess(client, auth_headers, max_queries):
+    """NEGATIV-TEST: Schlägt der Zähler an, wenn mehr Abfragen als erlaubt ausgeführt werden?"""
+    with pytest.raises(AssertionError):
+        with max_queries(0):
+            client.get("/categories/", headers=auth_headers)
@@ -0,0 +1,69 @@
+import asyncio
+import time
+import httpx
+import pytest
+from pydantic import ValidationError
+from app.auth import get_password_hash
+from app.default_categories import DEFAULT_CATEGORIES, load_template
+from app.main import app
+
+
+def test_register_does_not_block_event_loop(client):
+    """PRÜFUNG: Läuft die Event-Loop während einer Registrierung (Argon2 + Datenbank) weiter?"""
+    start = time.perf_counter()
+    get_password_hash("Referenz123")
+    hash_duration = time.perf_counter() - start
+
+    async def scenario():
+        gaps = []
+        done = asyncio.Event()
+
+        async def ticker():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            task = asyncio.create_task(ticker())
+            response = await async_client.post("/register", json={
+                "name": "Schnellstarter",
+                "email": "schnell@example.com",
+                "password": "SicheresPasswort123"
+            })
+            done.set()
+            await task
+        return response, max(gaps)
+
+    response, longest_stall = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert response.json()["token"]
+    assert longest_stall < hash_duration / 2
+
+
+def test_register_seeds_template_in_one_transaction(client, max_queries):
+    """PRÜFUNG: Legt die Registrierung Benutzer und Standard-Kategorien mit wenigen Abfragen an?"""
+    with max_queries(5):
+        response = client.post("/register", json={
+            "name": "Vorlage", "email": "vorlage@example.com", "password": "SicheresPasswort123"
+        })
+    assert response.status_code == 200
+
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+    categories = client.get("/categories/", headers=headers).json()
+    assert [c["name"] for c in categories] == [c.name for c in DEFAULT_CATEGORIES]
+    assert [f["label"] for f in categories[0]["fields"]] == [f.label for f in DEFAULT_CATEGORIES[0].fields]
+    assert all(c["is_system_default"] for c in categories)
+
+
+def test_invalid_category_template_rejected(tmp_path):
+    """NEGATIV-TEST: Wird eine Vorlage ohne Pflichtangaben beim Laden abgelehnt?"""
+    path = tmp_path / "categories.json"
+    path.write_text('[{"name": "Lesen"}]', encoding="utf-8")
+
+    with pytest.raises(ValidationError):
+        load_template(str(path))
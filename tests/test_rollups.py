@@ -0,0 +1,61 @@
+from datetime import date
+import app.models as models
+from app.rollups import rebuild
+
+
+def rollup(db_session):
+    """Hilfsfunktion: Liest die Tagessummen als {(Feld, Tag): (Anzahl, Summe, Min, Max)}."""
+    db_session.expire_all()
+    return {(r.field, r.day): (r.count, r.sum, r.min, r.max) for r in db_session.query(models.DailyRollup)}
+
+
+def post_entry(client, headers, category_id, occurred_at, values):
+    """Hilfsfunktion: Legt einen Eintrag an und liefert seine ID."""
+    return client.post("/entries/", headers=headers, json={
+        "category_id": category_id, "occurred_at": occurred_at, "values": values
+    }).json()["id"]
+
+
+def test_rollup_follows_entry_changes(client, auth_headers, category_id, db_session):
+    """PRÜFUNG: Werden Tagessummen beim Anlegen, Verschieben und Löschen von Einträgen nachgeführt?"""
+    first = post_entry(client, auth_headers, category_id, "2025-01-01T08:00:00", {"Dauer": 30, "Energie": "300"})
+    second = post_entry(client, auth_headers, category_id, "2025-01-01T18:00:00", {"Dauer": 60})
+    assert rollup(db_session) == {("Dauer", date(2025, 1, 1)): (2, 90.0, 30.0, 60.0),
+                                  ("Energie", date(2025, 1, 1)): (1, 300.0, 300.0, 300.0)}
+
+    # Moving the maximum to another day reverses its contribution and recomputes the extremes
+    client.put(f"/entries/{second}", headers=auth_headers, json={
+        "category_id": category_id, "occurred_at": "2025-01-02T18:00:00", "values": {"Dauer": 45}
+    })
+    assert rollup(db_session) == {("Dauer", date(2025, 1, 1)): (1, 30.0, 30.0, 30.0),
+                                  ("Dauer", date(2025, 1, 2)): (1, 45.0, 45.0, 45.0),
+                                  ("Energie", date(2025, 1, 1)): (1, 300.0, 300.0, 300.0)}
+
+    client.delete(f"/entries/{first}", headers=auth_headers)
+    assert rollup(db_session) == {("Dauer", date(2025, 1, 2)): (1, 45.0, 45.0, 45.0)}
+
+
+def test_rebuild_matches_incremental_rollup(client, auth_headers, category_id, db_session):
+    """PRÜFUNG: Liefert der Neuaufbau dieselben Tagessummen wie die inkrementelle Pflege?"""
+    items = [{"category_id": category_id, "occurred_at": f"2025-01-0{1 + i % 3}T10:00:00", "values": {"Dauer": i}}
+             for i in range(9)]
+    client.post("/entries/bulk", headers=auth_headers, json={"items": items})
+    incremental = rollup(db_session)
+
+    assert rebuild(db_session) == 3
+    assert rollup(db_session) == incremental
+
+
+def test_aggregate_from_rollup_matches_entries(client, auth_headers, category_id):
+    """PRÜFUNG: Liefern Tagessummen dasselbe Ergebnis wie die Aggregation über die Einträge?"""
+    for day, value in [(1, 10), (1, 20), (2, 5)]:
+        post_entry(client, auth_headers, category_id, f"2025-01-0{day}T12:00:00", {"Dauer": value})
+
+    def series(start):
+        return client.get("/entries/aggregate", headers=auth_headers, params={
+            "category_id": category_id, "field": "Dauer", "fn": "avg", "bucket": "week", "start": start
+        }).json()["points"]
+
+    # Midnight is served by the rollup, any other time by the entries
+    assert series("2025-01-01T00:00:00") == series("2025-01-01T00:00:01")
+    assert series("2025-01-01T00:00:00")[0]["count"] == 3
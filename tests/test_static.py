@@ -0,0 +1,64 @@
+import re
+from fastapi.testclient import TestClient
+from app.main import app
+from app.static_assets import Asset, choose_encoding
+
+client = TestClient(app)
+
+
+def hashed_script_url():
+    """Hilfsfunktion: Liest die gehashte URL von script.js aus der index.html."""
+    return "/" + re.search(r'src="(script\.[0-9a-f]{12}\.js)"', client.get("/").text).group(1)
+
+
+def test_index_references_hashed_assets():
+    """PRÜFUNG: Verweist die index.html auf gehashte Assets und wird sie per ETag revalidiert?"""
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert re.search(r'href="stylesheet\.[0-9a-f]{12}\.css"', response.text)
+    assert response.headers["cache-control"] == "no-cache"
+
+    etag = response.headers["etag"]
+    revalidated = client.get("/", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+    assert revalidated.status_code == 304
+
+
+def test_hashed_asset_is_immutable_and_precompressed():
+    """PRÜFUNG: Werden gehashte Assets dauerhaft cachebar und vorkomprimiert ausgeliefert?"""
+    url = hashed_script_url()
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "immutable" in plain.headers["cache-control"]
+    assert "content-encoding" not in plain.headers
+
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    assert compressed.content == plain.content # TestClient decodes the body
+
+
+def test_encoding_respects_q_values():
+    """PRÜFUNG: Werden Kodierungen mit q=0 ausgeschlossen und höhere q-Werte bevorzugt?"""
+    asset = Asset(b"x" * 4096, "text/plain", "no-cache")
+    asset.encoded["br"] = b"br" # Independent of the optional brotli package
+
+    assert choose_encoding(asset, "gzip;q=0, identity") is None
+    assert choose_encoding(asset, "br;q=0, gzip") == "gzip"
+    assert choose_encoding(asset, "br;q=0.5, gzip;q=0.8") == "gzip"
+    assert choose_encoding(asset, "gzip, br") == "br"
+    assert choose_encoding(asset, "*;q=0") is None
+    assert choose_encoding(asset, "") is None
+
+
+def test_large_api_response_is_gzipped(client, auth_headers, category_id):
+    """PRÜFUNG: Werden große API-Antworten komprimiert, kleine nicht?"""
+    client.post("/entries/bulk", headers=auth_headers, json={"items": [
+        {"category_id": category_id, "occurred_at": f"2025-01-01T10:{i:02d}:00", "values": {"Dauer": i}}
+        for i in range(50)
+    ]})
+
+    response = client.get("/entries/", headers={**auth_headers, "Accept-Encoding": "gzip"}, params={"limit": 50})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["items"]) == 50
+
+    small = client.get("/user", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, UTC
+from app.sync import encode_token
+
+
+def new_entry(client, headers, category_id, duration):
+    """Hilfsfunktion: Legt einen Fitness-Eintrag an und gibt ihn zurück."""
+    return client.post("/entries/", headers=headers, json={
+        "category_id": category_id, "occurred_at": "2025-03-01T10:00:00", "values": {"Dauer": duration}
+    }).json()
+
+
+def test_sync_without_token_resets(client, auth_headers):
+    """PRÜFUNG: Liefert der erste Sync alle Kategorien und fordert einen Reset an?"""
+    result = client.get("/sync", headers=auth_headers).json()
+    assert result["reset"] is True
+    assert len(result["categories"]) == 4
+    assert result["entries"] == []
+
+
+def test_sync_returns_only_changes(client, auth_headers, category_id):
+    """PRÜFUNG: Enthält der Delta-Sync nur geänderte und gelöschte Objekte?"""
+    token = client.get("/sync", headers=auth_headers).json()["token"]
+
+    created = new_entry(client, auth_headers, category_id, 20)
+    deleted = new_entry(client, auth_headers, category_id, 30)
+    client.delete(f"/entries/{deleted['id']}", headers=auth_headers)
+
+    result = client.get("/sync", headers=auth_headers, params={"since": token}).json()
+
+    assert result["reset"] is False
+    assert created["id"] in [e["id"] for e in result["entries"]]
+    assert result["deleted_entries"] == [deleted["id"]]
+
+
+def test_sync_reports_deleted_category(client, auth_headers):
+    """PRÜFUNG: Wird eine gelöschte Kategorie als Tombstone gemeldet?"""
+    cat = client.post("/categories/", headers=auth_headers, json={
+        "name": "Lesen", "fields": [{"label": "Seiten", "data_type": "number"}]
+    }).json()
+    token = client.get("/sync", headers=auth_headers).json()["token"]
+
+    client.delete(f"/categories/{cat['id']}", headers=auth_headers)
+    result = client.get("/sync", headers=auth_headers, params={"since": token}).json()
+
+    assert result["deleted_categories"] == [cat["id"]]
+
+
+def test_sync_expired_token_resets(client, auth_headers):
+    """PRÜFUNG: Fordert ein Token älter als die Tombstone-Aufbewahrung einen Reset an?"""
+    token = encode_token(datetime.now(UTC) - timedelta(days=365))
+    result = client.get("/sync", headers=auth_headers, params={"since": token}).json()
+    assert result["reset"] is True
+
+
+def test_sync_invalid_token_rejected(client, auth_headers):
+    """NEGATIV-TEST: Wird ein manipuliertes Sync-Token mit 400 abgelehnt?"""
+    response = client.get("/sync", headers=auth_headers, params={"since": "unsinn"})
+    assert response.status_code == 400